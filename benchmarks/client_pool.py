@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import statistics
+import time
+from decimal import Decimal
+
+from settings import RETRY_SETTINGS, TCS_ACCOUNT_ID, TCS_RO_TOKEN, TCS_RW_TOKEN
+from tinkoff.invest.retrying.aio.client import AsyncRetryingClient
+from tinkoff.invest.utils import decimal_to_quotation
+from tools import clients
+from tools.adapters import OrderAdapter
+from tools.classes import Asset
+from tools.orders import (cancel_order, get_execution_report,
+                          get_price_from_order_book, place_order)
+
+from benchmarks.fake_server import FakeTinkoffServer
+
+
+def bench_asset():
+    asset = Asset(
+        ticker='BENCH',
+        figi='BBG000BENCH0',
+        min_price_increment=Decimal('0.01'),
+        lot=1,
+        amount=10,
+    )
+    asset.price = decimal_to_quotation(Decimal('110'))
+    return asset
+
+
+async def cycle_with_new_clients(asset, target):
+    async with AsyncRetryingClient(
+        TCS_RO_TOKEN, RETRY_SETTINGS, target=target
+    ) as client:
+        await client.market_data.get_order_book(figi=asset.figi, depth=1)
+    async with AsyncRetryingClient(
+        TCS_RW_TOKEN, RETRY_SETTINGS, target=target
+    ) as client:
+        response = await client.orders.post_order(
+            **OrderAdapter(asset, 'limit').order_params
+        )
+    async with AsyncRetryingClient(
+        TCS_RO_TOKEN, RETRY_SETTINGS, target=target
+    ) as client:
+        await client.orders.get_order_state(
+            account_id=TCS_ACCOUNT_ID, order_id=response.order_id
+        )
+    async with AsyncRetryingClient(
+        TCS_RW_TOKEN, RETRY_SETTINGS, target=target
+    ) as client:
+        await client.orders.cancel_order(
+            account_id=TCS_ACCOUNT_ID, order_id=response.order_id
+        )
+
+
+async def cycle_with_pool(asset, target):
+    await get_price_from_order_book(asset)
+    response = await place_order(asset, 'limit')
+    await get_execution_report(response.order_id)
+    await cancel_order(response.order_id)
+
+
+async def measure(cycle, asset, target, cycles):
+    timings = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        await cycle(asset, target)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(title, timings):
+    percentiles = statistics.quantiles(timings, n=100)
+    print(
+        f'{title:<14} mean={statistics.mean(timings):8.2f}ms '
+        f'p50={percentiles[49]:8.2f}ms p99={percentiles[98]:8.2f}ms'
+    )
+
+
+async def main(cycles, latency):
+    async with FakeTinkoffServer(latency) as server:
+        clients.CLIENTS.ro = clients.PooledClient(
+            TCS_RO_TOKEN, target=server.target
+        )
+        clients.CLIENTS.rw = clients.PooledClient(
+            TCS_RW_TOKEN, target=server.target
+        )
+        asset = bench_asset()
+        before = await measure(
+            cycle_with_new_clients, asset, server.target, cycles
+        )
+        after = await measure(cycle_with_pool, asset, server.target, cycles)
+        await clients.CLIENTS.close()
+    print(f'{cycles} sellbuy-like cycles, 4 RPCs each, latency={latency}s')
+    report('new client/RPC', before)
+    report('pooled', after)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Per-cycle latency: client per RPC vs shared pool.'
+    )
+    parser.add_argument('--cycles', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.cycles, args.latency))
@@ -0,0 +1,694 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import grpc
+from google.protobuf.timestamp_pb2 import Timestamp
+from tinkoff.invest.grpc import (common_pb2, instruments_pb2,
+                                 instruments_pb2_grpc, marketdata_pb2,
+                                 marketdata_pb2_grpc, operations_pb2,
+                                 operations_pb2_grpc, orders_pb2,
+                                 orders_pb2_grpc, stoporders_pb2,
+                                 stoporders_pb2_grpc)
+
+from benchmarks.market import (CANCELLED, FILLED, NEW, PARTIALLY_FILLED,
+                               STOP_LIMIT, STOP_LOSS, TAKE_PROFIT, Listing,
+                               Market, load_paths, synthetic_listings,
+                               synthetic_paths)
+
+SSL_ROOTS_ENV = 'GRPC_DEFAULT_SSL_ROOTS_FILE_PATH'
+BILLION = Decimal(10**9)
+DEFAULT_LISTINGS = [
+    Listing('BBG000BENCH0', 'BENCH', 'share', Decimal('100')),
+]
+STATUSES = {
+    NEW: orders_pb2.EXECUTION_REPORT_STATUS_NEW,
+    PARTIALLY_FILLED: orders_pb2.EXECUTION_REPORT_STATUS_PARTIALLYFILL,
+    FILLED: orders_pb2.EXECUTION_REPORT_STATUS_FILL,
+    CANCELLED: orders_pb2.EXECUTION_REPORT_STATUS_CANCELLED,
+}
+STOP_ORDER_TYPES = {
+    stoporders_pb2.STOP_ORDER_TYPE_TAKE_PROFIT: TAKE_PROFIT,
+    stoporders_pb2.STOP_ORDER_TYPE_STOP_LOSS: STOP_LOSS,
+    stoporders_pb2.STOP_ORDER_TYPE_STOP_LIMIT: STOP_LIMIT,
+}
+INSTRUMENT_TYPES = {'share': 'share', 'future': 'futures', 'bond': 'bond'}
+
+
+def make_certificate(directory):
+    key = os.path.join(directory, 'key.pem')
+    cert = os.path.join(directory, 'cert.pem')
+    subprocess.run(
+        [
+            'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+            '-keyout', key, '-out', cert, '-days', '1',
+            '-subj', '/CN=localhost',
+            '-addext', 'subjectAltName=DNS:localhost',
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return key, cert
+
+
+def quotation(value):
+    value = Decimal(value)
+    units = int(value)
+    return common_pb2.Quotation(
+        units=units, nano=int((value - units) * BILLION)
+    )
+
+
+def money(value):
+    value = Decimal(value)
+    units = int(value)
+    return common_pb2.MoneyValue(
+        currency='rub', units=units, nano=int((value - units) * BILLION)
+    )
+
+
+def to_decimal(value):
+    return Decimal(value.units) + Decimal(value.nano) / BILLION
+
+
+def timestamp(moment=None):
+    result = Timestamp()
+    result.FromDatetime(moment or datetime.now(timezone.utc))
+    return result
+
+
+def order_direction(sell):
+    if sell:
+        return orders_pb2.ORDER_DIRECTION_SELL
+    return orders_pb2.ORDER_DIRECTION_BUY
+
+
+def stop_order_direction(sell):
+    if sell:
+        return stoporders_pb2.STOP_ORDER_DIRECTION_SELL
+    return stoporders_pb2.STOP_ORDER_DIRECTION_BUY
+
+
+def book_levels(levels):
+    return [
+        marketdata_pb2.Order(price=quotation(price), quantity=lots)
+        for price, lots in levels
+    ]
+
+
+class CountingServicer:
+    def __init__(self, server):
+        self._server = server
+
+    @property
+    def _market(self):
+        return self._server.market
+
+    async def _answer(self, method):
+        self._server.calls[method] += 1
+        if self._server.latency:
+            await asyncio.sleep(self._server.latency)
+
+    async def _figi(self, request, context):
+        try:
+            return self._market.figi(request.instrument_id or request.figi)
+        except KeyError:
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND, 'Instrument not found'
+            )
+
+    def _last_price(self, figi):
+        return marketdata_pb2.LastPrice(
+            figi=figi,
+            price=quotation(self._market.last_price(figi)),
+            time=timestamp(),
+            instrument_uid=self._market.listings[figi].uid,
+        )
+
+    def _order_book(self, figi, depth):
+        bids, asks = self._market.order_book(figi, depth)
+        return {
+            'figi': figi,
+            'depth': depth,
+            'bids': book_levels(bids),
+            'asks': book_levels(asks),
+            'instrument_uid': self._market.listings[figi].uid,
+        }
+
+
+class InstrumentsServicer(
+    CountingServicer, instruments_pb2_grpc.InstrumentsServiceServicer
+):
+    async def Shares(self, request, context):  # noqa: N802
+        await self._answer('Shares')
+        return instruments_pb2.SharesResponse(
+            instruments=[
+                instruments_pb2.Share(**self._common(listing))
+                for listing in self._listings('share')
+            ]
+        )
+
+    async def Futures(self, request, context):  # noqa: N802
+        await self._answer('Futures')
+        return instruments_pb2.FuturesResponse(
+            instruments=[
+                instruments_pb2.Future(
+                    **self._common(listing),
+                    basic_asset=listing.basic_asset,
+                    basic_asset_size=quotation(listing.basic_asset_size),
+                    asset_type='TYPE_SECURITY',
+                    expiration_date=timestamp(listing.expiration),
+                    last_trade_date=timestamp(listing.expiration),
+                )
+                for listing in self._listings('future')
+            ]
+        )
+
+    async def Bonds(self, request, context):  # noqa: N802
+        await self._answer('Bonds')
+        return instruments_pb2.BondsResponse(
+            instruments=[
+                instruments_pb2.Bond(
+                    **self._common(listing),
+                    nominal=money(listing.nominal),
+                    maturity_date=timestamp(listing.expiration),
+                )
+                for listing in self._listings('bond')
+            ]
+        )
+
+    async def GetFuturesMargin(self, request, context):  # noqa: N802
+        await self._answer('GetFuturesMargin')
+        listing = self._market.listings[await self._figi(request, context)]
+        margin = money(self._market.last_price(listing.figi) * (
+            listing.margin_rate
+        ))
+        return instruments_pb2.GetFuturesMarginResponse(
+            initial_margin_on_buy=margin,
+            initial_margin_on_sell=margin,
+            min_price_increment=quotation(listing.min_price_increment),
+            min_price_increment_amount=quotation(listing.min_price_increment),
+        )
+
+    def _listings(self, kind):
+        return [
+            listing
+            for listing in self._market.listings.values()
+            if listing.kind == kind
+        ]
+
+    def _common(self, listing):
+        return {
+            'figi': listing.figi,
+            'ticker': listing.ticker,
+            'uid': listing.uid,
+            'name': listing.ticker,
+            'lot': listing.lot,
+            'currency': 'rub',
+            'exchange': 'MOEX',
+            'real_exchange': instruments_pb2.REAL_EXCHANGE_MOEX,
+            'min_price_increment': quotation(listing.min_price_increment),
+            'api_trade_available_flag': True,
+            'buy_available_flag': True,
+            'sell_available_flag': True,
+            'short_enabled_flag': True,
+        }
+
+
+class MarketDataServicer(
+    CountingServicer, marketdata_pb2_grpc.MarketDataServiceServicer
+):
+    async def GetOrderBook(self, request, context):  # noqa: N802
+        await self._answer('GetOrderBook')
+        figi = await self._figi(request, context)
+        return marketdata_pb2.GetOrderBookResponse(
+            **self._order_book(figi, request.depth),
+            last_price=quotation(self._market.last_price(figi)),
+        )
+
+    async def GetLastPrices(self, request, context):  # noqa: N802
+        await self._answer('GetLastPrices')
+        try:
+            figis = [
+                self._market.figi(instrument)
+                for instrument in [*request.figi, *request.instrument_id]
+            ]
+        except KeyError:
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND, 'Instrument not found'
+            )
+        return marketdata_pb2.GetLastPricesResponse(
+            last_prices=[self._last_price(figi) for figi in figis]
+        )
+
+
+class MarketDataSubscription(CountingServicer):
+    def __init__(self, server):
+        super().__init__(server)
+        self._queue = self._market.watch()
+        self._order_books = {}
+        self._last_prices = set()
+
+    async def read(self, requests):
+        async for request in requests:
+            if request.HasField('subscribe_order_book_request'):
+                self._queue.put_nowait(
+                    self._subscribe_order_books(
+                        request.subscribe_order_book_request
+                    )
+                )
+            if request.HasField('subscribe_last_price_request'):
+                self._queue.put_nowait(
+                    self._subscribe_last_prices(
+                        request.subscribe_last_price_request
+                    )
+                )
+
+    async def responses(self):
+        while True:
+            item = await self._queue.get()
+            if isinstance(item, marketdata_pb2.MarketDataResponse):
+                yield item
+                continue
+            for response in self._updates(item.figi):
+                yield response
+
+    def close(self):
+        self._market.unwatch(self._queue)
+
+    def _updates(self, figi):
+        if figi in self._order_books:
+            yield marketdata_pb2.MarketDataResponse(
+                orderbook=marketdata_pb2.OrderBook(
+                    **self._order_book(figi, self._order_books[figi]),
+                    is_consistent=True,
+                    time=timestamp(),
+                )
+            )
+        if figi in self._last_prices:
+            yield marketdata_pb2.MarketDataResponse(
+                last_price=self._last_price(figi)
+            )
+
+    def _figis(self, instruments):
+        return [
+            self._market.figi(instrument.instrument_id or instrument.figi)
+            for instrument in instruments
+        ]
+
+    def _subscribe_order_books(self, request):
+        subscribe = (
+            request.subscription_action
+            == marketdata_pb2.SUBSCRIPTION_ACTION_SUBSCRIBE
+        )
+        figis = self._figis(request.instruments)
+        for figi, instrument in zip(figis, request.instruments):
+            if subscribe:
+                self._order_books[figi] = instrument.depth
+            else:
+                self._order_books.pop(figi, None)
+        return marketdata_pb2.MarketDataResponse(
+            subscribe_order_book_response=(
+                marketdata_pb2.SubscribeOrderBookResponse(
+                    order_book_subscriptions=[
+                        marketdata_pb2.OrderBookSubscription(
+                            figi=figi,
+                            depth=instrument.depth,
+                            subscription_status=(
+                                marketdata_pb2.SUBSCRIPTION_STATUS_SUCCESS
+                            ),
+                        )
+                        for figi, instrument in zip(
+                            figis, request.instruments
+                        )
+                    ]
+                )
+            )
+        )
+
+    def _subscribe_last_prices(self, request):
+        figis = self._figis(request.instruments)
+        if (
+            request.subscription_action
+            == marketdata_pb2.SUBSCRIPTION_ACTION_SUBSCRIBE
+        ):
+            self._last_prices.update(figis)
+        else:
+            self._last_prices.difference_update(figis)
+        return marketdata_pb2.MarketDataResponse(
+            subscribe_last_price_response=(
+                marketdata_pb2.SubscribeLastPriceResponse(
+                    last_price_subscriptions=[
+                        marketdata_pb2.LastPriceSubscription(
+                            figi=figi,
+                            subscription_status=(
+                                marketdata_pb2.SUBSCRIPTION_STATUS_SUCCESS
+                            ),
+                        )
+                        for figi in figis
+                    ]
+                )
+            )
+        )
+
+
+class MarketDataStreamServicer(
+    CountingServicer, marketdata_pb2_grpc.MarketDataStreamServiceServicer
+):
+    async def MarketDataStream(self, requests, context):  # noqa: N802
+        await self._answer('MarketDataStream')
+        subscription = MarketDataSubscription(self._server)
+        reader = asyncio.create_task(subscription.read(requests))
+        try:
+            async for response in subscription.responses():
+                yield response
+        finally:
+            reader.cancel()
+            subscription.close()
+
+
+class OrdersServicer(CountingServicer, orders_pb2_grpc.OrdersServiceServicer):
+    async def PostOrder(self, request, context):  # noqa: N802
+        await self._answer('PostOrder')
+        figi = await self._figi(request, context)
+        price = None
+        if request.order_type != orders_pb2.ORDER_TYPE_MARKET:
+            price = to_decimal(request.price)
+        order = self._market.post_order(
+            figi,
+            request.direction == orders_pb2.ORDER_DIRECTION_SELL,
+            request.quantity,
+            price,
+        )
+        return orders_pb2.PostOrderResponse(
+            **self._order_fields(order),
+            executed_order_price=money(order.average_price),
+            order_type=request.order_type,
+        )
+
+    async def CancelOrder(self, request, context):  # noqa: N802
+        await self._answer('CancelOrder')
+        try:
+            self._market.cancel_order(request.order_id)
+        except KeyError:
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND, 'Order is not active'
+            )
+        return orders_pb2.CancelOrderResponse(time=timestamp())
+
+    async def GetOrderState(self, request, context):  # noqa: N802
+        await self._answer('GetOrderState')
+        order = self._market.orders.get(request.order_id)
+        if order is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, 'Order not found')
+        return self._order_state(order)
+
+    async def GetOrders(self, request, context):  # noqa: N802
+        await self._answer('GetOrders')
+        return orders_pb2.GetOrdersResponse(
+            orders=[
+                self._order_state(order)
+                for order in self._market.orders.values()
+                if order.active
+            ]
+        )
+
+    def _order_fields(self, order):
+        return {
+            'order_id': order.order_id,
+            'execution_report_status': STATUSES[order.status],
+            'lots_requested': order.lots,
+            'lots_executed': order.filled,
+            'figi': order.figi,
+            'direction': order_direction(order.sell),
+            'instrument_uid': order.listing.uid,
+        }
+
+    def _order_state(self, order):
+        return orders_pb2.OrderState(
+            **self._order_fields(order),
+            executed_order_price=money(order.average_price),
+            average_position_price=money(order.average_price),
+            currency='rub',
+        )
+
+
+class OrdersStreamServicer(
+    CountingServicer, orders_pb2_grpc.OrdersStreamServiceServicer
+):
+    async def TradesStream(self, request, context):  # noqa: N802
+        await self._answer('TradesStream')
+        queue = self._market.watch()
+        try:
+            yield orders_pb2.TradesStreamResponse(ping=common_pb2.Ping())
+            while True:
+                event = await queue.get()
+                if event.order is not None:
+                    yield self._order_trades(event)
+        finally:
+            self._market.unwatch(queue)
+
+    def _order_trades(self, event):
+        return orders_pb2.TradesStreamResponse(
+            order_trades=orders_pb2.OrderTrades(
+                order_id=event.order.order_id,
+                created_at=timestamp(),
+                direction=order_direction(event.order.sell),
+                figi=event.figi,
+                trades=[
+                    orders_pb2.OrderTrade(
+                        date_time=timestamp(),
+                        price=quotation(trade.price),
+                        quantity=trade.quantity,
+                        trade_id=trade.trade_id,
+                    )
+                    for trade in event.trades
+                ],
+                instrument_uid=event.order.listing.uid,
+            )
+        )
+
+
+class StopOrdersServicer(
+    CountingServicer, stoporders_pb2_grpc.StopOrdersServiceServicer
+):
+    async def PostStopOrder(self, request, context):  # noqa: N802
+        await self._answer('PostStopOrder')
+        stop_order = self._market.post_stop_order(
+            await self._figi(request, context),
+            request.direction == stoporders_pb2.STOP_ORDER_DIRECTION_SELL,
+            request.quantity,
+            to_decimal(request.stop_price),
+            to_decimal(request.price),
+            STOP_ORDER_TYPES[request.stop_order_type],
+        )
+        return stoporders_pb2.PostStopOrderResponse(
+            stop_order_id=stop_order.stop_order_id
+        )
+
+    async def GetStopOrders(self, request, context):  # noqa: N802
+        await self._answer('GetStopOrders')
+        types = {kind: value for value, kind in STOP_ORDER_TYPES.items()}
+        return stoporders_pb2.GetStopOrdersResponse(
+            stop_orders=[
+                stoporders_pb2.StopOrder(
+                    stop_order_id=stop_order.stop_order_id,
+                    lots_requested=stop_order.lots,
+                    figi=stop_order.listing.figi,
+                    direction=stop_order_direction(stop_order.sell),
+                    currency='rub',
+                    order_type=types[stop_order.kind],
+                    price=money(stop_order.price),
+                    stop_price=money(stop_order.stop_price),
+                    instrument_uid=stop_order.listing.uid,
+                )
+                for stop_order in self._market.stop_orders.values()
+            ]
+        )
+
+    async def CancelStopOrder(self, request, context):  # noqa: N802
+        await self._answer('CancelStopOrder')
+        try:
+            self._market.cancel_stop_order(request.stop_order_id)
+        except KeyError:
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND, 'Stop order not found'
+            )
+        return stoporders_pb2.CancelStopOrderResponse(time=timestamp())
+
+
+class OperationsServicer(
+    CountingServicer, operations_pb2_grpc.OperationsServiceServicer
+):
+    async def GetPortfolio(self, request, context):  # noqa: N802
+        await self._answer('GetPortfolio')
+        return operations_pb2.PortfolioResponse(
+            account_id=request.account_id,
+            positions=[
+                self._position(figi, position)
+                for figi, position in self._market.positions.items()
+                if position.quantity
+            ],
+        )
+
+    def _position(self, figi, position):
+        listing = self._market.listings[figi]
+        return operations_pb2.PortfolioPosition(
+            figi=figi,
+            instrument_type=INSTRUMENT_TYPES[listing.kind],
+            quantity=quotation(position.quantity),
+            quantity_lots=quotation(position.quantity // listing.lot),
+            average_position_price=money(position.average_price),
+            current_price=money(self._market.last_price(figi)),
+            instrument_uid=listing.uid,
+        )
+
+
+SERVICERS = (
+    (
+        InstrumentsServicer,
+        instruments_pb2_grpc.add_InstrumentsServiceServicer_to_server,
+    ),
+    (
+        MarketDataServicer,
+        marketdata_pb2_grpc.add_MarketDataServiceServicer_to_server,
+    ),
+    (
+        MarketDataStreamServicer,
+        marketdata_pb2_grpc.add_MarketDataStreamServiceServicer_to_server,
+    ),
+    (OrdersServicer, orders_pb2_grpc.add_OrdersServiceServicer_to_server),
+    (
+        OrdersStreamServicer,
+        orders_pb2_grpc.add_OrdersStreamServiceServicer_to_server,
+    ),
+    (
+        StopOrdersServicer,
+        stoporders_pb2_grpc.add_StopOrdersServiceServicer_to_server,
+    ),
+    (
+        OperationsServicer,
+        operations_pb2_grpc.add_OperationsServiceServicer_to_server,
+    ),
+)
+
+
+class FakeTinkoffServer:
+    def __init__(self, latency=0.0, market=None, tick=None, port=0):
+        self.latency = latency
+        self.market = market or Market(DEFAULT_LISTINGS)
+        self.calls = Counter()
+        self.target = None
+        self.certificate = None
+        self._tick = tick
+        self._port = port
+        self._server = None
+        self._clock = None
+        self._directory = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+    async def start(self):
+        self._directory = tempfile.TemporaryDirectory()
+        key, self.certificate = make_certificate(self._directory.name)
+        os.environ[SSL_ROOTS_ENV] = self.certificate
+        with open(key, 'rb') as key_file, open(
+            self.certificate, 'rb'
+        ) as cert_file:
+            credentials = grpc.ssl_server_credentials(
+                [(key_file.read(), cert_file.read())]
+            )
+        self._server = grpc.aio.server()
+        for servicer, add_to_server in SERVICERS:
+            add_to_server(servicer(self), self._server)
+        port = self._server.add_secure_port(
+            f'localhost:{self._port}', credentials
+        )
+        await self._server.start()
+        self.target = f'localhost:{port}'
+        if self._tick:
+            self._clock = asyncio.create_task(self._run_clock())
+
+    async def stop(self):
+        if self._clock is not None:
+            self._clock.cancel()
+        await self._server.stop(None)
+        self._directory.cleanup()
+
+    async def _run_clock(self):
+        while True:
+            await asyncio.sleep(self._tick)
+            self.market.step()
+
+
+class BackgroundServer:
+    def __init__(self, server):
+        self.server = server
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name='fake_broker', daemon=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        self.call(self.server.start())
+        return self
+
+    def __exit__(self, *args):
+        self.call(self.server.stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def step(self):
+        self.call(self._step())
+
+    async def _step(self):
+        self.server.market.step()
+
+
+def build_market(args):
+    if not args.shares:
+        return Market(DEFAULT_LISTINGS)
+    listings = synthetic_listings(args.shares, args.futures, args.seed)
+    paths = synthetic_paths(listings, args.steps, args.seed)
+    if args.paths:
+        paths.update(load_paths(args.paths))
+    return Market(listings, paths)
+
+
+async def serve(args):
+    async with FakeTinkoffServer(
+        args.latency, build_market(args), args.tick, args.port
+    ) as server:
+        print(f'TCS_TARGET={server.target}')
+        print(f'{SSL_ROOTS_ENV}={server.certificate}', flush=True)
+        await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Local stand-in of the Tinkoff Invest API.'
+    )
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--tick', type=float, default=1.0)
+    parser.add_argument('--shares', type=int, default=0)
+    parser.add_argument('--futures', type=int, default=2)
+    parser.add_argument('--steps', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--paths')
+    asyncio.run(serve(parser.parse_args()))
@@ -0,0 +1,60 @@
+import argparse
+import timeit
+from decimal import Decimal, localcontext
+
+from tinkoff.invest.schemas import Quotation
+from tinkoff.invest.utils import decimal_to_quotation, quotation_to_decimal
+from tools.fixed_point import (NANO, average, floor_to_tick, from_quotation,
+                               to_quotation)
+
+FAR = Quotation(units=10512, nano=0)
+NEAR = Quotation(units=104, nano=870000000)
+FILL = Quotation(units=10511, nano=0)
+RATIO = 100
+TARGET = 20
+
+
+def decimal_cycle():
+    far = quotation_to_decimal(FAR)
+    near = quotation_to_decimal(NEAR)
+    delta = far - near * RATIO
+    if delta > TARGET:
+        price = far // Decimal('1') * Decimal('1')
+        decimal_to_quotation(price)
+    fill = quotation_to_decimal(FILL)
+    return (Decimal('10500') * 5 + fill * 3) / 8
+
+
+def fixed_point_cycle():
+    far = from_quotation(FAR)
+    near = from_quotation(NEAR)
+    delta = far - near * RATIO
+    if delta > TARGET * NANO:
+        to_quotation(floor_to_tick(far, NANO))
+    fill = from_quotation(FILL)
+    return average(10500 * NANO * 5 + fill * 3, 8)
+
+
+def main(number, repeat):
+    with localcontext() as context:
+        context.prec = 10
+        decimal = min(
+            timeit.repeat(decimal_cycle, number=number, repeat=repeat)
+        )
+    fixed = min(
+        timeit.repeat(fixed_point_cycle, number=number, repeat=repeat)
+    )
+    print(f'{"path":<14}{"us/cycle":>10}')
+    for name, elapsed in (('decimal', decimal), ('fixed point', fixed)):
+        print(f'{name:<14}{elapsed / number * 10**6:>10.3f}')
+    print(f'speedup: {decimal / fixed:.2f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Per-cycle price arithmetic: Decimal against fixed point.'
+    )
+    parser.add_argument('--number', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    main(args.number, args.repeat)
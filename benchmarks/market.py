@@ -0,0 +1,424 @@
+import asyncio
+import heapq
+import itertools
+import json
+import random
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+NEW, PARTIALLY_FILLED, FILLED, CANCELLED = (
+    'new', 'partially_filled', 'filled', 'cancelled'
+)
+TAKE_PROFIT, STOP_LOSS, STOP_LIMIT = 'take_profit', 'stop_loss', 'stop_limit'
+
+
+class Listing(NamedTuple):
+    figi: str
+    ticker: str
+    kind: str
+    price: Decimal
+    lot: int = 1
+    min_price_increment: Decimal = Decimal('0.01')
+    basic_asset: str = ''
+    basic_asset_size: int = 0
+    expiration: Optional[datetime] = None
+    nominal: Decimal = Decimal('1000')
+    margin_rate: Decimal = Decimal('0.15')
+
+    @property
+    def uid(self):
+        return f'uid-{self.figi}'
+
+
+class Trade(NamedTuple):
+    trade_id: str
+    price: Decimal
+    quantity: int
+
+
+class MarketEvent(NamedTuple):
+    figi: str
+    order: Optional['Order'] = None
+    trades: tuple = ()
+
+
+class PricePath:
+    def __init__(self, prices) -> None:
+        self._prices = [Decimal(str(price)) for price in prices]
+        self._step = 0
+
+    @property
+    def price(self):
+        return self._prices[min(self._step, len(self._prices) - 1)]
+
+    def advance(self):
+        self._step += 1
+
+
+def random_walk(start, steps, increment, seed=0, max_ticks=1):
+    rng = random.Random(seed)
+    prices = [Decimal(str(start))]
+    for _ in range(steps):
+        move = rng.randint(-max_ticks, max_ticks) * Decimal(str(increment))
+        prices.append(max(Decimal(str(increment)), prices[-1] + move))
+    return prices
+
+
+def synthetic_listings(shares, futures_per_share=2, seed=0):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    listings = []
+    for number in range(shares):
+        share = Listing(
+            f'BBGS{number:08}',
+            f'S{number:04}',
+            'share',
+            Decimal(rng.randint(50, 5000)),
+            lot=10,
+        )
+        listings.append(share)
+        for month in range(1, futures_per_share + 1):
+            premium = Decimal(rng.randint(-20, 100)) / 1000
+            listings.append(
+                Listing(
+                    f'FUTS{number:05}{month:03}',
+                    f'{share.ticker}F{month}',
+                    'future',
+                    (share.price * 100 * (1 + premium)).quantize(Decimal(1)),
+                    min_price_increment=Decimal('1'),
+                    basic_asset=share.ticker,
+                    basic_asset_size=100,
+                    expiration=now + timedelta(days=90 * month),
+                )
+            )
+    return listings
+
+
+def synthetic_paths(listings, steps, seed=0):
+    return {
+        listing.figi: PricePath(
+            random_walk(
+                listing.price,
+                steps,
+                listing.min_price_increment,
+                seed=seed + number,
+            )
+        )
+        for number, listing in enumerate(listings)
+    }
+
+
+def load_paths(file_name):
+    with open(file_name) as file:
+        return {
+            figi: PricePath(prices) for figi, prices in json.load(file).items()
+        }
+
+
+class Quote:
+    def __init__(self, price, lots) -> None:
+        self.price = price
+        self.remaining = lots
+
+    def fill(self, lots, price, trade_id):
+        self.remaining -= lots
+
+
+class Order:
+    def __init__(self, order_id, listing, sell, lots, price, seq) -> None:
+        self.order_id = order_id
+        self.listing = listing
+        self.sell = sell
+        self.lots = lots
+        self.price = price
+        self.seq = seq
+        self.filled = 0
+        self.notional = Decimal('0')
+        self.status = NEW
+        self.trades = []
+
+    @property
+    def figi(self):
+        return self.listing.figi
+
+    @property
+    def remaining(self):
+        return self.lots - self.filled
+
+    @property
+    def active(self):
+        return self.status in (NEW, PARTIALLY_FILLED)
+
+    @property
+    def average_price(self):
+        if not self.filled:
+            return Decimal('0')
+        return self.notional / self.filled
+
+    def crosses(self, price):
+        if self.price is None:
+            return True
+        return price >= self.price if self.sell else price <= self.price
+
+    def fill(self, lots, price, trade_id):
+        self.filled += lots
+        self.notional += price * lots
+        self.status = FILLED if self.remaining == 0 else PARTIALLY_FILLED
+        trade = Trade(trade_id, price, lots * self.listing.lot)
+        self.trades.append(trade)
+        return self, trade
+
+
+class StopOrder(NamedTuple):
+    stop_order_id: str
+    listing: Listing
+    sell: bool
+    lots: int
+    stop_price: Decimal
+    price: Optional[Decimal]
+    kind: str
+
+    def triggered(self, last_price):
+        if (self.kind == TAKE_PROFIT) == self.sell:
+            return last_price >= self.stop_price
+        return last_price <= self.stop_price
+
+
+class Position:
+    def __init__(self, quantity=0, price=Decimal('0')) -> None:
+        self.quantity = quantity
+        self.average_price = Decimal(price)
+
+    def apply(self, quantity, price):
+        total = self.quantity + quantity
+        if total == 0:
+            self.average_price = Decimal('0')
+        elif self.quantity * quantity >= 0:
+            self.average_price = (
+                self.average_price * self.quantity + price * quantity
+            ) / total
+        elif self.quantity * total < 0:
+            self.average_price = price
+        self.quantity = total
+
+
+class Book:
+    def __init__(self, listing, path, levels, level_lots, spread_ticks):
+        self.listing = listing
+        self.path = path
+        self.last_price = path.price
+        self._levels = levels
+        self._level_lots = level_lots
+        self._spread_ticks = spread_ticks
+        self._resting = {True: [], False: []}
+        self._quotes = {True: deque(), False: deque()}
+        self.refresh()
+
+    @property
+    def mid(self):
+        increment = self.listing.min_price_increment
+        return (self.path.price / increment).to_integral_value() * increment
+
+    def refresh(self):
+        increment = self.listing.min_price_increment
+        for sell, sign in ((True, 1), (False, -1)):
+            self._quotes[sell] = deque(
+                Quote(
+                    self.mid + sign * (self._spread_ticks + level) * increment,
+                    self._level_lots,
+                )
+                for level in range(self._levels)
+            )
+
+    def rest(self, order):
+        key = order.price if order.sell else -order.price
+        heapq.heappush(self._resting[order.sell], (key, order.seq, order))
+
+    def match(self, taker, trade_ids):
+        fills = []
+        maker = self._best_maker(not taker.sell)
+        while taker.remaining and maker and taker.crosses(maker.price):
+            fills += self._trade(taker, maker, maker.price, trade_ids)
+            maker = self._best_maker(not taker.sell)
+        return fills
+
+    def sweep(self, trade_ids):
+        fills = []
+        for sell in (True, False):
+            order, quote = self._peek_resting(sell), self._peek_quote(not sell)
+            while order and quote and order.crosses(quote.price):
+                fills += self._trade(order, quote, order.price, trade_ids)
+                order = self._peek_resting(sell)
+                quote = self._peek_quote(not sell)
+        return fills
+
+    def depth(self, sell, depth):
+        levels = {}
+        for _, _, order in self._resting[sell]:
+            if order.active:
+                levels[order.price] = levels.get(order.price, 0) + (
+                    order.remaining
+                )
+        for quote in self._quotes[sell]:
+            levels[quote.price] = levels.get(quote.price, 0) + quote.remaining
+        prices = sorted(levels, reverse=not sell)[:depth]
+        return [(price, levels[price]) for price in prices if levels[price]]
+
+    def _trade(self, taker, maker, price, trade_ids):
+        lots = min(taker.remaining, maker.remaining)
+        self.last_price = price
+        fills = [
+            party.fill(lots, price, str(next(trade_ids)))
+            for party in (taker, maker)
+        ]
+        return [fill for fill in fills if fill is not None]
+
+    def _best_maker(self, sell):
+        makers = [
+            maker
+            for maker in (self._peek_resting(sell), self._peek_quote(sell))
+            if maker is not None
+        ]
+        if not makers:
+            return None
+        return min(makers, key=lambda maker: maker.price * (1 if sell else -1))
+
+    def _peek_resting(self, sell):
+        resting = self._resting[sell]
+        while resting and not resting[0][2].active:
+            heapq.heappop(resting)
+        return resting[0][2] if resting else None
+
+    def _peek_quote(self, sell):
+        quotes = self._quotes[sell]
+        while quotes and not quotes[0].remaining:
+            quotes.popleft()
+        return quotes[0] if quotes else None
+
+
+class Market:
+    def __init__(
+        self,
+        listings,
+        paths=None,
+        positions=None,
+        levels=10,
+        level_lots=1000,
+        spread_ticks=1,
+    ) -> None:
+        paths = paths or {}
+        self.listings = {listing.figi: listing for listing in listings}
+        self.books = {
+            listing.figi: Book(
+                listing,
+                paths.get(listing.figi) or PricePath([listing.price]),
+                levels,
+                level_lots,
+                spread_ticks,
+            )
+            for listing in listings
+        }
+        self.orders = {}
+        self.stop_orders = {}
+        self.positions = dict(positions or {})
+        self._uids = {listing.uid: listing.figi for listing in listings}
+        self._order_ids = itertools.count(1)
+        self._sequence = itertools.count()
+        self._trade_ids = itertools.count(1)
+        self._watchers = set()
+
+    def figi(self, instrument_id):
+        if instrument_id in self.listings:
+            return instrument_id
+        return self._uids[instrument_id]
+
+    def last_price(self, figi):
+        return self.books[figi].last_price
+
+    def order_book(self, figi, depth):
+        book = self.books[figi]
+        return book.depth(False, depth), book.depth(True, depth)
+
+    def watch(self):
+        queue = asyncio.Queue()
+        self._watchers.add(queue)
+        return queue
+
+    def unwatch(self, queue):
+        self._watchers.discard(queue)
+
+    def step(self):
+        for figi, book in self.books.items():
+            book.path.advance()
+            book.refresh()
+            book.last_price = book.mid
+            self._settle(book.sweep(self._trade_ids))
+        self._trigger_stops()
+        for figi in self.books:
+            self._publish(MarketEvent(figi))
+
+    def post_order(self, figi, sell, lots, price=None):
+        order = Order(
+            str(next(self._order_ids)),
+            self.listings[figi],
+            sell,
+            lots,
+            price,
+            next(self._sequence),
+        )
+        self.orders[order.order_id] = order
+        book = self.books[figi]
+        self._settle(book.match(order, self._trade_ids))
+        if order.active and price is None:
+            order.status = CANCELLED
+        elif order.active:
+            book.rest(order)
+        self._publish(MarketEvent(figi))
+        return order
+
+    def cancel_order(self, order_id):
+        order = self.orders.get(order_id)
+        if order is None or not order.active:
+            raise KeyError(order_id)
+        order.status = CANCELLED
+        self._publish(MarketEvent(order.figi))
+        return order
+
+    def post_stop_order(self, figi, sell, lots, stop_price, price, kind):
+        stop_order = StopOrder(
+            str(next(self._order_ids)),
+            self.listings[figi],
+            sell,
+            lots,
+            stop_price,
+            price,
+            kind,
+        )
+        self.stop_orders[stop_order.stop_order_id] = stop_order
+        return stop_order
+
+    def cancel_stop_order(self, stop_order_id):
+        return self.stop_orders.pop(stop_order_id)
+
+    def _trigger_stops(self):
+        for stop_order in list(self.stop_orders.values()):
+            figi = stop_order.listing.figi
+            if stop_order.triggered(self.last_price(figi)):
+                del self.stop_orders[stop_order.stop_order_id]
+                price = None if stop_order.kind == STOP_LOSS else (
+                    stop_order.price or None
+                )
+                self.post_order(figi, stop_order.sell, stop_order.lots, price)
+
+    def _settle(self, fills):
+        for order, trade in fills:
+            position = self.positions.setdefault(order.figi, Position())
+            sign = -1 if order.sell else 1
+            position.apply(sign * trade.quantity, trade.price)
+            self._publish(MarketEvent(order.figi, order, (trade,)))
+
+    def _publish(self, event):
+        for queue in self._watchers:
+            queue.put_nowait(event)
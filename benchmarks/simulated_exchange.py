@@ -0,0 +1,165 @@
+import asyncio
+import itertools
+import random
+from collections import Counter
+from decimal import Decimal
+from types import SimpleNamespace
+
+from tinkoff.invest.schemas import OrderExecutionReportStatus as Status
+from tinkoff.invest.utils import decimal_to_quotation, quotation_to_decimal
+from tools import classes
+from tools.executions import EXECUTIONS
+from tools.market_data import ORDER_BOOKS
+from tools.write_behind import PERSISTENCE
+
+SPREAD_TICKS = 1
+
+
+class RestingOrder:
+    def __init__(self, order_id, figi, sell, quantity, price, lot):
+        self.order_id = order_id
+        self.figi = figi
+        self.sell = sell
+        self.quantity = quantity
+        self.price = price
+        self.lot = lot
+        self.executed = 0
+        self.status = Status.EXECUTION_REPORT_STATUS_NEW
+
+
+class SimulatedExchange:
+    def __init__(self, figis, seed=0, tick=0.05, rpc_latency=0.0):
+        self._random = random.Random(seed)
+        self._tick = tick
+        self._rpc_latency = rpc_latency
+        self._ids = itertools.count()
+        self._trade_ids = itertools.count()
+        self._orders = {}
+        self._trades = asyncio.Queue()
+        self.mids = {
+            figi: Decimal(self._random.randint(100, 1000)) for figi in figis
+        }
+        self.calls = Counter()
+
+    def install(self):
+        classes.place_order = self.place_order
+        classes.cancel_order = self.cancel_order
+        classes.get_execution_report = self.get_execution_report
+        classes.get_price_from_order_book = self.get_price_from_order_book
+        classes.Spread.is_trading_now = property(lambda spread: True)
+        PERSISTENCE.write = self.patch_backend
+        ORDER_BOOKS._listen = self.order_book_stream
+        EXECUTIONS._listen = self.trades_stream
+
+    def bid(self, figi):
+        return self.mids[figi] - SPREAD_TICKS
+
+    def ask(self, figi):
+        return self.mids[figi] + SPREAD_TICKS
+
+    async def _rpc(self, method):
+        self.calls[method] += 1
+        if self._rpc_latency:
+            await asyncio.sleep(self._rpc_latency)
+
+    async def get_price_from_order_book(self, asset):
+        await self._rpc('GetOrderBook')
+        price = self.ask(asset.figi) if asset.sell else self.bid(asset.figi)
+        return decimal_to_quotation(price)
+
+    async def place_order(self, asset, order_type):
+        await self._rpc('PostOrder')
+        order = RestingOrder(
+            str(next(self._ids)),
+            asset.figi,
+            asset.sell,
+            asset.get_lots(asset.next_order_amount),
+            quotation_to_decimal(asset.price),
+            asset.lot,
+        )
+        self._orders[order.order_id] = order
+        if order_type == 'market' or self._crosses(order):
+            self._fill(order)
+        return self._order_state(order)
+
+    async def cancel_order(self, order_id):
+        await self._rpc('CancelOrder')
+        order = self._orders[order_id]
+        if order.status == Status.EXECUTION_REPORT_STATUS_NEW:
+            order.status = Status.EXECUTION_REPORT_STATUS_CANCELLED
+
+    async def get_execution_report(self, order_id):
+        await self._rpc('GetOrderState')
+        return self._order_state(self._orders[order_id])
+
+    async def patch_backend(self, updates):
+        self.calls['PATCH progress'] += 1
+        return True
+
+    async def order_book_stream(self):
+        while True:
+            self._move_prices()
+            self._match_resting_orders()
+            for figi in ORDER_BOOKS.figis:
+                ORDER_BOOKS._on_order_book(self._order_book(figi))
+            await asyncio.sleep(self._tick)
+
+    async def trades_stream(self):
+        EXECUTIONS._on_response(SimpleNamespace(order_trades=None))
+        while True:
+            EXECUTIONS._on_response(await self._trades.get())
+
+    def _move_prices(self):
+        for figi in self.mids:
+            self.mids[figi] += self._random.choice((-1, 0, 1))
+
+    def _match_resting_orders(self):
+        for order in self._orders.values():
+            if (
+                order.status == Status.EXECUTION_REPORT_STATUS_NEW
+                and self._crosses(order)
+            ):
+                self._fill(order)
+
+    def _crosses(self, order):
+        if order.sell:
+            return self.bid(order.figi) >= order.price
+        return self.ask(order.figi) <= order.price
+
+    def _fill(self, order):
+        order.executed = order.quantity
+        order.status = Status.EXECUTION_REPORT_STATUS_FILL
+        order.price = self.bid(order.figi) if order.sell else self.ask(
+            order.figi
+        )
+        self._trades.put_nowait(
+            SimpleNamespace(
+                order_trades=SimpleNamespace(
+                    order_id=order.order_id,
+                    trades=[
+                        SimpleNamespace(
+                            trade_id=str(next(self._trade_ids)),
+                            quantity=order.quantity * order.lot,
+                            price=decimal_to_quotation(order.price),
+                        )
+                    ],
+                )
+            )
+        )
+
+    def _order_state(self, order):
+        return SimpleNamespace(
+            order_id=order.order_id,
+            execution_report_status=order.status,
+            lots_requested=order.quantity,
+            lots_executed=order.executed,
+            executed_order_price=decimal_to_quotation(order.price),
+            average_position_price=decimal_to_quotation(order.price),
+        )
+
+    def _order_book(self, figi):
+        return SimpleNamespace(
+            figi=figi,
+            bids=[SimpleNamespace(price=decimal_to_quotation(self.bid(figi)))],
+            asks=[SimpleNamespace(price=decimal_to_quotation(self.ask(figi)))],
+        )
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import statistics
+import time
+from decimal import Decimal
+
+from spreads import SpreadEngine
+from tools.classes import Asset, Spread
+from tools.write_behind import PERSISTENCE
+
+from benchmarks.simulated_exchange import SimulatedExchange
+
+
+def figi(ticker):
+    return f'BBG{ticker:0>9}'
+
+
+def make_asset(ticker, sell, amount, asset_type):
+    return Asset(
+        ticker=ticker,
+        figi=figi(ticker),
+        min_price_increment=Decimal('1'),
+        lot=1,
+        sell=sell,
+        amount=amount,
+        asset_type=asset_type,
+    )
+
+
+def make_spreads(count, underlyings, exchange):
+    spreads = []
+    for number in range(count):
+        base = number % underlyings
+        far = make_asset(f'F{base}', True, 10, 'F')
+        near = make_asset(f'S{base}', False, 10, 'S')
+        delta = exchange.mids[far.figi] - exchange.mids[near.figi]
+        spreads.append(
+            Spread(far, near, True, int(delta), number, 1, far.amount)
+        )
+    return spreads
+
+
+def instrument_figis(underlyings):
+    return [
+        figi(f'{prefix}{base}')
+        for base in range(underlyings)
+        for prefix in 'FS'
+    ]
+
+
+def time_passes(engine, durations):
+    schedule = engine._schedule
+
+    async def timed():
+        start = time.perf_counter()
+        await schedule()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    engine._schedule = timed
+
+
+async def main(count, underlyings, seconds, latency):
+    exchange = SimulatedExchange(
+        instrument_figis(underlyings), rpc_latency=latency
+    )
+    exchange.install()
+    spreads = make_spreads(count, underlyings, exchange)
+    engine = SpreadEngine(spreads)
+    durations = []
+    time_passes(engine, durations)
+    try:
+        await asyncio.wait_for(engine.run(), seconds)
+    except asyncio.TimeoutError:
+        pass
+    await PERSISTENCE.drain()
+    done = sum(spread.executed >= spread.amount for spread in spreads)
+    percentiles = statistics.quantiles(durations, n=100)
+    print(
+        f'{count} spreads over {underlyings * 2} instruments, '
+        f'{seconds}s, rpc latency={latency}s'
+    )
+    print(f'completed spreads: {done}/{count}')
+    print(
+        f'scheduling passes: {len(durations)} '
+        f'p50={percentiles[49]:.2f}ms p99={percentiles[98]:.2f}ms'
+    )
+    for method, calls in sorted(exchange.calls.items()):
+        print(f'{method:<14} {calls}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Spread engine under load against a simulated exchange.'
+    )
+    parser.add_argument('--spreads', type=int, default=50)
+    parser.add_argument('--underlyings', type=int, default=10)
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--latency', type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.spreads, args.underlyings, args.seconds, args.latency)
+    )
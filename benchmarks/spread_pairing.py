@@ -0,0 +1,64 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from scanner.scanner import FutureData, SpreadScanner, StockData
+
+
+def universe(futures, per_asset, seed=0):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    stocks, result = [], []
+    for number in range(futures // per_asset):
+        ticker = f'S{number:04}'
+        price = rng.randint(50, 5000)
+        stocks.append(StockData(f'BBG{ticker}', ticker, Decimal(price)))
+        for month in range(1, per_asset + 1):
+            result.append(
+                FutureData(
+                    figi=f'FUT{ticker}{month}',
+                    ticker=f'{ticker}F{month}',
+                    price=Decimal(price * 100 + rng.randint(-500, 2000)),
+                    basic_asset=ticker,
+                    basic_asset_size=100,
+                    expiration_date=now + timedelta(days=90 * month),
+                    short_enabled=True,
+                )
+            )
+    return stocks, result
+
+
+def build(stocks, futures):
+    scanner = SpreadScanner()
+    scanner._stocks, scanner._futures = stocks, futures
+    start = time.perf_counter()
+    scanner._build_spreads()
+    return (time.perf_counter() - start) * 1000, len(scanner._spreads)
+
+
+def main(sizes, per_asset):
+    print(
+        f'{"futures":>8}{"all pairs":>12}{"spreads":>9}'
+        f'{"build ms":>10}{"us/spread":>11}'
+    )
+    for size in sizes:
+        stocks, futures = universe(size, per_asset)
+        elapsed, spreads = build(stocks, futures)
+        print(
+            f'{len(futures):>8}{len(futures) ** 2:>12}{spreads:>9}'
+            f'{elapsed:>10.2f}{elapsed * 1000 / spreads:>11.2f}'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='SpreadScanner pairing time against universe size.'
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[500, 1000, 2000, 5000]
+    )
+    parser.add_argument('--per-asset', type=int, default=4)
+    args = parser.parse_args()
+    main(args.sizes, args.per_asset)
@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from abc import ABC, abstractmethod
+from collections import Counter
+
+import spreads
+from scanner.scanner import DividendScanner, SpreadScanner
+from sellbuy import sellbuy_cycle
+from settings import TCS_RO_TOKEN, TCS_RW_TOKEN
+from tools import classes, clients
+from tools.classes import Asset, Spread
+from tools.write_behind import PERSISTENCE
+
+from benchmarks.fake_server import BackgroundServer, FakeTinkoffServer
+from benchmarks.market import Market, synthetic_listings, synthetic_paths
+
+TRACE_FRAMES = 25
+BROKER_SIDE = [
+    tracemalloc.Filter(False, pattern, all_frames=True)
+    for pattern in (
+        '*benchmarks/fake_server.py', '*benchmarks/market.py',
+        '*grpc/aio/_server.py',
+    )
+]
+
+
+def asset_from(listing, sell=True):
+    return Asset(
+        ticker=listing.ticker,
+        figi=listing.figi,
+        min_price_increment=listing.min_price_increment,
+        lot=listing.lot,
+        sell=sell,
+        amount=10**9,
+        asset_type='F' if listing.kind == 'future' else 'S',
+    )
+
+
+def first_future_pairs(market, count):
+    shares = {
+        listing.ticker: listing
+        for listing in market.listings.values()
+        if listing.kind == 'share'
+    }
+    pairs = [
+        (listing, shares[listing.basic_asset])
+        for listing in market.listings.values()
+        if listing.kind == 'future' and listing.basic_asset in shares
+    ]
+    return pairs[:count]
+
+
+class Scenario(ABC):
+    name = ''
+
+    def __init__(self, broker) -> None:
+        self.broker = broker
+
+    @property
+    def market(self):
+        return self.broker.server.market
+
+    async def setup(self):
+        pass
+
+    async def teardown(self):
+        pass
+
+    @abstractmethod
+    async def cycle(self):
+        pass
+
+
+class SellBuyCycle(Scenario):
+    name = 'sellbuy_cycle'
+
+    async def setup(self):
+        future, _ = first_future_pairs(self.market, 1)[0]
+        self.asset = asset_from(future)
+
+    async def cycle(self):
+        self.broker.step()
+        await sellbuy_cycle(self.asset)
+        self.asset.last_price = self.asset.new_price
+
+
+class SpreadEngineCycle(Scenario):
+    name = 'spread_engine_pass'
+    spreads = 10
+
+    async def setup(self):
+        self.engine = spreads.SpreadEngine(
+            [
+                self._spread(number, future, share)
+                for number, (future, share) in enumerate(
+                    first_future_pairs(self.market, self.spreads)
+                )
+            ]
+        )
+        self.workers = [
+            asyncio.create_task(self.engine._work())
+            for _ in range(self.engine._workers)
+        ]
+
+    async def teardown(self):
+        for worker in self.workers:
+            worker.cancel()
+
+    async def cycle(self):
+        self.broker.step()
+        await self.engine._schedule()
+        await self.engine._queue.join()
+
+    def _spread(self, number, future, share):
+        ratio = future.basic_asset_size
+        delta = self.market.last_price(future.figi) - (
+            self.market.last_price(share.figi) * ratio
+        )
+        return Spread(
+            asset_from(future),
+            asset_from(share, sell=False),
+            True,
+            int(delta),
+            number,
+            ratio,
+            10**9,
+        )
+
+
+class SpreadScannerCycle(Scenario):
+    name = 'spread_scanner'
+
+    async def cycle(self):
+        await SpreadScanner('0').scan_spreads()
+
+
+class DividendScannerCycle(Scenario):
+    name = 'dividend_scanner'
+
+    async def cycle(self):
+        await DividendScanner(50).scan_spreads()
+
+
+SCENARIOS = (
+    SellBuyCycle, SpreadEngineCycle, SpreadScannerCycle, DividendScannerCycle
+)
+
+
+def point_bot_at(target):
+    clients.CLIENTS.ro = clients.PooledClient(TCS_RO_TOKEN, target=target)
+    clients.CLIENTS.rw = clients.PooledClient(TCS_RW_TOKEN, target=target)
+    classes.Spread.is_trading_now = property(lambda spread: True)
+    PERSISTENCE.write = skip_backend
+
+
+async def skip_backend(*args):
+    return True
+
+
+def percentile(timings, point):
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=100)[point - 1]
+
+
+async def time_cycles(scenario, cycles):
+    timings, rpcs = [], Counter()
+    for _ in range(cycles):
+        before = Counter(scenario.broker.server.calls)
+        start = time.perf_counter()
+        await scenario.cycle()
+        timings.append((time.perf_counter() - start) * 1000)
+        rpcs += scenario.broker.server.calls - before
+    return timings, rpcs
+
+
+async def trace_allocations(scenario):
+    tracemalloc.start(TRACE_FRAMES)
+    before = tracemalloc.take_snapshot().filter_traces(BROKER_SIDE)
+    await scenario.cycle()
+    after = tracemalloc.take_snapshot().filter_traces(BROKER_SIDE)
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    return {
+        'alloc_kib': round(
+            sum(max(stat.size_diff, 0) for stat in stats) / 1024, 1
+        ),
+        'alloc_blocks': sum(max(stat.count_diff, 0) for stat in stats),
+    }
+
+
+async def run_scenario(scenario, cycles):
+    await scenario.setup()
+    try:
+        start = time.perf_counter()
+        timings, rpcs = await time_cycles(scenario, cycles)
+        wall = time.perf_counter() - start
+        allocations = await trace_allocations(scenario)
+    finally:
+        await scenario.teardown()
+    return {
+        'cycles': cycles,
+        'wall_s': round(wall, 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'rpcs_per_cycle': round(sum(rpcs.values()) / cycles, 2),
+        'rpcs_by_method': {
+            method: round(count / cycles, 2)
+            for method, count in sorted(rpcs.items())
+        },
+        **allocations,
+    }
+
+
+async def run_size(broker, size, args):
+    point_bot_at(broker.server.target)
+    results = {}
+    for scenario_class in SCENARIOS:
+        if args.only and scenario_class.name not in args.only:
+            continue
+        cycles = (
+            args.scan_cycles
+            if scenario_class.name.endswith('scanner')
+            else args.cycles
+        )
+        results[f'{scenario_class.name}@{size}'] = await run_scenario(
+            scenario_class(broker), cycles
+        )
+    await clients.CLIENTS.close()
+    return results
+
+
+def run_suite(args):
+    results = {}
+    for size in args.shares:
+        listings = synthetic_listings(size, args.futures, args.seed)
+        steps = 2 * (args.cycles + args.scan_cycles) + 2
+        market = Market(listings, synthetic_paths(listings, steps, args.seed))
+        with BackgroundServer(
+            FakeTinkoffServer(args.latency, market)
+        ) as broker:
+            results.update(asyncio.run(run_size(broker, size, args)))
+    return results
+
+
+def commit():
+    return subprocess.run(
+        ['git', 'rev-parse', '--short', 'HEAD'],
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def report(results):
+    print(
+        f'{"scenario":<28}{"p50 ms":>10}{"p99 ms":>10}'
+        f'{"rpc/cycle":>11}{"alloc KiB":>11}{"wall s":>9}'
+    )
+    for name, result in results.items():
+        print(
+            f'{name:<28}{result["p50_ms"]:>10}{result["p99_ms"]:>10}'
+            f'{result["rpcs_per_cycle"]:>11}{result["alloc_kib"]:>11}'
+            f'{result["wall_s"]:>9}'
+        )
+
+
+def compare(results, baseline_file):
+    with open(baseline_file) as file:
+        baseline = json.load(file)
+    print(f'\nchange against {baseline["commit"] or baseline_file}:')
+    for name, result in results.items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        changes = ', '.join(
+            f'{key} {change(old[key], result[key])}'
+            for key in ('p50_ms', 'p99_ms', 'rpcs_per_cycle', 'alloc_kib')
+        )
+        print(f'{name:<28}{changes}')
+
+
+def change(old, new):
+    if not old:
+        return f'{old} -> {new}'
+    return f'{(new - old) / old * 100:+.1f}%'
+
+
+def main(args):
+    results = run_suite(args)
+    report(results)
+    if args.compare:
+        compare(results, args.compare)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(
+                {
+                    'commit': commit(),
+                    'python': platform.python_version(),
+                    'latency': args.latency,
+                    'scenarios': results,
+                },
+                file,
+                indent=2,
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Trading loop and scanner benchmarks on a fake broker.'
+    )
+    parser.add_argument('--shares', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--futures', type=int, default=3)
+    parser.add_argument('--cycles', type=int, default=200)
+    parser.add_argument('--scan-cycles', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='*')
+    parser.add_argument('--json')
+    parser.add_argument('--compare')
+    main(parser.parse_args())
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+from settings import JOB_POLL_PAUSE, JOB_WAIT_TIMEOUT
+from tools.get_patch_prepare_data import (async_get_api_data,
+                                          async_post_api_data)
+
+UNFINISHED = ('pending', 'running')
+
+
+def job_report(job):
+    if job['status'] in UNFINISHED:
+        return (
+            f'Job {job["kind"]} #{job["id"]} is still {job["status"]} after '
+            f'{JOB_WAIT_TIMEOUT} s: {job["done"]}/{job["total"]} done. '
+            'Check that the jobs worker is running.'
+        )
+    return (
+        f'Job {job["kind"]} {job["status"]}: '
+        f'{job["done"]}/{job["total"]} done, {job["failed"]} failed.\n'
+        f'{job["result"]}\n{job["errors"]}'
+    ).strip()
+
+
+async def enqueue_job(kind):
+    status, job = await async_post_api_data('jobs', json={'kind': kind})
+    if status != HTTPStatus.ACCEPTED:
+        raise ValueError(f'Job {kind} was not accepted: {job}')
+    return job
+
+
+async def await_job(job, timeout=JOB_WAIT_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while job['status'] in UNFINISHED and time.monotonic() < deadline:
+        await asyncio.sleep(JOB_POLL_PAUSE)
+        job = await async_get_api_data('jobs', job['id'])
+    return job
+
+
+async def backend_job(command, args):
+    job = await enqueue_job(command)
+    try:
+        job = await await_job(job)
+    except asyncio.CancelledError:
+        return (
+            f'Stopped waiting for job {job["kind"]} #{job["id"]}, '
+            'it keeps running in the backend.'
+        )
+    return job_report(job)[:4000]
@@ -1,17 +1,18 @@
 import asyncio
-from urllib.error import HTTPError
 
+import aiohttp
 from aiogram import types
+from backend_jobs import backend_job
 from bot_init import dp
 from cancel_all_orders import cancel_orders
 from grpc.aio._call import AioRpcError
 from instant_commands import (check_health, get_current_spread_prices, help,
                               test)
 from place_stops import place_stops, process_nuke_command
+from scanner.live import live_scan
 from scanner.scanner import dividend_scan, scan
 from sellbuy import sellbuy
 from spreads import spreads
-from stop_orders import restore_stops, save_stops
 
 RUNNING_TASKS = {}
 
@@ -48,8 +49,9 @@ ROUTINES = {
     'stops': ('Placing long stops', place_stops),
     'nuke': ('Nuke', process_nuke_command),
     'shorts': ('Placing short stops', place_stops),
-    'stash': ('Saving stop orders to db', save_stops),
-    'restore': ('Restoring stop orders', restore_stops),
+    'stash': ('Saving stop orders to db', backend_job),
+    'restore': ('Restoring stop orders', backend_job),
+    'update': ('Updating instruments', backend_job),
     'sellbuy': ('SellBuy', sellbuy),
     'spreads': ('Spreads monitoring and trading', spreads),
     'help': ('Help', help),
@@ -61,7 +63,9 @@ ROUTINES = {
     'buy': ('Buy ASAP', sellbuy),
     'dump': ('Dump it', sellbuy),
     'scan': ('Spread scanner', scan),
-    'dscan': ('Dividend scanner', dividend_scan)
+    'dscan': ('Dividend scanner', dividend_scan),
+    'lscan': ('Live spread scanner', live_scan),
+    'ldscan': ('Live dividend scanner', live_scan),
 }
 
 
@@ -106,7 +110,7 @@ class CommandHandler:
             AioRpcError,
             AttributeError,
             ValueError,
-            HTTPError,
+            aiohttp.ClientError,
             ConnectionError,
             KeyError
         ) as error:
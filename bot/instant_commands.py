@@ -4,6 +4,7 @@ from http import HTTPStatus
 import aiohttp.client_exceptions
 from spreads import get_delta_prices, get_spread_prices
 from tools.classes import Asset
+from tools.fixed_point import NANO, to_decimal
 from tools.get_patch_prepare_data import (async_check_health,
                                           async_get_api_data,
                                           prepare_spreads_data)
@@ -17,7 +18,7 @@ async def test(command, args):
     s = Asset(
         ticker='', figi='', min_price_increment=Decimal('0'), lot=0, id=1
     )
-    s.order_cache.update('1', 50, Decimal('100'))
+    s.order_cache.update('1', 50, 100 * NANO)
     return await async_patch_sellbuy(s)
 
 
@@ -34,7 +35,7 @@ async def get_spread_price(spread):
         await get_spread_prices(spread)
     except (ValueError, AttributeError) as error:
         return f'{spread}:, {error}'
-    return f'{spread}: current: {get_delta_prices(spread)}'
+    return f'{spread}: current: {to_decimal(get_delta_prices(spread))}'
 
 
 async def get_current_spread_prices(command, args):
@@ -64,7 +65,8 @@ async def help(command, args):
     return (
         'Bot is operational! The commands are:\n'
         'stops, shorts,\n'
-        'restore, sellbuy,\n'
+        'stash, restore, update,\n'
+        'sellbuy,\n'
         'monitor,\n'
         'stop, cancel'
     )
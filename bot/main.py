@@ -8,6 +8,7 @@ from bot_init import dp
 from queue_handler import QUEUE, worker
 from settings import (TCS_ACCOUNT_ID, TCS_RO_TOKEN, TCS_RW_TOKEN,
                       TELEGRAM_CHAT_ID, TELEGRAM_TOKEN)
+from tools.loop_monitor import monitor_loop_lag
 
 __all__ = ('commands',)
 
@@ -56,5 +57,6 @@ if __name__ == '__main__':
 
     loop.create_task(send_greetings())
     loop.create_task(worker())
+    loop.create_task(monitor_loop_lag())
     loop.create_task(executor.start_polling(dp, skip_updates=True), name='bot')
     loop.run_forever()
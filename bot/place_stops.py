@@ -1,12 +1,15 @@
+import logging
 from decimal import Decimal
 
-from settings import LONG_LEVELS, NUKE_LEVELS, SHORT_LEVELS, STOPS_SUM
+from settings import (LONG_LEVELS, NUKE_LEVELS, SHORT_LEVELS,
+                      STOPS_CONCURRENCY, STOPS_SUM)
 from tools.classes import StopOrder, StopOrderParams
 from tools.get_patch_prepare_data import (async_get_api_data,
                                           get_current_prices,
                                           parse_ticker_info,
                                           prepare_asset_data)
 from tools.orders import place_stop_order
+from tools.throttling import STOP_ORDERS_BUCKET, gather_limited
 from tools.utils import parse_ticker_int_args
 
 LONG_STOP_PARAMS = StopOrderParams('buy', 'take_profit', 'gtd')
@@ -16,12 +19,35 @@ LEVELS = {
     'shorts': [str(-int(level)) for level in SHORT_LEVELS],
 }
 PARAMS = {'stops': LONG_STOP_PARAMS, 'shorts': SHORT_STOP_PARAMS}
+FAILURES_TO_REPORT = 10
 
 
 def sum_is_valid(asset, sum) -> bool:
     return sum > asset.price * asset.lot
 
 
+async def try_place_stop_order(order):
+    await STOP_ORDERS_BUCKET.acquire()
+    try:
+        await place_stop_order(order)
+    except Exception as error:
+        logging.warning(f'Stop for {order.asset.ticker}: {error}')
+        return error
+    return None
+
+
+def failures_report(orders, errors):
+    failures = [
+        f'{order.asset.ticker} at {order.price:.2f}: {error}'
+        for order, error in zip(orders, errors)
+        if error is not None
+    ]
+    if len(failures) > FAILURES_TO_REPORT:
+        hidden = len(failures) - FAILURES_TO_REPORT
+        failures = failures[:FAILURES_TO_REPORT] + [f'...and {hidden} more']
+    return ''.join(f'\n{failure}' for failure in failures)
+
+
 async def process_stops(assets, levels, sum, params):
     orders = []
     for asset in assets:
@@ -30,19 +56,21 @@ async def process_stops(assets, levels, sum, params):
                 (Decimal('100') - Decimal(discount)) * asset.price / 100
             )
             orders.append(StopOrder(asset, stop_price, sum, params))
-    orders_placed = 0
-    for order in orders:
-        await place_stop_order(order)
-        orders_placed += 1
+    errors = await gather_limited(
+        try_place_stop_order, orders, STOPS_CONCURRENCY
+    )
+    failed = len(errors) - errors.count(None)
     return (
-        f'Stop placement complete. {orders_placed} stops placed.\n'
+        f'Stop placement complete. {len(orders) - failed} stops placed, '
+        f'{failed} failed.\n'
         f'Levels in %: {levels}, sum: {sum}'
+        f'{failures_report(orders, errors)}'
     )
 
 
 async def place_stops(command, args):
     data = await async_get_api_data(command)
-    assets = get_current_prices(prepare_asset_data(data))
+    assets = await get_current_prices(prepare_asset_data(data))
     levels = LEVELS[command]
     params = PARAMS[command]
     return await process_stops(assets, levels, STOPS_SUM, params)
@@ -51,8 +79,8 @@ async def place_stops(command, args):
 async def process_nuke_command(command, args):
     args = parse_ticker_int_args(args)
     ticker, sum = args.ticker, args.sum
-    ticker_data = parse_ticker_info(ticker)
-    assets = get_current_prices(prepare_asset_data([ticker_data]))
+    ticker_data = await parse_ticker_info(ticker)
+    assets = await get_current_prices(prepare_asset_data([ticker_data]))
     asset = assets[0]
     stop_sum = sum // 4
     if not sum_is_valid(asset, stop_sum):
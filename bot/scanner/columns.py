@@ -0,0 +1,39 @@
+import numpy as np
+
+DAYS_IN_YEAR = 365
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+def column(values):
+    return np.fromiter((float(value) for value in values), dtype=np.float64)
+
+
+def days_till(moments, now):
+    seconds = column(moment.timestamp() for moment in moments)
+    return np.floor((seconds - now.timestamp()) / SECONDS_IN_DAY)
+
+
+def annualized_yields(profits, margins, days):
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        return (
+            np.power(1 + profits / margins, DAYS_IN_YEAR / days) - 1
+        ) * 100
+
+
+def dividend_yields(sell_prices, buy_prices, ratios, days, rate):
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        growth = np.power(1 + rate / 100, days / DAYS_IN_YEAR)
+        adjusted = sell_prices * ratios * growth
+        delta = buy_prices - adjusted
+        return np.where(
+            delta < 0, -delta / ratios / sell_prices * 100, -np.inf
+        )
+
+
+def top_k(values, k, mask):
+    candidates = np.flatnonzero(mask & np.isfinite(values))
+    if len(candidates) > k:
+        best = np.argpartition(-values[candidates], k - 1)[:k]
+        candidates = np.sort(candidates[best])
+    order = np.argsort(-values[candidates], kind='stable')
+    return candidates[order].tolist()
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from queue_handler import QUEUE
+from scanner.columns import top_k
+from scanner.scanner import DividendScanner, SpreadScanner
+from settings import LIVE_SCAN_PAUSE, LIVE_SCAN_RESULTS, STREAM_RECONNECT_PAUSE
+from tinkoff.invest import LastPriceInstrument
+from tinkoff.invest.utils import quotation_to_decimal
+from tools.clients import CLIENTS
+
+
+async def last_prices(figis):
+    async with CLIENTS.ro as client:
+        stream = client.create_market_data_stream()
+        stream.last_price.subscribe(
+            [LastPriceInstrument(figi=figi) for figi in figis]
+        )
+        async for market_data in stream:
+            if market_data.last_price is not None:
+                yield (
+                    market_data.last_price.figi,
+                    quotation_to_decimal(market_data.last_price.price),
+                )
+
+
+class LiveScanner:
+    def __init__(
+        self, scanner, limit=LIVE_SCAN_RESULTS, pause=LIVE_SCAN_PAUSE
+    ) -> None:
+        self._scanner = scanner
+        self._limit = limit
+        self._pause = pause
+        self._legs = {}
+        self._spreads_by_figi = defaultdict(set)
+        self._pending = {}
+        self._yields = None
+        self._top = []
+
+    async def run(self):
+        await self._scanner.prepare()
+        self._index_legs()
+        self._yields = self._scanner.count_yields()
+        await self._publish()
+        listener = asyncio.create_task(self._listen())
+        try:
+            while True:
+                await asyncio.sleep(self._pause)
+                if self._pending:
+                    self._recount()
+                    await self._publish()
+        finally:
+            listener.cancel()
+
+    def _index_legs(self):
+        for index, legs in enumerate(self._scanner.legs):
+            for leg in legs:
+                self._legs[leg.figi] = leg
+                self._spreads_by_figi[leg.figi].add(index)
+
+    async def _listen(self):
+        while True:
+            try:
+                async for figi, price in last_prices(list(self._legs)):
+                    self._pending[figi] = price
+            except Exception as error:
+                logging.warning(f'Live scanner stream dropped: {error}')
+            await asyncio.sleep(STREAM_RECONNECT_PAUSE)
+
+    def _recount(self):
+        pending, self._pending = self._pending, {}
+        touched = set()
+        for figi, price in pending.items():
+            self._scanner.update_price(self._legs[figi], price)
+            touched |= self._spreads_by_figi[figi]
+        indices = sorted(touched)
+        self._yields[indices] = self._scanner.count_yields(indices)
+
+    async def _publish(self):
+        top = top_k(
+            self._yields, self._limit, self._scanner.passes(self._yields)
+        )
+        entered = [index for index in top if index not in self._top]
+        left = [index for index in self._top if index not in top]
+        self._top = top
+        if entered or left:
+            await QUEUE.put(self._changes(entered, left))
+
+    def _changes(self, entered, left):
+        return '\n'.join(
+            [f'+ {line}' for line in self._scanner.render(entered)]
+            + [f'- {line}' for line in self._scanner.render(left)]
+        )
+
+    def summary(self):
+        top = self._scanner.render(self._top)
+        if not top:
+            return 'Live scan stopped, no matching spreads.'
+        return '\n'.join(['Live scan stopped, current top:'] + top)
+
+
+async def live_scan(command, args):
+    if command == 'ldscan':
+        scanner = DividendScanner(LIVE_SCAN_RESULTS)
+    else:
+        scanner = SpreadScanner(args)
+    live = LiveScanner(scanner)
+    try:
+        await live.run()
+    except asyncio.CancelledError:
+        return live.summary()
@@ -1,20 +1,29 @@
+from bisect import bisect_left
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import NamedTuple, Union
 
+import numpy as np
+from scanner.columns import (annualized_yields, column, days_till,
+                             dividend_yields, top_k)
 from settings import (CURRENT_INTEREST_RATE, MAX_FUTURES_AHEAD,
-                      PERCENT_THRESHOLD, TCS_RO_TOKEN)
+                      PERCENT_THRESHOLD, SCANNER_CONCURRENCY)
 from tinkoff.invest import Future, Share
-from tinkoff.invest.retrying.aio.client import AsyncRetryingClient
-from tinkoff.invest.retrying.settings import RetryClientSettings
 from tinkoff.invest.schemas import MoneyValue, Quotation, RealExchange
 from tinkoff.invest.utils import quotation_to_decimal
+from tools.clients import CLIENTS
 from tools.get_patch_prepare_data import (get_current_prices,
                                           get_current_prices_by_uid)
+from tools.instrument_cache import INSTRUMENT_CACHE
+from tools.throttling import (INSTRUMENTS_BUCKET, MARKET_DATA_BUCKET,
+                              gather_limited, log_duration, progress_logger)
 from tools.trading_hours import FutureTradingHours, StockTradingHours
 from tools.trading_time import SimpleTradingTime
 
+MAX_SPREAD_RESULTS = 70
+
 
 @dataclass
 class LegData:
@@ -122,31 +131,68 @@ class SpreadScanner:
         self._futures_with_counterparts = set()
 
     async def scan_spreads(self):
+        await self.prepare()
+        yields = self.count_yields()
+        result = self.render(
+            top_k(yields, MAX_SPREAD_RESULTS, self.passes(yields))
+        )
+        return '\n'.join(result) if result else 'No matching spreads found.'
+
+    async def prepare(self):
         await self._get_instrument_lists()
         self._prefilter_instruments()
         self._filter_out_stocks_without_futures()
         self._filter_out_futures_with_no_counterparts()
         self._build_stock_and_future_lists()
-        get_current_prices(self._stocks + self._futures)
+        await get_current_prices(self._stocks + self._futures)
         await self._get_margin_and_min_price_inc_amount()
         self._build_spreads()
-        self._count_potential_profits()
-        result = []
-        for spread in sorted(
-            self._spreads, key=lambda x: x.marginal_profit, reverse=True
-        ):
-            if spread.marginal_profit > self._rate:
-                result.append(
-                    f'{spread.near_leg.ticker} - {spread.far_leg.ticker}: '
-                    f'M = {spread.margin}, %={spread.marginal_profit} '
-                    f'delta = {spread.delta}, {spread.days} days.'
-                )
-        if len(result) > 70:
-            result = result[:70]
-        return '\n'.join(result) if result else 'No matching spreads found.'
 
-    def _count_potential_profits(self):
-        for spread in self._spreads:
+    @property
+    def legs(self):
+        return [(spread.near_leg, spread.far_leg) for spread in self._spreads]
+
+    def update_price(self, leg, price):
+        leg.price = price
+        if isinstance(leg, StockData):
+            leg.buy_margin = price
+        else:
+            leg.price = self._get_instrument_price(leg)
+
+    def passes(self, yields):
+        return np.round(yields, 2) > self._rate
+
+    def count_yields(self, indices=None):
+        spreads = self._spreads
+        if indices is not None:
+            spreads = [spreads[index] for index in indices]
+        far_legs = [spread.far_leg for spread in spreads]
+        near_legs = [spread.near_leg for spread in spreads]
+        ratios = column(spread.far_to_near_ratio for spread in spreads)
+        margins = column(leg.buy_margin for leg in near_legs) * ratios + (
+            column(leg.sell_margin for leg in far_legs)
+        )
+        profits = column(leg.price for leg in far_legs) - ratios * column(
+            leg.price for leg in near_legs
+        )
+        days = days_till(
+            [leg.expiration_date for leg in far_legs],
+            datetime.now(tz=timezone.utc),
+        )
+        return annualized_yields(profits, margins, days)
+
+    def render(self, indices):
+        spreads = [self._spreads[index] for index in indices]
+        self._count_potential_profits(spreads)
+        return [
+            f'{spread.near_leg.ticker} - {spread.far_leg.ticker}: '
+            f'M = {spread.margin}, %={spread.marginal_profit} '
+            f'delta = {spread.delta}, {spread.days} days.'
+            for spread in spreads
+        ]
+
+    def _count_potential_profits(self, spreads):
+        for spread in spreads:
             margin, profit, delta, days = ProfitCounter(
                 spread
             ).calculate_profit()
@@ -185,41 +231,52 @@ class SpreadScanner:
                 )
 
     def _build_spreads(self):
-        self._build_spreads_from_stocks()
-        self._build_spreads_from_futures()
+        futures_by_asset = self._index_futures()
+        self._build_spreads_from_stocks(futures_by_asset)
+        self._build_spreads_from_futures(futures_by_asset)
 
-    def _build_spreads_from_stocks(self):
-        for stock in self._stocks:
-            for future in self._futures:
-                if stock.ticker == future.basic_asset:
-                    self._spreads.append(
-                        YieldingSpread(
-                            far_leg=future,
-                            near_leg=stock,
-                            near_leg_type='S',
-                            far_to_near_ratio=future.basic_asset_size,
-                        )
-                    )
+    def _index_futures(self):
+        futures_by_asset = defaultdict(list)
+        for future in self._futures:
+            futures_by_asset[future.basic_asset].append(future)
+        for futures in futures_by_asset.values():
+            futures.sort(key=lambda future: future.expiration_date)
+        return futures_by_asset
 
-    def _build_spreads_from_futures(self):
-        for near_future in self._futures:
-            for far_future in self._futures:
-                if self._leg_combination_not_good(far_future, near_future):
-                    continue
+    def _build_spreads_from_stocks(self, futures_by_asset):
+        for stock in self._stocks:
+            for future in futures_by_asset.get(stock.ticker, []):
                 self._spreads.append(
                     YieldingSpread(
-                        far_leg=far_future,
-                        near_leg=near_future,
-                        near_leg_type='F',
-                        far_to_near_ratio=1,
+                        far_leg=future,
+                        near_leg=stock,
+                        near_leg_type='S',
+                        far_to_near_ratio=future.basic_asset_size,
                     )
                 )
 
+    def _build_spreads_from_futures(self, futures_by_asset):
+        for futures in futures_by_asset.values():
+            expirations = [future.expiration_date for future in futures]
+            for near_future in futures:
+                first = bisect_left(expirations, near_future.expiration_date)
+                for far_future in futures[first:]:
+                    if self._leg_combination_not_good(
+                        far_future, near_future
+                    ):
+                        continue
+                    self._spreads.append(
+                        YieldingSpread(
+                            far_leg=far_future,
+                            near_leg=near_future,
+                            near_leg_type='F',
+                            far_to_near_ratio=1,
+                        )
+                    )
+
     def _leg_combination_not_good(self, far_future, near_future):
         return (
             near_future is far_future
-            or near_future.basic_asset != far_future.basic_asset
-            or near_future.expiration_date > far_future.expiration_date
             or near_future.price >= far_future.price
             or near_future.price == Decimal('0')
             or far_future.price == Decimal('0')
@@ -260,18 +317,23 @@ class SpreadScanner:
         for instrument in self._stocks:
             instrument.buy_margin = self._get_instrument_price(instrument)
 
+        margins = await get_margin_responses(
+            [instrument.figi for instrument in self._futures]
+        )
         for instrument in self._futures:
-            response = await get_margin_response(instrument.figi)
-            instrument.buy_margin = quotation_to_decimal(
-                self._mv_to_q(response.initial_margin_on_buy)
-            )
-            instrument.sell_margin = quotation_to_decimal(
-                self._mv_to_q(response.initial_margin_on_sell)
-            )
-            instrument.min_price_increment_amount = quotation_to_decimal(
-                response.min_price_increment_amount
-            )
-            instrument.price = self._get_instrument_price(instrument)
+            self._update_margin(instrument, margins[instrument.figi])
+
+    def _update_margin(self, instrument, response):
+        instrument.buy_margin = quotation_to_decimal(
+            self._mv_to_q(response.initial_margin_on_buy)
+        )
+        instrument.sell_margin = quotation_to_decimal(
+            self._mv_to_q(response.initial_margin_on_sell)
+        )
+        instrument.min_price_increment_amount = quotation_to_decimal(
+            response.min_price_increment_amount
+        )
+        instrument.price = self._get_instrument_price(instrument)
 
     def _mv_to_q(self, mv: MoneyValue):
         return Quotation(units=mv.units, nano=mv.nano)
@@ -371,19 +433,33 @@ class ProfitCounter:
 
 
 async def get_margin_response(figi: str):
-    async with AsyncRetryingClient(
-        TCS_RO_TOKEN,
-        RetryClientSettings(use_retry=True, max_retry_attempt=10),
-    ) as client:
+    async with CLIENTS.ro as client:
         return await client.instruments.get_futures_margin(figi=figi)
 
 
+async def get_margin_responses(figis):
+    margins = INSTRUMENT_CACHE.get('margins') or {}
+    missing = [figi for figi in figis if figi not in margins]
+    if missing:
+        responses = await gather_limited(
+            get_margin_response,
+            missing,
+            SCANNER_CONCURRENCY,
+            INSTRUMENTS_BUCKET,
+            progress_logger('Futures margins'),
+        )
+        margins.update(zip(missing, responses))
+        INSTRUMENT_CACHE.set('margins', margins)
+    return margins
+
+
 async def get_api_response(instrument: str):
-    async with AsyncRetryingClient(
-        TCS_RO_TOKEN,
-        RetryClientSettings(use_retry=True, max_retry_attempt=10),
-    ) as client:
-        return await getattr(client.instruments, instrument)()
+    response = INSTRUMENT_CACHE.get(instrument)
+    if response is None:
+        async with CLIENTS.ro as client:
+            response = await getattr(client.instruments, instrument)()
+        INSTRUMENT_CACHE.set(instrument, response)
+    return response
 
 
 class DividendScanner:
@@ -392,52 +468,91 @@ class DividendScanner:
         self._result_limit = result_limit
 
     async def scan_spreads(self):
-        await self._load_instruments()
-        await self._prefilter_instruments()
-        self._generate_div_spreads()
-        await self._update_orderbooks()
-
-        result = []
-        for spread in self._div_spreads:
-            buy_leg = spread.buy_leg
-            sell_leg = spread.sell_leg
-            sell_price = self._orderbooks[sell_leg.uid].sell_price
-            buy_price = self._orderbooks[buy_leg.uid].buy_price
-            days_till_expiration = (
-                buy_leg.last_trade_date - datetime.now(tz=timezone.utc)
-            ).days
-
-            time_adjusted_sell_price = (
-                sell_price
-                * spread.ratio
-                * (
-                    (1 + Decimal(self._ir / 100))
-                    ** Decimal((days_till_expiration / 365))
-                )
-            )
-            delta = buy_price - time_adjusted_sell_price
-            if delta < 0:
-                norm_delta = -delta / spread.ratio
-                result.append(
-                    DividendSpread(
-                        sell_leg.ticker,
-                        buy_leg.ticker,
-                        round(float(norm_delta), 2),
-                        days_till_expiration,
-                        round(float(norm_delta / sell_price) * 100, 2),
-                        can_trade=spread.can_trade,
-                        buy_price=float(buy_price - sell_price * spread.ratio),
-                    )
-                )
-        ordered = sorted(result, key=lambda s: s.yld, reverse=True)
+        await self.prepare()
+        with log_duration('Dividend scan: ranking'):
+            yields = self.count_yields()
+            best = top_k(yields, self._result_limit, self.passes(yields))
+        return '\n'.join(self.render(best))
+
+    async def prepare(self):
+        with log_duration('Dividend scan: instruments'):
+            await self._load_instruments()
+            await self._prefilter_instruments()
+            self._generate_div_spreads()
+        with log_duration('Dividend scan: prices'):
+            await self._update_orderbooks()
+
+    @property
+    def legs(self):
+        return [
+            (spread.sell_leg, spread.buy_leg) for spread in self._div_spreads
+        ]
+
+    def update_price(self, leg, price):
+        self._orderbooks[leg.uid] = OrderBook(bid=price, ask=price)
+
+    def passes(self, yields):
+        return np.round(yields, 2) >= PERCENT_THRESHOLD
+
+    def count_yields(self, indices=None):
+        spreads = self._div_spreads
+        if indices is not None:
+            spreads = [spreads[index] for index in indices]
+        return dividend_yields(
+            column(
+                self._orderbooks[spread.sell_leg.uid].sell_price
+                for spread in spreads
+            ),
+            column(
+                self._orderbooks[spread.buy_leg.uid].buy_price
+                for spread in spreads
+            ),
+            column(spread.ratio for spread in spreads),
+            days_till(
+                [spread.buy_leg.last_trade_date for spread in spreads],
+                datetime.now(tz=timezone.utc),
+            ),
+            self._ir,
+        )
+
+    def render(self, indices):
+        now = datetime.now(tz=timezone.utc)
         spreads = [
+            self._dividend_spread(self._div_spreads[index], now)
+            for index in indices
+        ]
+        return [
             f'{s.stock_ticker} - {s.future_ticker}: {s.dividend} RUB, {s.yld}%'
             f', {s.days_till_expiration} days, {s.can_trade},'
             f' price: {s.buy_price}'
-            for s in ordered
-            if s.yld >= PERCENT_THRESHOLD
+            for s in spreads
         ]
-        return '\n'.join(spreads[: self._result_limit])
+
+    def _dividend_spread(self, spread, now):
+        buy_leg = spread.buy_leg
+        sell_leg = spread.sell_leg
+        sell_price = self._orderbooks[sell_leg.uid].sell_price
+        buy_price = self._orderbooks[buy_leg.uid].buy_price
+        days_till_expiration = (buy_leg.last_trade_date - now).days
+
+        time_adjusted_sell_price = (
+            sell_price
+            * spread.ratio
+            * (
+                (1 + Decimal(self._ir / 100))
+                ** Decimal((days_till_expiration / 365))
+            )
+        )
+        norm_delta = (time_adjusted_sell_price - buy_price) / spread.ratio
+        return DividendSpread(
+            sell_leg.ticker,
+            buy_leg.ticker,
+            round(float(norm_delta), 2),
+            days_till_expiration,
+            round(float(norm_delta / sell_price) * 100, 2),
+            can_trade=spread.can_trade,
+            buy_price=float(buy_price - sell_price * spread.ratio),
+        )
 
     async def _load_instruments(self) -> None:
         shares = await get_api_response('shares')
@@ -513,65 +628,63 @@ class DividendScanner:
                 )
 
     async def _update_orderbooks(self):
-        self._orderbooks = {}
-        future_prices, share_prices = {}, {}
-        futures_to_update = [
-            d for f in self._filtered_futures.values() for d in f
+        by_last_price, by_order_book = [], []
+        for uids, hours in (
+            (
+                [d.uid for f in self._filtered_futures.values() for d in f],
+                FutureTradingHours(),
+            ),
+            (
+                [share.uid for share in self._filtered_shares.values()],
+                StockTradingHours(),
+            ),
+        ):
+            if SimpleTradingTime(hours).is_trading_now:
+                by_order_book.extend(uids)
+            else:
+                by_last_price.extend(uids)
+        with log_duration('Dividend scan: order books'):
+            books = await get_order_books(by_order_book)
+        one_sided = [
+            uid
+            for uid, book in books.items()
+            if not (book.bids and book.asks)
         ]
-        stocks_to_update = list(self._filtered_shares.values())
-        if not SimpleTradingTime(FutureTradingHours()).is_trading_now:
-            future_prices = await get_current_prices_by_uid(futures_to_update)
-            self._orderbooks.update(
-                {
-                    uid: OrderBook(bid=price, ask=price)
-                    for uid, price in future_prices.items()
-                }
-            )
-            futures_to_update = []
-        if not SimpleTradingTime(StockTradingHours()).is_trading_now:
-            share_prices = await get_current_prices_by_uid(stocks_to_update)
-            self._orderbooks.update(
-                {
-                    uid: OrderBook(bid=price, ask=price)
-                    for uid, price in share_prices.items()
-                }
+        with log_duration('Dividend scan: last prices'):
+            prices = await get_current_prices_by_uid(by_last_price + one_sided)
+        self._orderbooks = {
+            uid: OrderBook(bid=prices[uid], ask=prices[uid])
+            for uid in by_last_price
+        }
+        for uid, book in books.items():
+            self._orderbooks[uid] = OrderBook(
+                bid=best_price(book.bids, prices.get(uid)),
+                ask=best_price(book.asks, prices.get(uid)),
             )
-            stocks_to_update = []
-        uids_to_update = [
-            asset.uid for asset in futures_to_update + stocks_to_update
-        ]
-        if uids_to_update:
-            await self._update_from_orderbooks(uids_to_update)
-
-    async def _update_from_orderbooks(self, uids_to_update):
-        result = {}
-        async with AsyncRetryingClient(
-            TCS_RO_TOKEN, RetryClientSettings()
-        ) as client:
-            for uid in uids_to_update:
-                if uid not in result.keys():
-                    ob = await client.market_data.get_order_book(
-                        instrument_id=str(uid), depth=1
-                    )
-                    if ob.bids:
-                        bid = quotation_to_decimal(ob.bids[0].price)
-                    else:
-                        r = await client.market_data.get_last_prices(
-                            instrument_id=[str(uid)]
-                        )
-                        bid = quotation_to_decimal(r.last_prices[0].price)
-                    if ob.asks:
-                        ask = quotation_to_decimal(ob.asks[0].price)
-                    else:
-                        r = await client.market_data.get_last_prices(
-                            instrument_id=[str(uid)]
-                        )
-                        ask = quotation_to_decimal(r.last_prices[0].price)
-                    result[uid] = OrderBook(
-                        bid=bid,
-                        ask=ask,
-                    )
-        self._orderbooks.update(result)
+
+
+def best_price(levels, last_price):
+    if levels:
+        return quotation_to_decimal(levels[0].price)
+    return last_price
+
+
+async def get_order_book(uid):
+    async with CLIENTS.ro as client:
+        return await client.market_data.get_order_book(
+            instrument_id=str(uid), depth=1
+        )
+
+
+async def get_order_books(uids):
+    books = await gather_limited(
+        get_order_book,
+        uids,
+        SCANNER_CONCURRENCY,
+        MARKET_DATA_BUCKET,
+        progress_logger('Order books'),
+    )
+    return dict(zip(uids, books))
 
 
 async def dividend_scan(command, args):
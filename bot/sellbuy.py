@@ -8,13 +8,14 @@ from tinkoff.invest.utils import quotation_to_decimal
 from tools.classes import Asset
 from tools.get_patch_prepare_data import (async_create_sellbuy,
                                           async_get_api_data,
-                                          async_patch_sellbuy,
                                           get_current_prices,
                                           get_portfolio_positions,
                                           parse_ticker_info,
                                           prepare_asset_data,
                                           prepare_assets_data)
+from tools.streams import streaming, wait_for_updates
 from tools.utils import parse_ticker_int_args
+from tools.write_behind import PERSISTENCE
 
 
 async def sellbuy_cycle(asset: Asset):
@@ -26,7 +27,7 @@ async def sellbuy_cycle(asset: Asset):
         await asset.place_sellbuy_order()
 
 
-async def process_asset(asset):
+async def trade_asset(asset):
     last_executed = asset.executed
 
     while asset.next_order_amount >= asset.lot:
@@ -34,13 +35,21 @@ async def process_asset(asset):
             await sellbuy_cycle(asset)
             asset.last_price = asset.new_price
             if last_executed < asset.executed:
-                await async_patch_sellbuy(asset)
+                persist_sellbuy(asset)
                 last_executed = asset.executed
-            await asyncio.sleep(SLEEP_PAUSE)
+            await wait_for_updates(asset, timeout=SLEEP_PAUSE)
 
         except Exception as error:
             await QUEUE.put(error)
 
+
+def persist_sellbuy(asset):
+    PERSISTENCE.put(('sellbuy', asset.id), asset)
+
+
+async def process_asset(asset):
+    async with streaming(asset):
+        await trade_asset(asset)
     return (
         f'Sellbuy for {asset.ticker} finished: {asset.executed}'
         f' for {asset.avg_exec_price}'
@@ -51,7 +60,8 @@ async def safe_order_cancel(asset: Asset):
     await asset.cancel_order()
     await asset.update_executed()
     if asset.executed > 0:
-        await async_patch_sellbuy(asset)
+        persist_sellbuy(asset)
+    await PERSISTENCE.drain()
 
 
 class SellBuyDataProvider:
@@ -82,6 +92,7 @@ async def sellbuy(command, args):
                 for asset in assets
             ]
         )
+        await PERSISTENCE.drain()
         return f'''Покупка-продажа завершены.
          Исполнены заявки по инструментам: {result}'''
 
@@ -104,15 +115,18 @@ class PreciseTicker(ABC):
     def __init__(self, args) -> None:
         a = parse_ticker_int_args(args)
         self._ticker, self._sum, self._amount = a.ticker, a.sum, a.amount
-        self._asset = self._create_asset()
+        self._asset = None
+
+    async def _prepare(self):
+        self._asset = await self._create_asset()
 
-    def _create_asset(self):
-        return get_current_prices(
-            prepare_asset_data([self._parse_ticker_info()])
-        )[0]
+    async def _create_asset(self):
+        assets = prepare_asset_data([await self._parse_ticker_info()])
+        await get_current_prices(assets)
+        return assets[0]
 
-    def _parse_ticker_info(self):
-        return parse_ticker_info(self._ticker)
+    async def _parse_ticker_info(self):
+        return await parse_ticker_info(self._ticker)
 
     def _fill_asset_amount_and_sell(self):
         self._asset.amount = self._asset.next_order_amount = self._get_amount()
@@ -127,6 +141,7 @@ class PreciseTicker(ABC):
         pass
 
     async def provide_asset_as_list(self):
+        await self._prepare()
         self._fill_asset_amount_and_sell()
         self._asset.id = await self._create_db_entry()
         return [self._asset]
@@ -156,8 +171,12 @@ class PreciseSellBuyTicker(PreciseTicker):
 class PreciseDumpTicker(PreciseTicker):
     def __init__(self, ticker) -> None:
         super().__init__(ticker)
-        self._response = get_portfolio_positions()
+        self._response = None
         self._position = 0
+
+    async def _prepare(self):
+        await super()._prepare()
+        self._response = await get_portfolio_positions()
         self._parse_response()
 
     def _get_amount(self):
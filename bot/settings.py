@@ -23,12 +23,53 @@ PERCENT_THRESHOLD = 1
 
 # tinkoff settings
 SLEEP_PAUSE = 1
+STREAM_RECONNECT_PAUSE = 5
+STREAM_EARLY_TRADES = 100
+ERROR_PAUSE = 60
+SPREAD_ENGINE_WORKERS = 4
+INSTRUMENTS_RATE_LIMIT = 200
+MARKET_DATA_RATE_LIMIT = 600
+SCANNER_CONCURRENCY = 10
+STOP_ORDERS_RATE_LIMIT = 50
+STOPS_CONCURRENCY = 5
+JOB_POLL_PAUSE = 2
+JOB_WAIT_TIMEOUT = 600
+SCANNER_CACHE_TTL = 12 * 60 * 60
+LIVE_SCAN_RESULTS = 10
+LIVE_SCAN_PAUSE = 5
+TRADING_CALENDAR_DAYS = 21
+PROGRESS_LOG_LEVEL = os.getenv('PROGRESS_LOG_LEVEL', 'WARNING')
+
+# backend api client
+BACKEND_TIMEOUT = 10
+BACKEND_RETRIES = 3
+BACKEND_BACKOFF = 0.5
+BACKEND_CONNECTIONS = 10
+PERSIST_DELAY = 1
+PERSIST_DRAIN_ATTEMPTS = 5
+LOOP_LAG_INTERVAL = 1
+LOOP_LAG_THRESHOLD = 0.1
+
 RETRY_SETTINGS = RetryClientSettings(use_retry=True, max_retry_attempt=100)
 
 load_dotenv()
 TCS_RO_TOKEN = os.getenv('TCS_RO_TOKEN', '000')
 TCS_RW_TOKEN = os.getenv('TCS_RW_TOKEN', '000')
 TCS_ACCOUNT_ID = os.getenv('ACCOUNT_ID', '000')
+TCS_TARGET = os.getenv('TCS_TARGET') or None
+SCANNER_CACHE_DIR = os.getenv(
+    'SCANNER_CACHE_DIR',
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'scanner_cache',
+    ),
+)
+# MOEX weekdays without trading and shortened days, separated by spaces:
+# MOEX_HOLIDAYS='2026-01-02 2026-01-08', MOEX_SHORT_DAYS='2026-12-30=18:45'
+MOEX_HOLIDAYS = os.getenv('MOEX_HOLIDAYS', '').split()
+MOEX_SHORT_DAYS = dict(
+    day.split('=') for day in os.getenv('MOEX_SHORT_DAYS', '').split()
+)
 TELEGRAM_TOKEN = os.getenv(
     'TG_TOKEN', '123456789:AABBCCDDEEFFaabbccddeeff-1234567890'
 )
@@ -42,8 +83,10 @@ ENDPOINTS = {
     'shorts': 'api/v1/shorts/',
     'stops': 'api/v1/stops/',
     'stop_orders': 'api/v1/stop_orders/',
+    'jobs': 'api/v1/jobs/',
     'spreads': 'api/v1/spreads/',
     'sellbuy': 'api/v1/sellbuy/',
     'health': 'api/v1/health/',
     'ticker': 'api/v1/ticker/',
+    'progress': 'api/v1/progress/',
 }
@@ -1,13 +1,17 @@
 import asyncio
-import logging
+import itertools
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 from queue_handler import QUEUE
-from settings import SLEEP_PAUSE
+from settings import ERROR_PAUSE, SLEEP_PAUSE, SPREAD_ENGINE_WORKERS
 from tools.classes import Spread
+from tools.executions import EXECUTIONS
+from tools.fixed_point import to_decimal
 from tools.get_patch_prepare_data import (async_get_api_data,
-                                          async_patch_spread,
                                           prepare_spreads_data)
+from tools.streams import streaming
+from tools.write_behind import PERSISTENCE
 
 REPORT_ORDERS = False
 
@@ -18,9 +22,9 @@ def get_delta_prices(spread: Spread):
 
 def ok_to_place_order(spread):
     return (
-        get_delta_prices(spread) > spread.price
+        get_delta_prices(spread) > spread.fixed_price
         if spread.sell
-        else get_delta_prices(spread) < spread.price
+        else get_delta_prices(spread) < spread.fixed_price
     )
 
 
@@ -33,13 +37,13 @@ async def safe_orders_cancel(spread):
     )
     await asyncio.wait(
         [
-            spread.far_leg.update_executed(),
-            spread.near_leg.update_executed(),
+            asyncio.create_task(spread.far_leg.update_executed()),
+            asyncio.create_task(spread.near_leg.update_executed()),
         ]
     )
 
     if spread.executed > 0:
-        await async_patch_spread(spread)
+        persist_spread(spread)
 
 
 async def cancel_active_orders_and_update_data(spreads):
@@ -50,17 +54,7 @@ async def cancel_active_orders_and_update_data(spreads):
             if spread.executed < spread.amount
         ],
     )
-
-
-async def wait_till_market_open(spread: Spread):
-    await spread.far_leg.cancel_order()
-    sleep_time = spread.seconds_till_trading_starts
-    logging.warning(
-        f'{spread}: Not a trading time. Waiting '
-        f'for {sleep_time // 60} minutes.'
-    )
-    await asyncio.sleep(sleep_time)
-    logging.warning(f'{spread}: Resuming session.')
+    await PERSISTENCE.drain()
 
 
 async def get_spread_prices(spread):
@@ -84,27 +78,35 @@ async def even_legs_execution(spread: Spread):
     await spread.even_execution()
 
 
-async def place_new_far_leg_order(spread):
-    if (
+def far_leg_order_can_be_placed(spread: Spread):
+    return (
         not spread.far_leg.order_placed
         and spread.far_leg.next_order_amount >= spread.far_leg.lot
         and ok_to_place_order(spread)
-    ):
+    )
+
+
+async def place_new_far_leg_order(spread):
+    if far_leg_order_can_be_placed(spread):
         await spread.far_leg.place_sellbuy_order()
         if REPORT_ORDERS:
             await QUEUE.put(
-                f'''{datetime.now().time()}: Spread far leg placed
-                         {spread.far_leg.ticker}, \ndelta:
-                          {get_delta_prices(spread)}, desired spread price:
-                           {spread.price}, \n
-                        placed {spread.far_leg.next_order_amount} at
-                         price {spread.far_leg.new_price}'''
+                f'{datetime.now().time()}: Spread far leg placed '
+                f'{spread.far_leg.ticker},\n'
+                f'delta: {to_decimal(get_delta_prices(spread))}, '
+                f'desired spread price: {spread.price},\n'
+                f'placed {spread.far_leg.next_order_amount} at '
+                f'price {to_decimal(spread.far_leg.new_price)}'
             )
 
 
+def persist_spread(spread):
+    PERSISTENCE.put(('spreads', spread.id), spread)
+
+
 async def patch_executed(spread, last_executed):
     if spread.executed > last_executed:
-        await async_patch_spread(spread)
+        persist_spread(spread)
         await QUEUE.put(
             f'{spread}: executed [{spread.executed} '
             f'/ {spread.amount}] for {spread.avg_execution_price}'
@@ -112,35 +114,202 @@ async def patch_executed(spread, last_executed):
     return spread.executed
 
 
-async def spread_trading_cycle(spread: Spread):
-    if not spread.is_trading_now:
-        await wait_till_market_open(spread)
-    await get_spread_prices(spread)
-    if far_leg_order_should_be_cancelled(spread):
-        await spread.far_leg.cancel_order()
-    await even_legs_execution(spread)
-    await place_new_far_leg_order(spread)
-    spread.far_leg.last_price = spread.far_leg.new_price
-
+async def cancel_far_leg_order(spread: Spread):
+    await spread.far_leg.cancel_order()
 
-async def process_error(error, spread):
-    await QUEUE.put(f'{spread}: {error}, waiting for 1 minute')
-    await asyncio.sleep(60)
 
+HEDGE, CANCEL, POLL, PLACE = range(4)
+ACTIONS = {
+    HEDGE: even_legs_execution,
+    CANCEL: cancel_far_leg_order,
+    POLL: even_legs_execution,
+    PLACE: place_new_far_leg_order,
+}
+
+
+class SpreadEngine:
+    def __init__(self, spreads, workers=SPREAD_ENGINE_WORKERS) -> None:
+        self._spreads = spreads
+        self._workers = workers
+        self._queue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        self._wake = asyncio.Event()
+        self._pending = set()
+        self._paused = {}
+        self._states = {}
+        self._last_executed = {spread: spread.executed for spread in spreads}
+        for leg in self._legs:
+            leg.updated = self._wake
+
+    @property
+    def _legs(self):
+        return [
+            leg
+            for spread in self._spreads
+            for leg in (spread.far_leg, spread.near_leg)
+        ]
 
-async def process_spread(spread: Spread):
-    last_executed = spread.executed
+    @property
+    def _active(self):
+        return [
+            spread
+            for spread in self._spreads
+            if spread.executed < spread.amount or spread.needs_evening
+        ]
 
-    while spread.executed < spread.amount:
+    async def run(self):
+        async with streaming(*self._legs):
+            workers = [
+                asyncio.create_task(self._work()) for _ in range(self._workers)
+            ]
+            try:
+                await self._schedule_until_complete()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+        return self._spreads
+
+    async def _schedule_until_complete(self):
+        while self._active:
+            await self._schedule()
+            await self._wait_for_updates()
+        await self._queue.join()
+
+    async def _wait_for_updates(self):
         try:
-            await spread_trading_cycle(spread)
-            last_executed = await patch_executed(spread, last_executed)
-            await asyncio.sleep(SLEEP_PAUSE)
-
+            await asyncio.wait_for(self._wake.wait(), SLEEP_PAUSE)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _schedule(self):
+        spreads = [
+            spread for spread in self._active if self._can_schedule(spread)
+        ]
+        trading = []
+        for spread in spreads:
+            async with self._pause_on_error(spread):
+                if self._is_trading(spread):
+                    trading.append(spread)
+        failed = await self._refresh_prices(trading)
+        for spread in trading:
+            async with self._pause_on_error(spread):
+                await self._schedule_trading(spread, failed)
+
+    @asynccontextmanager
+    async def _pause_on_error(self, spread):
+        try:
+            yield
         except Exception as error:
-            await process_error(error, spread)
+            await self._pause(spread, error)
+
+    def _is_trading(self, spread):
+        if spread.is_trading_now:
+            return True
+        if spread.far_leg.order_placed:
+            self._enqueue(spread, CANCEL)
+        return False
+
+    async def _schedule_trading(self, spread, failed):
+        errors = [
+            failed[key] for key in self._leg_keys(spread) if key in failed
+        ]
+        if errors:
+            await self._pause(spread, errors[0])
+            return
+        action = self._next_action(spread)
+        if action is not None:
+            self._enqueue(spread, action)
+
+    def _can_schedule(self, spread):
+        return (
+            spread not in self._pending
+            and self._paused.get(spread, 0) <= self._now
+        )
 
-    return spread
+    def _leg_keys(self, spread):
+        return {
+            (leg.figi, leg.sell) for leg in (spread.far_leg, spread.near_leg)
+        }
+
+    def _group_legs(self, spreads):
+        legs = {}
+        for spread in spreads:
+            for leg in (spread.far_leg, spread.near_leg):
+                legs.setdefault((leg.figi, leg.sell), []).append(leg)
+        return legs
+
+    async def _refresh_prices(self, spreads):
+        legs = self._group_legs(spreads)
+        results = await asyncio.gather(
+            *[same[0].get_price_from_order_book() for same in legs.values()],
+            return_exceptions=True,
+        )
+        failed = {}
+        for (key, same), result in zip(legs.items(), results):
+            if isinstance(result, Exception):
+                failed[key] = result
+            for leg in same[1:]:
+                leg.new_price = same[0].new_price
+        return failed
+
+    def _next_action(self, spread):
+        if spread.needs_evening:
+            return HEDGE
+        state = (
+            spread.far_leg.new_price,
+            spread.near_leg.new_price,
+            spread.far_leg.order_placed,
+            spread.executed,
+        )
+        if state != self._states.get(spread):
+            self._states[spread] = state
+            return self._action_for_new_prices(spread)
+        return POLL if self._needs_poll(spread) else None
+
+    def _action_for_new_prices(self, spread):
+        cancel = (
+            spread.far_leg.order_placed
+            and far_leg_order_should_be_cancelled(spread)
+        )
+        spread.far_leg.last_price = spread.far_leg.new_price
+        if cancel:
+            return CANCEL
+        if far_leg_order_can_be_placed(spread):
+            return PLACE
+        return POLL if self._needs_poll(spread) else None
+
+    def _needs_poll(self, spread):
+        return spread.far_leg.order_placed and not EXECUTIONS.covers(
+            spread.far_leg.order_id
+        )
+
+    def _enqueue(self, spread, action):
+        self._pending.add(spread)
+        self._queue.put_nowait((action, next(self._order), spread))
+
+    async def _work(self):
+        while True:
+            action, _, spread = await self._queue.get()
+            try:
+                await ACTIONS[action](spread)
+                self._last_executed[spread] = await patch_executed(
+                    spread, self._last_executed[spread]
+                )
+            except Exception as error:
+                await self._pause(spread, error)
+            finally:
+                self._pending.discard(spread)
+                self._queue.task_done()
+                self._wake.set()
+
+    async def _pause(self, spread, error):
+        self._paused[spread] = self._now + ERROR_PAUSE
+        await QUEUE.put(f'{spread}: {error}, waiting for 1 minute')
+
+    @property
+    def _now(self):
+        return asyncio.get_running_loop().time()
 
 
 async def spreads(command, args):
@@ -149,12 +318,8 @@ async def spreads(command, args):
         return 'No active assets to sell or buy'
     try:
         print(f'Starting spreads: {spreads}')
-        result = await asyncio.gather(
-            *[
-                asyncio.create_task(process_spread(spread), name=str(spread))
-                for spread in spreads
-            ]
-        )
+        result = await SpreadEngine(spreads).run()
+        await PERSISTENCE.drain()
 
         return (
             f'Торговля спредами завершена: {result}'
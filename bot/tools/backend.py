@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from http import HTTPStatus
+
+import aiohttp
+from settings import (BACKEND_BACKOFF, BACKEND_CONNECTIONS, BACKEND_RETRIES,
+                      BACKEND_TIMEOUT, ENDPOINT_HOST)
+
+IDEMPOTENT_METHODS = ('get', 'patch', 'put', 'delete')
+
+
+async def read_status(response):
+    return response.status
+
+
+async def read_text(response):
+    return response.status, await response.text()
+
+
+async def read_json(response):
+    return response.status, await response.json()
+
+
+class BackendClient:
+    def __init__(
+        self,
+        host=ENDPOINT_HOST,
+        timeout=BACKEND_TIMEOUT,
+        retries=BACKEND_RETRIES,
+        backoff=BACKEND_BACKOFF,
+        connections=BACKEND_CONNECTIONS,
+    ) -> None:
+        self._host = host
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._retries = retries
+        self._backoff = backoff
+        self._connections = connections
+        self._session = None
+        self._loop = None
+
+    async def get(self, path, read=read_json, **kwargs):
+        return await self.request('get', path, read, **kwargs)
+
+    async def post(self, path, read=read_json, **kwargs):
+        return await self.request('post', path, read, **kwargs)
+
+    async def patch(self, path, read=read_text, **kwargs):
+        return await self.request('patch', path, read, **kwargs)
+
+    async def request(self, method, path, read, retries=None, **kwargs):
+        retries = self._retries if retries is None else retries
+        for attempt in range(retries + 1):
+            try:
+                return await self._send(method, path, read, **kwargs)
+            except (asyncio.TimeoutError, aiohttp.ClientError) as error:
+                if attempt == retries or not self._can_retry(method, error):
+                    raise
+                pause = self._backoff * 2**attempt
+                logging.warning(
+                    f'Backend {method} {path} failed: {error!r}, '
+                    f'retrying in {pause} s'
+                )
+                await asyncio.sleep(pause)
+
+    async def close(self):
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def _send(self, method, path, read, **kwargs):
+        session = self._get_session()
+        async with getattr(session, method)(
+            self._host + path, **kwargs
+        ) as response:
+            if response.status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+                raise aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=response.status,
+                )
+            return await read(response)
+
+    def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or (
+            self._loop is not loop
+        ):
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._connections),
+                timeout=self._timeout,
+            )
+            self._loop = loop
+        return self._session
+
+    def _can_retry(self, method, error):
+        return method in IDEMPOTENT_METHODS or isinstance(
+            error, aiohttp.ClientConnectorError
+        )
+
+
+BACKEND = BackendClient()
@@ -1,17 +1,28 @@
-from decimal import Decimal
 from typing import NamedTuple
 
+from tools.fixed_point import average
+
 
 class CachedItem(NamedTuple):
     amount: int
-    price: Decimal
+    price: int
+
+
+class Fill(NamedTuple):
+    order_id: str
+    amount: int
+    price: int
 
 
 class OrdersCache:
-    def __init__(self, amount=0, price=Decimal(0)) -> None:
+    __slots__ = ('_orders', '_fills', '_amount', '_notional', '_average_price')
+
+    def __init__(self, amount=0, price=0) -> None:
         self._validate_data(order_id='', amount=amount, price=price)
         self._orders = {}
-        self._amount = amount
+        self._fills = []
+        self._amount = 0
+        self._notional = 0
         self._average_price = price
         if amount > 0:
             self.update('initial', amount, price)
@@ -23,8 +34,8 @@ class OrdersCache:
     def _validate_data(self, order_id, amount, price):
         if not isinstance(order_id, str):
             raise ValueError('Order id should be a str')
-        if not isinstance(price, Decimal):
-            raise ValueError('Cache price should be a Decimal')
+        if not isinstance(price, int):
+            raise ValueError('Cache price should be an integer of nanos')
         if not isinstance(amount, int):
             raise ValueError('Cache amount should be an integer')
         if amount < 0:
@@ -32,17 +43,22 @@ class OrdersCache:
 
     def update(self, order_id, amount, price):
         self._validate_data(order_id, amount, price)
+        previous = self._orders.get(order_id, CachedItem(0, 0))
         self._orders[order_id] = CachedItem(amount, price)
-        self._average_price, self._amount = self._count_avg_price_and_amount()
-
-    def _count_avg_price_and_amount(self):
-        if not self._orders:
-            return Decimal('0'), 0
-        sum, amount = 0, 0
-        for item in self._orders.values():
-            sum += item.price * item.amount
-            amount += item.amount
-        return sum / amount, amount
+        filled = amount - previous.amount
+        notional = amount * price - previous.amount * previous.price
+        self._amount += filled
+        self._notional += notional
+        self._average_price = (
+            average(self._notional, self._amount) if self._amount else 0
+        )
+        if filled > 0:
+            self._fills.append(
+                Fill(order_id, filled, average(notional, filled))
+            )
+
+    def fills(self):
+        return iter(self._fills)
 
     @property
     def amount(self):
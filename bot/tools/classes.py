@@ -1,18 +1,20 @@
-from decimal import Decimal, getcontext
+import asyncio
+from decimal import Decimal
 from typing import NamedTuple
 
 import tinkoff.invest
 from tinkoff.invest.schemas import OrderExecutionReportStatus
-from tinkoff.invest.utils import decimal_to_quotation, quotation_to_decimal
 from tools.cache import OrdersCache
+from tools.executions import EXECUTIONS
+from tools.fixed_point import (NANO, average, from_decimal, from_quotation,
+                               to_decimal, to_quotation)
+from tools.market_data import ORDER_BOOKS
 from tools.orders import (cancel_order, get_execution_report,
                           get_price_from_order_book, place_order)
 from tools.utils import get_correct_price, get_lots
 
 from .trading_time import SpreadTradingTime, TradingTime
 
-getcontext().prec = 10
-
 
 class Asset:
     def __init__(
@@ -43,13 +45,16 @@ class Asset:
         self.amount = amount
         self.order_placed = order_placed
         self.order_id = order_id
-        self.new_price = Decimal(0)
-        self.last_price = Decimal(0)
+        self.new_price = 0
+        self.last_price = 0
         self.morning_trading = morning_trading
         self.evening_trading = evening_trading
         self.asset_type = asset_type
+        self.updated = asyncio.Event()
         if executed and executed > 0:
-            self.order_cache = OrdersCache(executed, avg_exec_price)
+            self.order_cache = OrdersCache(
+                executed, from_decimal(avg_exec_price)
+            )
             self.next_order_amount = amount - executed
         else:
             self.order_cache = OrdersCache()
@@ -79,38 +84,46 @@ class Asset:
     async def cancel_order(self):
         if self.order_placed:
             await cancel_order(self.order_id)
-            await self.update_executed()
+            await self.poll_executed()
 
     async def get_assets_executed(self):
         return await get_execution_report(self.order_id)
 
     async def get_price_from_order_book(self):
-        self.new_price = quotation_to_decimal(
-            await get_price_from_order_book(self)
-        )
+        price = ORDER_BOOKS.price(self)
+        if price is None:
+            price = from_quotation(await get_price_from_order_book(self))
+        self.new_price = price
 
     def _update_upon_execution(self, response, price):
-        if (
-            response.lots_executed == 0
-            or self.order_cache.executed_by_id(self.order_id)
-            >= response.lots_executed * self.lot
-        ):
-            return
-
-        self.order_cache.update(
+        self.apply_execution(
             self.order_id,
             response.lots_executed * self.lot,
-            quotation_to_decimal(price),
+            from_quotation(price),
         )
+
+    def apply_execution(self, order_id, executed, price):
+        if (
+            executed == 0
+            or self.order_cache.executed_by_id(order_id) >= executed
+        ):
+            return
+        self.order_cache.update(order_id, executed, price)
         self.next_order_amount = self.amount - self.executed
 
+    def order_filled(self, order_id):
+        if self.order_id == order_id:
+            self.order_placed = False
+            self.order_id = None
+
     def parse_order_response(self, response: tinkoff.invest.PostOrderResponse):
         self.order_id = response.order_id
         if self._new_order_is_rejected(response):
             self.order_placed = False
             return
-        self.order_placed = True
+        self._update_order_placed(response)
         self._update_upon_execution(response, response.executed_order_price)
+        EXECUTIONS.track(self, response.order_id, response.lots_requested)
 
     def parse_order_status(self, response: tinkoff.invest.OrderState):
         self._update_order_placed(response)
@@ -133,11 +146,15 @@ class Asset:
         self.parse_order_response(r)
 
     async def place_sellbuy_order(self):
-        self.price = decimal_to_quotation(self.new_price)
+        self.price = to_quotation(self.new_price)
         r = await place_order(self, 'limit')
         self.parse_order_response(r)
 
     async def update_executed(self):
+        if not EXECUTIONS.covers(self.order_id):
+            await self.poll_executed()
+
+    async def poll_executed(self):
         if self.order_id:
             r = await self.get_assets_executed()
             self.parse_order_status(r)
@@ -153,8 +170,8 @@ class Asset:
         return self.order_cache.amount
 
     @property
-    def avg_exec_price(self):
-        return self.order_cache.avg_price
+    def avg_exec_price(self) -> Decimal:
+        return to_decimal(self.order_cache.avg_price)
 
     @property
     def is_trading_now(self):
@@ -185,7 +202,7 @@ class Spread:
         self.amount = amount
 
     async def even_execution(self):
-        if self._near_leg_next_order_amount <= 0:
+        if not self.needs_evening:
             return
         await self._perform_near_leg_market_trade()
 
@@ -197,14 +214,27 @@ class Spread:
     def executed(self):
         return self.far_leg.order_cache.amount
 
+    @property
+    def fixed_price(self):
+        return self.price * NANO
+
     @property
     def avg_execution_price(self) -> Decimal:
         if self.executed == 0:
             return Decimal('0')
-        return (
-            Decimal(self.far_leg.avg_exec_price * self.far_leg.executed)
-            - Decimal(self.near_leg.avg_exec_price * self.near_leg.executed)
-        ) / (self.executed)
+        far_cache = self.far_leg.order_cache
+        near_cache = self.near_leg.order_cache
+        return to_decimal(
+            average(
+                far_cache.avg_price * far_cache.amount
+                - near_cache.avg_price * near_cache.amount,
+                self.executed,
+            )
+        )
+
+    @property
+    def needs_evening(self):
+        return self._near_leg_next_order_amount > 0
 
     @property
     def _near_leg_next_order_amount(self):
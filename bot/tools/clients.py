@@ -0,0 +1,96 @@
+import asyncio
+from contextvars import ContextVar
+
+from grpc import ChannelConnectivity
+from settings import RETRY_SETTINGS, TCS_RO_TOKEN, TCS_RW_TOKEN, TCS_TARGET
+from tinkoff.invest.retrying.aio.client import AsyncRetryingClient
+
+UNHEALTHY_STATES = (
+    ChannelConnectivity.TRANSIENT_FAILURE,
+    ChannelConnectivity.SHUTDOWN,
+)
+
+
+class PooledClient:
+    def __init__(self, token, retry_settings=RETRY_SETTINGS, target=None):
+        self._token = token
+        self._retry_settings = retry_settings
+        self._target = target
+        self._client = None
+        self._services = None
+        self._lock = None
+        self._users = {}
+        self._leased = ContextVar(f'leased_client_{id(self)}', default=())
+
+    async def __aenter__(self):
+        await self.get_services()
+        client = self._client
+        self._users[client] = self._users.get(client, 0) + 1
+        self._leased.set(self._leased.get() + (client,))
+        return self._services
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        *leased, client = self._leased.get()
+        self._leased.set(tuple(leased))
+        self._users[client] -= 1
+        await self._close_if_retired(client)
+        return False
+
+    @property
+    def is_open(self):
+        return self._services is not None
+
+    @property
+    def is_healthy(self):
+        channel = getattr(self._client, '_channel', None)
+        if channel is None:
+            return False
+        return channel.get_state() not in UNHEALTHY_STATES
+
+    async def get_services(self):
+        if self.is_open and self.is_healthy:
+            return self._services
+        async with self._get_lock():
+            if not self.is_open or not self.is_healthy:
+                await self._replace()
+        return self._services
+
+    async def close(self):
+        client, self._client, self._services = self._client, None, None
+        await self._close_if_retired(client)
+
+    async def _replace(self):
+        retired = self._client
+        await self._open()
+        await self._close_if_retired(retired)
+
+    async def _close_if_retired(self, client):
+        if client is None or client is self._client:
+            return
+        if self._users.get(client, 0) == 0:
+            self._users.pop(client, None)
+            await client.__aexit__(None, None, None)
+
+    async def _open(self):
+        client = AsyncRetryingClient(
+            self._token, self._retry_settings, target=self._target
+        )
+        self._services = await client.__aenter__()
+        self._client = client
+
+    def _get_lock(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+
+class ClientPool:
+    def __init__(self, target=None) -> None:
+        self.ro = PooledClient(TCS_RO_TOKEN, target=target)
+        self.rw = PooledClient(TCS_RW_TOKEN, target=target)
+
+    async def close(self):
+        await asyncio.gather(self.ro.close(), self.rw.close())
+
+
+CLIENTS = ClientPool(TCS_TARGET)
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+
+from settings import (STREAM_EARLY_TRADES, STREAM_RECONNECT_PAUSE,
+                      TCS_ACCOUNT_ID)
+from tools.clients import CLIENTS
+from tools.fixed_point import average, from_quotation
+
+
+class TrackedOrder:
+    def __init__(self, asset, order_id, lots_requested, generation) -> None:
+        self.asset = asset
+        self.order_id = order_id
+        self.lots_requested = lots_requested
+        self.generation = generation
+        self.amount = 0
+        self.notional = 0
+        self.trade_ids = set()
+
+    def add_trade(self, trade):
+        if trade.trade_id in self.trade_ids:
+            return False
+        self.trade_ids.add(trade.trade_id)
+        self.amount += trade.quantity
+        self.notional += from_quotation(trade.price) * trade.quantity
+        return True
+
+    @property
+    def avg_price(self):
+        return average(self.notional, self.amount)
+
+    @property
+    def is_filled(self):
+        return self.amount >= self.lots_requested * self.asset.lot
+
+
+class ExecutionStream:
+    def __init__(self) -> None:
+        self._subscribers = set()
+        self._orders = {}
+        self._early_trades = {}
+        self._live = False
+        self._generation = 0
+        self._task = None
+
+    async def subscribe(self, *assets):
+        self._subscribers.update(assets)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(
+                self._run(), name='execution_stream'
+            )
+
+    async def unsubscribe(self, *assets):
+        self._subscribers.difference_update(assets)
+        self._orders = {
+            order_id: order
+            for order_id, order in self._orders.items()
+            if order.asset not in assets
+        }
+        if not self._subscribers:
+            self._stop()
+
+    def track(self, asset, order_id, lots_requested):
+        if asset not in self._subscribers:
+            return
+        generation = self._generation if self._live else None
+        self._orders[order_id] = TrackedOrder(
+            asset, order_id, lots_requested, generation
+        )
+        for order_trades in self._early_trades.pop(order_id, ()):
+            self._on_order_trades(order_trades)
+
+    def covers(self, order_id) -> bool:
+        order = self._orders.get(order_id)
+        return (
+            self._live
+            and order is not None
+            and order.generation == self._generation
+        )
+
+    def _on_response(self, response):
+        if not self._live:
+            self._live = True
+            self._generation += 1
+        if response.order_trades is not None:
+            self._on_order_trades(response.order_trades)
+
+    def _on_order_trades(self, order_trades):
+        order = self._orders.get(order_trades.order_id)
+        if order is None:
+            self._keep_early_trades(order_trades)
+            return
+        new_trades = [order.add_trade(trade) for trade in order_trades.trades]
+        if not any(new_trades):
+            return
+        order.asset.apply_execution(
+            order.order_id, order.amount, order.avg_price
+        )
+        if order.is_filled:
+            order.asset.order_filled(order.order_id)
+        order.asset.updated.set()
+
+    def _keep_early_trades(self, order_trades):
+        self._early_trades.setdefault(order_trades.order_id, []).append(
+            order_trades
+        )
+        if len(self._early_trades) > STREAM_EARLY_TRADES:
+            self._early_trades.pop(next(iter(self._early_trades)))
+
+    def _stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._task = None
+        self._live = False
+        self._early_trades.clear()
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                await self._listen()
+            except Exception as error:
+                logging.warning(f'Trades stream dropped: {error}')
+            self._live = False
+            await asyncio.sleep(STREAM_RECONNECT_PAUSE)
+
+    async def _listen(self):
+        async with CLIENTS.ro as client:
+            async for response in client.orders_stream.trades_stream(
+                accounts=[TCS_ACCOUNT_ID]
+            ):
+                self._on_response(response)
+
+
+EXECUTIONS = ExecutionStream()
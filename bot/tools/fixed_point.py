@@ -0,0 +1,37 @@
+from decimal import Context, Decimal
+
+from tinkoff.invest.schemas import Quotation
+
+NANO = 10**9
+DIGITS = 9
+CONTEXT = Context(prec=40)
+
+
+def from_quotation(quotation: Quotation) -> int:
+    return quotation.units * NANO + quotation.nano
+
+
+def to_quotation(nanos: int) -> Quotation:
+    units, nano = divmod(abs(nanos), NANO)
+    if nanos < 0:
+        return Quotation(units=-units, nano=-nano)
+    return Quotation(units=units, nano=nano)
+
+
+def from_decimal(value) -> int:
+    return int(Decimal(value).scaleb(DIGITS, CONTEXT))
+
+
+def to_decimal(nanos: int) -> Decimal:
+    value = Decimal(nanos).scaleb(-DIGITS, CONTEXT)
+    if value == value.to_integral_value():
+        return value.quantize(Decimal(1))
+    return value.normalize(CONTEXT)
+
+
+def average(total: int, amount: int) -> int:
+    return (2 * total + amount) // (2 * amount)
+
+
+def floor_to_tick(nanos: int, tick: int) -> int:
+    return nanos // tick * tick
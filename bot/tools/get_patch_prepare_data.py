@@ -1,42 +1,43 @@
-import json
 from decimal import Decimal
 from http import HTTPStatus
 from typing import List
-from urllib import request
 
-import aiohttp
 from queue_handler import QUEUE
-from settings import (ENDPOINT_HOST, ENDPOINTS, RETRY_SETTINGS, TCS_ACCOUNT_ID,
-                      TCS_RO_TOKEN)
-from tinkoff.invest.retrying.aio.client import AsyncRetryingClient
-from tinkoff.invest.retrying.sync.client import RetryingClient
+from settings import ENDPOINTS, TCS_ACCOUNT_ID
 from tinkoff.invest.utils import quotation_to_decimal
 from tools.adapters import SellBuyToJsonAdapter, SpreadToJsonAdapter
+from tools.backend import BACKEND, read_json, read_status
 from tools.classes import Asset, Spread
+from tools.clients import CLIENTS
 
-
-async def async_patch_spread(spread: Spread):
-    data = SpreadToJsonAdapter(spread).output
-    url = ENDPOINT_HOST + ENDPOINTS['spreads'] + str(spread.id) + '/'
-    async with aiohttp.ClientSession() as session:
-        async with session.patch(url, json=data) as response:
-            if response.status == HTTPStatus.OK:
-                return True
-            response_text = await response.text()
-            await QUEUE.put(f'Error patching spreads. {response_text[:4000]}')
-            return False
+PROGRESS_ADAPTERS = {
+    'spreads': SpreadToJsonAdapter,
+    'sellbuy': SellBuyToJsonAdapter,
+}
 
 
 async def async_patch_sellbuy(sellbuy: Asset):
     data = SellBuyToJsonAdapter(sellbuy).output
-    url = ENDPOINT_HOST + ENDPOINTS['sellbuy'] + str(sellbuy.id) + '/'
-    async with aiohttp.ClientSession() as session:
-        async with session.patch(url, json=data) as response:
-            if response.status == HTTPStatus.OK:
-                return True
-            response_text = await response.text()
-            await QUEUE.put(f'Error patching sellbuy. {response_text[:4000]}')
-            return False
+    path = ENDPOINTS['sellbuy'] + str(sellbuy.id) + '/'
+    status, response_text = await BACKEND.patch(path, json=data)
+    if status == HTTPStatus.OK:
+        return True
+    await QUEUE.put(f'Error patching sellbuy. {response_text[:4000]}')
+    return False
+
+
+async def async_patch_progress(updates):
+    data = {'spreads': [], 'sellbuy': []}
+    for (kind, id), item in updates.items():
+        data[kind].append({'id': id, **PROGRESS_ADAPTERS[kind](item).output})
+    status, response = await BACKEND.patch(
+        ENDPOINTS['progress'], read=read_json, json=data
+    )
+    if status != HTTPStatus.OK:
+        raise ConnectionError(f'Error saving progress. {str(response)[:4000]}')
+    missing = {kind: ids for kind, ids in response['missing'].items() if ids}
+    if missing:
+        await QUEUE.put(f'Progress of deleted entries dropped: {missing}')
 
 
 async def async_create_sellbuy(sellbuy: Asset):
@@ -45,43 +46,30 @@ async def async_create_sellbuy(sellbuy: Asset):
         'sell': sellbuy.sell,
         'amount': sellbuy.amount,
     }
-    url = ENDPOINT_HOST + ENDPOINTS['sellbuy']
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json=data) as response:
-            response_json = await response.json()
-            if response.status == HTTPStatus.CREATED:
-                return response_json['id']
-            raise ConnectionError(
-                f'Error creating sellbuy. {str(response_json)}'
-            )
+    status, response_json = await BACKEND.post(ENDPOINTS['sellbuy'], json=data)
+    if status == HTTPStatus.CREATED:
+        return response_json['id']
+    raise ConnectionError(f'Error creating sellbuy. {str(response_json)}')
 
 
-async def async_get_api_data(command: str):
-    url = ENDPOINT_HOST + ENDPOINTS[command]
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            return await response.json()
+async def async_get_api_data(command: str, id=None):
+    path = ENDPOINTS[command] if id is None else f'{ENDPOINTS[command]}{id}/'
+    _, response_json = await BACKEND.get(path)
+    return response_json
 
 
-async def async_post_api_data(command: str):
-    url = ENDPOINT_HOST + ENDPOINTS[command]
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url) as response:
-            text = await response.text()
-            return text.strip('"')
+async def async_post_api_data(command: str, **kwargs):
+    return await BACKEND.post(ENDPOINTS[command], **kwargs)
 
 
 async def async_check_health():
-    url = ENDPOINT_HOST + ENDPOINTS['health']
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            return response.status
+    return await BACKEND.get(ENDPOINTS['health'], read=read_status, retries=0)
 
 
-def get_current_prices(assets):
+async def get_current_prices(assets):
     figis = [asset.figi for asset in assets]
-    with RetryingClient(TCS_RO_TOKEN, RETRY_SETTINGS) as client:
-        response = client.market_data.get_last_prices(figi=figis)
+    async with CLIENTS.ro as client:
+        response = await client.market_data.get_last_prices(figi=figis)
     prices = {
         item.figi: quotation_to_decimal(item.price)
         for item in response.last_prices
@@ -91,9 +79,10 @@ def get_current_prices(assets):
     return assets
 
 
-async def get_current_prices_by_uid(assets):
-    uids = [asset.uid for asset in assets]
-    async with AsyncRetryingClient(TCS_RO_TOKEN, RETRY_SETTINGS) as client:
+async def get_current_prices_by_uid(uids):
+    if not uids:
+        return {}
+    async with CLIENTS.ro as client:
         response = await client.market_data.get_last_prices(instrument_id=uids)
     return {
         item.instrument_uid: quotation_to_decimal(item.price)
@@ -101,10 +90,12 @@ async def get_current_prices_by_uid(assets):
     }
 
 
-def get_portfolio_positions():
-    with RetryingClient(TCS_RO_TOKEN, RETRY_SETTINGS) as client:
-        response = client.operations.get_portfolio(account_id=TCS_ACCOUNT_ID)
-        return response.positions
+async def get_portfolio_positions():
+    async with CLIENTS.ro as client:
+        response = await client.operations.get_portfolio(
+            account_id=TCS_ACCOUNT_ID
+        )
+    return response.positions
 
 
 def prepare_asset_data(data):
@@ -126,9 +117,13 @@ def prepare_asset_data(data):
     return assets
 
 
-def parse_ticker_info(ticker: str) -> dict:
-    url = ENDPOINT_HOST + ENDPOINTS['ticker'] + ticker + '/'
-    return json.loads(request.urlopen(url).read())
+async def parse_ticker_info(ticker: str) -> dict:
+    status, response_json = await BACKEND.get(
+        ENDPOINTS['ticker'] + ticker + '/'
+    )
+    if status != HTTPStatus.OK:
+        raise KeyError(f'Ticker {ticker} not found. {str(response_json)}')
+    return response_json
 
 
 def prepare_leg(data, sell_direction: bool, amount: int):
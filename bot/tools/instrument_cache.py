@@ -0,0 +1,62 @@
+import os
+import pickle
+import time
+from datetime import datetime
+
+from settings import SCANNER_CACHE_DIR, SCANNER_CACHE_TTL
+from tools.trading_time import MOSCOW_ZONE
+
+SUFFIX = '.pickle'
+
+
+class InstrumentCache:
+    def __init__(self, directory=SCANNER_CACHE_DIR, ttl=SCANNER_CACHE_TTL):
+        self._directory = directory
+        self._ttl = ttl
+
+    def get(self, kind):
+        path = self._path(kind)
+        try:
+            if time.time() - os.path.getmtime(path) > self._ttl:
+                return None
+            with open(path, 'rb') as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set(self, kind, value):
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(kind)
+        with open(f'{path}.tmp', 'wb') as file:
+            pickle.dump(value, file)
+        os.replace(f'{path}.tmp', path)
+        self._drop_other_days(kind)
+
+    def invalidate(self):
+        for name in self._files():
+            os.remove(os.path.join(self._directory, name))
+
+    def _path(self, kind):
+        return os.path.join(
+            self._directory, f'{kind}-{self._trading_day()}{SUFFIX}'
+        )
+
+    def _trading_day(self):
+        return datetime.now(MOSCOW_ZONE).date().isoformat()
+
+    def _files(self):
+        if not os.path.isdir(self._directory):
+            return []
+        return [
+            name for name in os.listdir(self._directory)
+            if name.endswith(SUFFIX)
+        ]
+
+    def _drop_other_days(self, kind):
+        current = os.path.basename(self._path(kind))
+        for name in self._files():
+            if name.startswith(f'{kind}-') and name != current:
+                os.remove(os.path.join(self._directory, name))
+
+
+INSTRUMENT_CACHE = InstrumentCache()
@@ -0,0 +1,16 @@
+import asyncio
+import logging
+
+from settings import LOOP_LAG_INTERVAL, LOOP_LAG_THRESHOLD
+
+
+async def monitor_loop_lag(
+    interval=LOOP_LAG_INTERVAL, threshold=LOOP_LAG_THRESHOLD
+):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = loop.time() - start - interval
+        if lag > threshold:
+            logging.warning(f'Event loop was blocked for {lag:.3f}s')
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import NamedTuple, Optional
+
+from settings import STREAM_RECONNECT_PAUSE
+from tinkoff.invest import OrderBookInstrument
+from tools.clients import CLIENTS
+from tools.fixed_point import from_quotation
+
+ORDER_BOOK_DEPTH = 1
+
+
+class TopOfBook(NamedTuple):
+    bid: Optional[int]
+    ask: Optional[int]
+
+
+class OrderBookStream:
+    def __init__(self) -> None:
+        self._subscribers = {}
+        self._books = {}
+        self._stream = None
+        self._task = None
+
+    @property
+    def figis(self):
+        return list(self._subscribers.keys())
+
+    async def subscribe(self, *assets):
+        new_figis = []
+        for asset in assets:
+            if asset.figi not in self._subscribers:
+                self._subscribers[asset.figi] = set()
+                new_figis.append(asset.figi)
+            self._subscribers[asset.figi].add(asset)
+        if new_figis and self._stream is not None:
+            self._stream.order_book.subscribe(self._instruments(new_figis))
+        self._ensure_running()
+
+    async def unsubscribe(self, *assets):
+        gone = []
+        for asset in assets:
+            subscribers = self._subscribers.get(asset.figi, set())
+            subscribers.discard(asset)
+            if not subscribers and asset.figi in self._subscribers:
+                del self._subscribers[asset.figi]
+                self._books.pop(asset.figi, None)
+                gone.append(asset.figi)
+        if gone and self._stream is not None:
+            self._stream.order_book.unsubscribe(self._instruments(gone))
+        if not self._subscribers:
+            self._stop()
+
+    def price(self, asset) -> Optional[int]:
+        book = self._books.get(asset.figi)
+        if book is None:
+            return None
+        return book.ask if asset.sell else book.bid
+
+    def _on_order_book(self, order_book):
+        if order_book.figi not in self._subscribers:
+            return
+        book = TopOfBook(
+            bid=self._best_price(order_book.bids),
+            ask=self._best_price(order_book.asks),
+        )
+        if self._books.get(order_book.figi) == book:
+            return
+        self._books[order_book.figi] = book
+        for asset in self._subscribers[order_book.figi]:
+            asset.updated.set()
+
+    def _best_price(self, orders):
+        return from_quotation(orders[0].price) if orders else None
+
+    def _instruments(self, figis):
+        return [
+            OrderBookInstrument(figi=figi, depth=ORDER_BOOK_DEPTH)
+            for figi in figis
+        ]
+
+    def _ensure_running(self):
+        if self._subscribers and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(
+                self._run(), name='order_book_stream'
+            )
+
+    def _stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+        if self._task is not None:
+            self._task.cancel()
+        self._stream, self._task = None, None
+        self._books.clear()
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                await self._listen()
+            except Exception as error:
+                logging.warning(f'Order book stream dropped: {error}')
+            self._stream = None
+            self._books.clear()
+            await asyncio.sleep(STREAM_RECONNECT_PAUSE)
+
+    async def _listen(self):
+        async with CLIENTS.ro as client:
+            self._stream = client.create_market_data_stream()
+            self._stream.order_book.subscribe(self._instruments(self.figis))
+            async for market_data in self._stream:
+                if market_data.orderbook is not None:
+                    self._on_order_book(market_data.orderbook)
+
+
+ORDER_BOOKS = OrderBookStream()
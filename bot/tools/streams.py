@@ -0,0 +1,29 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from tools.executions import EXECUTIONS
+from tools.market_data import ORDER_BOOKS
+
+
+@asynccontextmanager
+async def streaming(*assets):
+    await ORDER_BOOKS.subscribe(*assets)
+    await EXECUTIONS.subscribe(*assets)
+    try:
+        yield
+    finally:
+        await EXECUTIONS.unsubscribe(*assets)
+        await ORDER_BOOKS.unsubscribe(*assets)
+
+
+async def wait_for_updates(*assets, timeout):
+    waiters = [asyncio.create_task(asset.updated.wait()) for asset in assets]
+    try:
+        await asyncio.wait(
+            waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+    for asset in assets:
+        asset.updated.clear()
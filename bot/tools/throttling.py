@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+
+from settings import (INSTRUMENTS_RATE_LIMIT, MARKET_DATA_RATE_LIMIT,
+                      PROGRESS_LOG_LEVEL, STOP_ORDERS_RATE_LIMIT)
+
+
+class TokenBucket:
+    def __init__(self, rate, per=60, capacity=None) -> None:
+        self._rate = rate / per
+        self._capacity = capacity or rate
+        self._tokens = self._capacity
+        self._updated = None
+        self._lock = None
+
+    async def acquire(self):
+        async with self._get_lock():
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self):
+        now = asyncio.get_running_loop().time()
+        if self._updated is not None:
+            self._tokens = min(
+                self._capacity,
+                self._tokens + (now - self._updated) * self._rate,
+            )
+        self._updated = now
+
+    def _get_lock(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+
+def log_progress(message):
+    logging.log(logging.getLevelName(PROGRESS_LOG_LEVEL), message)
+
+
+def progress_logger(title, step=10):
+    reported = set()
+
+    def report(done, total):
+        percent = done * 100 // total
+        if percent // step not in reported:
+            reported.add(percent // step)
+            log_progress(f'{title}: {done}/{total}')
+
+    return report
+
+
+@contextmanager
+def log_duration(title):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        log_progress(f'{title}: {time.perf_counter() - start:.2f}s')
+
+
+async def wait_in_turn(tasks, progress):
+    for done, finished in enumerate(asyncio.as_completed(tasks), 1):
+        await finished
+        if progress is not None:
+            progress(done, len(tasks))
+
+
+async def cancel_all(tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def gather_limited(
+    fetch, items, concurrency, bucket=None, progress=None
+):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with semaphore:
+            if bucket is not None:
+                await bucket.acquire()
+            return await fetch(item)
+
+    tasks = [asyncio.create_task(run(item)) for item in items]
+    try:
+        await wait_in_turn(tasks, progress)
+    except BaseException:
+        await cancel_all(tasks)
+        raise
+    return [task.result() for task in tasks]
+
+
+INSTRUMENTS_BUCKET = TokenBucket(INSTRUMENTS_RATE_LIMIT)
+MARKET_DATA_BUCKET = TokenBucket(MARKET_DATA_RATE_LIMIT)
+STOP_ORDERS_BUCKET = TokenBucket(STOP_ORDERS_RATE_LIMIT)
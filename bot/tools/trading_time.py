@@ -1,210 +1,174 @@
 import zoneinfo
-from datetime import datetime, time, timedelta
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from functools import reduce
 from typing import Union
 
-from tools.trading_hours import (FutureTradingHours, StockTradingHours,
-                                 TradingSession)
+from settings import MOEX_HOLIDAYS, MOEX_SHORT_DAYS, TRADING_CALENDAR_DAYS
+from tools.trading_hours import FutureTradingHours, StockTradingHours
 
 TRADING_SCHEDULES = {'S': StockTradingHours, 'F': FutureTradingHours}
+SCHEDULE_TYPES = {
+    schedule: asset_type for asset_type, schedule in TRADING_SCHEDULES.items()
+}
 TRADE_DAYS = (0, 4)
-DAYS_IN_WEEK = 7
+HOLIDAYS = frozenset(date.fromisoformat(day) for day in MOEX_HOLIDAYS)
+SHORT_DAYS = {
+    date.fromisoformat(day): time.fromisoformat(close)
+    for day, close in MOEX_SHORT_DAYS.items()
+}
 
 TIME_OFFSET = timedelta(seconds=15)
 MOSCOW_ZONE = zoneinfo.ZoneInfo('Europe/Moscow')
 
-
-class TradingTime:
-    def __init__(self, asset) -> None:
-        schedule = TRADING_SCHEDULES[asset.asset_type]()
-        self._trading_sessions = dict(schedule.base_hours)
-
-        if asset.morning_trading:
-            self._trading_sessions.update(schedule.morning_hours)
-        if asset.evening_trading:
-            self._trading_sessions.update(schedule.evening_hours)
-        self._update_trading_schedule_with_time_offset()
-        self._sorted_sess_cache = None
-
-    @property
-    def is_trading_now(self) -> bool:
-        if not self._today_is_a_trading_day:
-            return False
-        for open_time, close_time in self._sorted_sessions:
-            if open_time <= self._current_datetime.time() <= close_time:
-                return True
-        return False
-
-    @property
-    def _current_datetime(self) -> datetime:
-        return datetime.now(MOSCOW_ZONE)
-
-    @property
-    def _today_is_a_trading_day(self) -> bool:
-        return (
-            TRADE_DAYS[0] <= self._current_datetime.weekday() <= TRADE_DAYS[1]
+CALENDARS = {}
+LEGS_CALENDARS = {}
+
+
+def trading_sessions(asset_type, morning, evening):
+    schedule = TRADING_SCHEDULES[asset_type]()
+    sessions = list(schedule.base_hours.values())
+    if morning:
+        sessions.extend(schedule.morning_hours.values())
+    if evening:
+        sessions.extend(schedule.evening_hours.values())
+    return sorted(sessions)
+
+
+def is_trading_day(day):
+    return (
+        TRADE_DAYS[0] <= day.weekday() <= TRADE_DAYS[1]
+        and day not in HOLIDAYS
+    )
+
+
+def epoch(day, moment):
+    return datetime.combine(day, moment, tzinfo=MOSCOW_ZONE).timestamp()
+
+
+def day_intervals(sessions, day):
+    if not is_trading_day(day):
+        return []
+    last_close = SHORT_DAYS.get(day, time.max)
+    intervals = []
+    for session in sessions:
+        opening = epoch(day, session.open) + TIME_OFFSET.seconds
+        closing = epoch(day, min(session.close, last_close))
+        closing -= TIME_OFFSET.seconds
+        if opening < closing:
+            intervals.append((opening, closing))
+    return intervals
+
+
+class TradingCalendar:
+    def __init__(self, intervals, start) -> None:
+        self._opens = [opening for opening, _ in intervals]
+        self._closes = [closing for _, closing in intervals]
+        self._start = start
+
+    @classmethod
+    def build(cls, sessions, moment, days=TRADING_CALENDAR_DAYS):
+        first_day = moment.astimezone(MOSCOW_ZONE).date()
+        intervals = []
+        for day in range(days):
+            intervals += day_intervals(sessions, first_day + timedelta(day))
+        return cls(intervals, epoch(first_day, time()))
+
+    def is_valid_at(self, timestamp):
+        return bool(self._opens) and (
+            self._start <= timestamp < self._opens[-1]
         )
 
-    @property
-    def seconds_till_trading_starts(self) -> int:
-        if self.is_trading_now:
-            return 0
-        if self._will_trade_today:
-            return self._seconds_until_next_session_today
-        return self._seconds_count_till_trading_after_all_sessions_close
+    def is_trading(self, timestamp):
+        index = bisect_right(self._opens, timestamp) - 1
+        return index >= 0 and timestamp <= self._closes[index]
 
-    @property
-    def _seconds_until_next_session_today(self) -> int:
-        return self._seconds_till_nearest_session(
-            self._current_datetime.time()
-        )
+    def next_open(self, timestamp):
+        return self._opens[bisect_right(self._opens, timestamp)]
 
-    @property
-    def _seconds_count_till_trading_after_all_sessions_close(self) -> int:
-        midnights = self._midnights_count_till_trading_day
-        secs_midn_to_session = self._seconds_till_nearest_session(time(0, 0))
-        full_days_pause_secs = 24 * 60 * 60 * (midnights - 1)
-        return (
-            self._seconds_till_midnight
-            + secs_midn_to_session
-            + full_days_pause_secs
-        )
-
-    @property
-    def _seconds_till_midnight(self) -> int:
-        return (
-            self._time_difference_in_seconds(
-                time(23, 59, 59), self._current_datetime.time()
-            )
-            + 1
+    def seconds_till_open(self, timestamp):
+        if self.is_trading(timestamp):
+            return 0
+        return int(self.next_open(timestamp) - timestamp)
+
+    def intersect(self, other):
+        intervals, mine, theirs = [], 0, 0
+        while mine < len(self._opens) and theirs < len(other._opens):
+            opening = max(self._opens[mine], other._opens[theirs])
+            closing = min(self._closes[mine], other._closes[theirs])
+            if opening < closing:
+                intervals.append((opening, closing))
+            if self._closes[mine] < other._closes[theirs]:
+                mine += 1
+            else:
+                theirs += 1
+        return TradingCalendar(intervals, max(self._start, other._start))
+
+
+def signature(asset):
+    return (
+        asset.asset_type,
+        bool(asset.morning_trading),
+        bool(asset.evening_trading),
+    )
+
+
+def get_calendar(asset_type, morning, evening, moment):
+    key = (asset_type, bool(morning), bool(evening))
+    calendar = CALENDARS.get(key)
+    if calendar is None or not calendar.is_valid_at(moment.timestamp()):
+        calendar = TradingCalendar.build(trading_sessions(*key), moment)
+        CALENDARS[key] = calendar
+    return calendar
+
+
+def get_legs_calendar(legs, moment):
+    key = frozenset(signature(leg) for leg in legs)
+    today = moment.astimezone(MOSCOW_ZONE).date()
+    day, calendar = LEGS_CALENDARS.get(key, (None, None))
+    if day != today:
+        calendar = reduce(
+            TradingCalendar.intersect,
+            [get_calendar(*leg, moment) for leg in sorted(key)],
         )
+        LEGS_CALENDARS[key] = (today, calendar)
+    return calendar
 
-    def _seconds_till_nearest_session(self, tyme: time) -> int:
-        for session in self._sorted_sessions:
-            if session.open > tyme:
-                return self._time_difference_in_seconds(session.open, tyme)
-        raise ValueError(f'Unexpected search for session after close. {tyme}')
 
-    def _time_difference_in_seconds(self, t1: time, t2: time):
-        delta = datetime.combine(
-            self._current_datetime.date(), t1
-        ) - datetime.combine(self._current_datetime.date(), t2)
-        return delta.seconds
+class TradingTime:
+    def __init__(self, asset) -> None:
+        self._now = self._current_datetime
+        self._calendar = get_calendar(*signature(asset), self._now)
 
     @property
-    def _sorted_sessions(self) -> list:
-        if not self._sorted_sess_cache:
-            self._sorted_sess_cache = sorted(self._trading_sessions.values())
-        return self._sorted_sess_cache
+    def _current_datetime(self) -> datetime:
+        return datetime.now(MOSCOW_ZONE)
 
     @property
-    def _midnights_count_till_trading_day(self) -> int:
-        if self._will_trade_today:
-            return 0
-        today = self._current_datetime.weekday()
-        if today > TRADE_DAYS[1] - 1:
-            return DAYS_IN_WEEK - today + TRADE_DAYS[0]
-        if today < TRADE_DAYS[0]:
-            return TRADE_DAYS[0] - today
-        return 1
+    def is_trading_now(self) -> bool:
+        return self._calendar.is_trading(self._now.timestamp())
 
     @property
-    def _is_later_then_last_session_close(self) -> bool:
-        return self._current_datetime.time() > self._sorted_sessions[-1].close
+    def seconds_till_trading_starts(self) -> int:
+        return self._calendar.seconds_till_open(self._now.timestamp())
 
-    @property
-    def _will_trade_today(self) -> bool:
-        return (
-            not self._is_later_then_last_session_close
-            and self._today_is_a_trading_day
-        )
 
-    def _update_trading_schedule_with_time_offset(self) -> None:
-        dt = self._current_datetime.date()
-        self._trading_sessions = {
-            title: TradingSession(
-                open=(datetime.combine(dt, period.open) + TIME_OFFSET).time(),
-                close=(
-                    datetime.combine(dt, period.close) - TIME_OFFSET
-                ).time(),
-            )
-            for title, period in self._trading_sessions.items()
-        }
+class LegsTradingTime(TradingTime):
+    def __init__(self, legs) -> None:
+        self._now = self._current_datetime
+        self._calendar = get_legs_calendar(legs, self._now)
 
 
-class SpreadTradingTime(TradingTime):
+class SpreadTradingTime(LegsTradingTime):
     def __init__(self, spread) -> None:
-        self.schedules = (
-            TradingTime(spread.near_leg)._sorted_sessions
-            + TradingTime(spread.far_leg)._sorted_sessions
-        )
-        self._trading_sessions = self._combine_trading_sessions()
-        self._sorted_sess_cache = None
-
-    def _combine_trading_sessions(self):
-        events = [(period.open, 1) for period in self.schedules]
-        events += [(period.close, -1) for period in self.schedules]
-        sum = 0
-        result = {}
-        period_open = None
-        for time_moment in sorted(events):
-            sum += time_moment[1]
-            if sum > 1:
-                period_open = time_moment[0]
-            if sum < 2 and period_open is not None:
-                period_close = time_moment[0]
-                result[
-                    f'{str(period_open)} - {str(period_close)}'
-                ] = TradingSession(period_open, period_close)
-                period_open = None
-        return result
-
-
-class SimpleTradingTime:
+        super().__init__((spread.near_leg, spread.far_leg))
+
+
+class SimpleTradingTime(TradingTime):
     def __init__(
         self, schedule: Union[FutureTradingHours, StockTradingHours]
     ) -> None:
-        schedule = schedule
-        self._trading_sessions = dict(schedule.base_hours)
-        self._trading_sessions.update(schedule.morning_hours)
-        self._trading_sessions.update(schedule.evening_hours)
-        self._update_trading_schedule_with_time_offset()
-        self._sorted_sess_cache = None
-
-    @property
-    def is_trading_now(self) -> bool:
-        if not self._today_is_a_trading_day:
-            return False
-        for open_time, close_time in self._sorted_sessions:
-            if open_time <= self._current_datetime.time() <= close_time:
-                return True
-        return False
-
-    @property
-    def _current_datetime(self) -> datetime:
-        return datetime.now(MOSCOW_ZONE)
-
-    @property
-    def _today_is_a_trading_day(self) -> bool:
-        return (
-            TRADE_DAYS[0] <= self._current_datetime.weekday() <= TRADE_DAYS[1]
+        self._now = self._current_datetime
+        self._calendar = get_calendar(
+            SCHEDULE_TYPES[type(schedule)], True, True, self._now
         )
-
-    @property
-    def _sorted_sessions(self) -> list:
-        if not self._sorted_sess_cache:
-            self._sorted_sess_cache = sorted(self._trading_sessions.values())
-        return self._sorted_sess_cache
-
-    def _update_trading_schedule_with_time_offset(self) -> None:
-        dt = self._current_datetime.date()
-        self._trading_sessions = {
-            title: TradingSession(
-                open=(
-                    datetime.combine(dt, period.open) + TIME_OFFSET
-                ).time(),
-                close=(
-                    datetime.combine(dt, period.close) - TIME_OFFSET
-                ).time(),
-            )
-            for title, period in self._trading_sessions.items()
-        }
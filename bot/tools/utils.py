@@ -3,7 +3,7 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 from tinkoff.invest.schemas import Quotation
-from tinkoff.invest.utils import decimal_to_quotation
+from tools.fixed_point import floor_to_tick, from_decimal, to_quotation
 
 
 @dataclass
@@ -18,8 +18,9 @@ def get_correct_price(price: Decimal, increment: Decimal) -> Quotation:
         raise ValueError('Price and Increment should be Decimal.')
     if price <= 0 or increment <= 0:
         raise ValueError('Price and Increment should be positive.')
-    answer = price // increment * increment
-    return decimal_to_quotation(answer)
+    return to_quotation(
+        floor_to_tick(from_decimal(price), from_decimal(increment))
+    )
 
 
 def get_lots(number_of_stocks, lot):
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+
+from settings import PERSIST_DELAY, PERSIST_DRAIN_ATTEMPTS
+from tools.get_patch_prepare_data import async_patch_progress
+
+
+class WriteBehind:
+    def __init__(
+        self, write, delay=PERSIST_DELAY, attempts=PERSIST_DRAIN_ATTEMPTS
+    ) -> None:
+        self.write = write
+        self._delay = delay
+        self._attempts = attempts
+        self._pending = {}
+        self._flusher = None
+        self._lock = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def put(self, key, item):
+        self._pending[key] = item
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def flush(self):
+        async with self._get_lock():
+            pending, self._pending = self._pending, {}
+            if pending:
+                await self._write(pending)
+
+    async def drain(self):
+        for _ in range(self._attempts):
+            await self.flush()
+            if not self._pending:
+                return True
+            await asyncio.sleep(self._delay)
+        return False
+
+    async def _write(self, pending):
+        try:
+            await self.write(pending)
+        except Exception as error:
+            logging.warning(f'Writing {list(pending)} failed: {error!r}')
+            for key, item in pending.items():
+                self._pending.setdefault(key, item)
+
+    async def _flush_later(self):
+        while self._pending:
+            await asyncio.sleep(self._delay)
+            await self.flush()
+
+    def _get_lock(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+
+PERSISTENCE = WriteBehind(async_patch_progress)
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+import pytest
+
+from benchmarks.market import (CANCELLED, FILLED, PARTIALLY_FILLED, STOP_LOSS,
+                               TAKE_PROFIT, Listing, Market, PricePath)
+
+FIGI = 'BBG000TEST00'
+
+
+@pytest.fixture
+def market():
+    listing = Listing(FIGI, 'TEST', 'share', Decimal('100'), lot=10)
+    return Market(
+        [listing],
+        {FIGI: PricePath([100, 101, 99, 98])},
+        levels=2,
+        level_lots=5,
+        spread_ticks=1,
+    )
+
+
+def test_order_book_is_quoted_around_the_path(market):
+    bids, asks = market.order_book(FIGI, 2)
+    assert bids == [(Decimal('99.99'), 5), (Decimal('99.98'), 5)]
+    assert asks == [(Decimal('100.01'), 5), (Decimal('100.02'), 5)]
+
+
+def test_market_order_walks_the_book(market):
+    order = market.post_order(FIGI, False, 7)
+    assert order.status == FILLED
+    assert [trade.quantity for trade in order.trades] == [50, 20]
+    assert order.average_price == (
+        Decimal('100.01') * 5 + Decimal('100.02') * 2
+    ) / 7
+    assert market.positions[FIGI].quantity == 70
+
+
+def test_resting_orders_keep_price_time_priority(market):
+    first = market.post_order(FIGI, True, 2, Decimal('100.00'))
+    second = market.post_order(FIGI, True, 2, Decimal('100.00'))
+    taker = market.post_order(FIGI, False, 3)
+    assert taker.status == FILLED
+    assert taker.average_price == Decimal('100.00')
+    assert first.status == FILLED
+    assert second.status == PARTIALLY_FILLED
+    assert market.order_book(FIGI, 1)[1] == [(Decimal('100.00'), 1)]
+
+
+def test_price_path_sweeps_resting_orders(market):
+    order = market.post_order(FIGI, True, 1, Decimal('100.5'))
+    market.step()
+    assert order.status == FILLED
+    assert order.average_price == Decimal('100.5')
+
+
+def test_cancelled_order_cannot_be_cancelled_again(market):
+    order = market.post_order(FIGI, True, 1, Decimal('105'))
+    market.cancel_order(order.order_id)
+    assert order.status == CANCELLED
+    with pytest.raises(KeyError):
+        market.cancel_order(order.order_id)
+
+
+@pytest.mark.parametrize(
+    ('sell', 'kind', 'steps', 'triggered'),
+    (
+        (True, STOP_LOSS, 2, True),
+        (True, STOP_LOSS, 1, False),
+        (True, TAKE_PROFIT, 1, True),
+        (False, TAKE_PROFIT, 2, True),
+        (False, TAKE_PROFIT, 1, False),
+    ),
+)
+def test_stop_orders_trigger_on_last_price(
+    market, sell, kind, steps, triggered
+):
+    stop_price = Decimal('101') if kind == TAKE_PROFIT and sell else Decimal(
+        '99'
+    )
+    market.post_stop_order(FIGI, sell, 1, stop_price, Decimal('0'), kind)
+    for _ in range(steps):
+        market.step()
+    assert (market.stop_orders == {}) is triggered
+    assert (FIGI in market.positions) is triggered
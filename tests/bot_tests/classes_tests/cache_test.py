@@ -1,30 +1,29 @@
-from decimal import Decimal, getcontext
-from random import randint
+from decimal import Decimal
+from random import Random, randint
 
 import pytest
 
-from bot.tools.cache import OrdersCache
-
-getcontext().prec = 10
+from bot.tools.cache import Fill, OrdersCache
+from bot.tools.fixed_point import NANO, average
 
 
 @pytest.fixture
 def cache_preset():
-    return OrdersCache(100, Decimal('50'))
+    return OrdersCache(100, 50 * NANO)
 
 
 @pytest.fixture
 def filled_cache():
-    cache = OrdersCache(50, Decimal('50'))
-    cache.update('second', 200, Decimal('200'))
-    cache.update('third', 300, Decimal('300'))
+    cache = OrdersCache(50, 50 * NANO)
+    cache.update('second', 200, 200 * NANO)
+    cache.update('third', 300, 300 * NANO)
     return cache
 
 
 def test_empty_cache():
     empty = OrdersCache()
     assert empty.amount == 0
-    assert empty.avg_price == Decimal('0')
+    assert empty.avg_price == 0
     assert empty.items == {}
 
 
@@ -32,7 +31,8 @@ def test_empty_cache():
     'error_values',
     (
         ('a', 0),
-        (0, 0),
+        (0, Decimal('0')),
+        (10, 1.5),
     )
 )
 def test_incorrect_init(error_values):
@@ -43,27 +43,27 @@ def test_incorrect_init(error_values):
 def test_correct_init(cache_preset):
     retrieved = cache_preset.items['initial']
     assert retrieved.amount == 100
-    assert retrieved.price == Decimal('50')
+    assert retrieved.price == 50 * NANO
 
 
 def test_correct_update_add_new(cache_preset):
-    cache_preset.update('second', 200, Decimal('30'))
+    cache_preset.update('second', 200, 30 * NANO)
     retrieved = cache_preset.items['second']
     assert retrieved.amount == 200
-    assert retrieved.price == Decimal('30')
+    assert retrieved.price == 30 * NANO
 
 
 def test_correct_update_existing(cache_preset):
-    cache_preset.update('initial', 200, Decimal('30'))
+    cache_preset.update('initial', 200, 30 * NANO)
     retrieved = cache_preset.items['initial']
     assert retrieved.amount == 200
-    assert retrieved.price == Decimal('30')
+    assert retrieved.price == 30 * NANO
 
 
 def test_correct_average(filled_cache: OrdersCache):
     avg = filled_cache.avg_price
-    assert isinstance(avg, Decimal)
-    assert avg == Decimal('240.9090909')
+    assert isinstance(avg, int)
+    assert avg == 240_909_090_909
 
 
 def test_correct_sum(filled_cache: OrdersCache):
@@ -73,18 +73,49 @@ def test_correct_sum(filled_cache: OrdersCache):
 
 
 def test_price_by_id(filled_cache: OrdersCache):
-    assert filled_cache.price_by_id('initial') == Decimal('50')
-    assert filled_cache.price_by_id('second') == Decimal('200')
-    assert filled_cache.price_by_id('third') == Decimal('300')
+    assert filled_cache.price_by_id('initial') == 50 * NANO
+    assert filled_cache.price_by_id('second') == 200 * NANO
+    assert filled_cache.price_by_id('third') == 300 * NANO
     assert filled_cache.price_by_id('non_existant') == 0
 
 
 def test_executed_by_id(cache_preset: OrdersCache):
     amount = randint(1, 100)
     id = str(randint(100000, 200000))
-    cache_preset.update(id, amount, Decimal(randint(50, 100)))
+    cache_preset.update(id, amount, randint(50, 100) * NANO)
     assert cache_preset.executed_by_id(id) == amount
 
 
 def test_non_existing_order_id_amount(cache_preset: OrdersCache):
     assert cache_preset.executed_by_id('non_existing') == 0
+
+
+def recomputed(orders):
+    total = sum(item.price * item.amount for item in orders.values())
+    amount = sum(item.amount for item in orders.values())
+    if not amount:
+        return 0, 0
+    return average(total, amount), amount
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_running_average_matches_full_recount(seed):
+    rng = Random(seed)
+    cache = OrdersCache(rng.randint(1, 100), rng.randint(1, 500) * NANO)
+    for _ in range(200):
+        order_id = str(rng.randint(0, 10))
+        amount = cache.executed_by_id(order_id) + rng.randint(0, 20)
+        cache.update(order_id, amount, rng.randint(1, 10**12))
+        assert (cache.avg_price, cache.amount) == recomputed(cache.items)
+    assert sum(fill.amount for fill in cache.fills()) == cache.amount
+
+
+def test_fill_history_records_increments(cache_preset: OrdersCache):
+    cache_preset.update('second', 10, 30 * NANO)
+    cache_preset.update('second', 30, 40 * NANO)
+    cache_preset.update('second', 30, 40 * NANO)
+    assert list(cache_preset.fills()) == [
+        Fill('initial', 100, 50 * NANO),
+        Fill('second', 10, 30 * NANO),
+        Fill('second', 20, 45 * NANO),
+    ]
@@ -0,0 +1,97 @@
+import pytest
+from grpc import ChannelConnectivity, StatusCode
+from tinkoff.invest import exceptions
+
+from bot.tools.clients import PooledClient
+
+
+class FakeChannel:
+    def __init__(self):
+        self.state = ChannelConnectivity.READY
+
+    def get_state(self, try_to_connect=False):
+        return self.state
+
+
+class FakeClient:
+    instances = []
+
+    def __init__(self, token, settings, target=None):
+        self._channel = None
+        self.closed = False
+        self.instances.append(self)
+
+    async def __aenter__(self):
+        self._channel = FakeChannel()
+        return object()
+
+    async def __aexit__(self, *args):
+        self.closed = True
+
+
+@pytest.fixture
+def opened_clients(monkeypatch):
+    monkeypatch.setattr(FakeClient, 'instances', [])
+    monkeypatch.setattr('bot.tools.clients.AsyncRetryingClient', FakeClient)
+    return FakeClient.instances
+
+
+@pytest.mark.asyncio
+async def test_client_is_opened_lazily(opened_clients):
+    pooled = PooledClient('token')
+    assert not opened_clients
+    async with pooled:
+        pass
+    assert len(opened_clients) == 1
+
+
+@pytest.mark.asyncio
+async def test_services_are_reused(opened_clients):
+    pooled = PooledClient('token')
+    async with pooled as first:
+        pass
+    async with pooled as second:
+        pass
+    assert first is second
+    assert len(opened_clients) == 1
+
+
+@pytest.mark.parametrize(
+    'code', (StatusCode.UNAVAILABLE, StatusCode.UNKNOWN, StatusCode.NOT_FOUND)
+)
+@pytest.mark.asyncio
+async def test_keeps_shared_channel_after_request_error(opened_clients, code):
+    pooled = PooledClient('token')
+    with pytest.raises(exceptions.AioRequestError):
+        async with pooled:
+            raise exceptions.AioRequestError(code, 'failed', None)
+    async with pooled:
+        pass
+    assert opened_clients[0].closed is False
+    assert len(opened_clients) == 1
+
+
+@pytest.mark.asyncio
+async def test_reopens_unhealthy_channel(opened_clients):
+    pooled = PooledClient('token')
+    async with pooled:
+        pass
+    opened_clients[0]._channel.state = ChannelConnectivity.SHUTDOWN
+    async with pooled:
+        pass
+    assert opened_clients[0].closed is True
+    assert len(opened_clients) == 2
+
+
+@pytest.mark.asyncio
+async def test_replaced_channel_is_closed_after_its_users_are_done(
+    opened_clients,
+):
+    pooled = PooledClient('token')
+    async with pooled:
+        opened_clients[0]._channel.state = ChannelConnectivity.SHUTDOWN
+        async with pooled:
+            assert len(opened_clients) == 2
+        assert opened_clients[0].closed is False
+    assert opened_clients[0].closed is True
+    assert opened_clients[1].closed is False
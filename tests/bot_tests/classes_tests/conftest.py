@@ -4,7 +4,8 @@ from typing import Any, NamedTuple
 
 import pytest
 
-from bot.tools.trading_time import MOSCOW_ZONE, TradingTime
+from bot.tools.trading_time import (CALENDARS, LEGS_CALENDARS, MOSCOW_ZONE,
+                                    TradingTime)
 
 
 class AssetPreset(NamedTuple):
@@ -38,3 +39,12 @@ def patch_tradingtime_currenttime_for_march_2003_day_and_time(day, hour):
 @pytest.fixture()
 def patch_tradingtime():
     return patch_tradingtime_currenttime_for_march_2003_day_and_time
+
+
+@pytest.fixture(autouse=True)
+def clean_calendars():
+    CALENDARS.clear()
+    LEGS_CALENDARS.clear()
+    yield
+    CALENDARS.clear()
+    LEGS_CALENDARS.clear()
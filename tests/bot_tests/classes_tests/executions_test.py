@@ -0,0 +1,131 @@
+import pytest
+from tinkoff.invest.schemas import OrderExecutionReportStatus, Quotation
+
+from bot.tools.executions import ExecutionStream
+from bot.tools.fixed_point import NANO
+
+
+async def idle_stream(self):
+    pass
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    monkeypatch.setattr(ExecutionStream, '_run', idle_stream)
+    return ExecutionStream()
+
+
+def trades(mocker, order_id, *fills):
+    return mocker.Mock(
+        order_trades=mocker.Mock(
+            order_id=order_id,
+            trades=[
+                mocker.Mock(
+                    trade_id=trade_id,
+                    quantity=quantity,
+                    price=Quotation(units=price, nano=0),
+                )
+                for trade_id, quantity, price in fills
+            ],
+        )
+    )
+
+
+def go_live(stream, mocker):
+    stream._on_response(mocker.Mock(order_trades=None))
+
+
+@pytest.mark.asyncio
+async def test_fills_update_the_owning_asset(stream, mocker, sample_far_leg):
+    await stream.subscribe(sample_far_leg)
+    go_live(stream, mocker)
+    stream.track(sample_far_leg, 'o1', 2)
+    stream._on_response(trades(mocker, 'o1', ('t1', 5, 100), ('t2', 5, 110)))
+    assert sample_far_leg.order_cache.executed_by_id('o1') == 10
+    assert sample_far_leg.order_cache.price_by_id('o1') == 105 * NANO
+    assert sample_far_leg.executed == 60
+    assert sample_far_leg.updated.is_set()
+
+
+@pytest.mark.asyncio
+async def test_repeated_trades_are_ignored(stream, mocker, sample_far_leg):
+    await stream.subscribe(sample_far_leg)
+    stream.track(sample_far_leg, 'o1', 2)
+    stream._on_response(trades(mocker, 'o1', ('t1', 5, 100)))
+    stream._on_response(trades(mocker, 'o1', ('t1', 5, 100)))
+    assert sample_far_leg.order_cache.executed_by_id('o1') == 5
+
+
+@pytest.mark.asyncio
+async def test_filled_order_is_released(stream, mocker, sample_far_leg):
+    await stream.subscribe(sample_far_leg)
+    sample_far_leg.order_id, sample_far_leg.order_placed = 'o1', True
+    stream.track(sample_far_leg, 'o1', 2)
+    stream._on_response(trades(mocker, 'o1', ('t1', 20, 100)))
+    assert sample_far_leg.order_placed is False
+    assert sample_far_leg.order_id is None
+
+
+@pytest.mark.asyncio
+async def test_unknown_orders_are_ignored(stream, mocker, sample_far_leg):
+    await stream.subscribe(sample_far_leg)
+    stream.track(sample_far_leg, 'o1', 2)
+    stream._on_response(trades(mocker, 'other', ('t1', 5, 100)))
+    assert sample_far_leg.executed == 50
+    assert not sample_far_leg.updated.is_set()
+
+
+@pytest.mark.asyncio
+async def test_covers_only_orders_placed_while_live(
+    stream, mocker, sample_far_leg
+):
+    await stream.subscribe(sample_far_leg)
+    stream.track(sample_far_leg, 'before', 1)
+    go_live(stream, mocker)
+    stream.track(sample_far_leg, 'live', 1)
+    assert stream.covers('before') is False
+    assert stream.covers('live') is True
+
+
+@pytest.mark.asyncio
+async def test_reconnect_drops_coverage(stream, mocker, sample_far_leg):
+    await stream.subscribe(sample_far_leg)
+    go_live(stream, mocker)
+    stream.track(sample_far_leg, 'o1', 1)
+    stream._live = False
+    go_live(stream, mocker)
+    assert stream.covers('o1') is False
+
+
+@pytest.mark.asyncio
+async def test_unsubscribed_assets_are_not_tracked(
+    stream, mocker, sample_far_leg
+):
+    go_live(stream, mocker)
+    stream.track(sample_far_leg, 'o1', 1)
+    assert stream.covers('o1') is False
+
+
+@pytest.mark.asyncio
+async def test_trades_before_post_response_are_applied_on_track(
+    stream, mocker, sample_far_leg
+):
+    mocker.patch('bot.tools.classes.EXECUTIONS', stream)
+    await stream.subscribe(sample_far_leg)
+    go_live(stream, mocker)
+    stream._on_response(trades(mocker, 'o1', ('t1', 20, 100)))
+    sample_far_leg.parse_order_response(
+        mocker.Mock(
+            order_id='o1',
+            execution_report_status=(
+                OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_NEW
+            ),
+            lots_requested=2,
+            lots_executed=0,
+            executed_order_price=Quotation(units=0, nano=0),
+        )
+    )
+    assert stream.covers('o1') is True
+    assert sample_far_leg.order_cache.executed_by_id('o1') == 20
+    assert sample_far_leg.order_placed is False
+    assert sample_far_leg.order_id is None
@@ -0,0 +1,78 @@
+import pytest
+from tinkoff.invest.schemas import Quotation
+
+from bot.tools.fixed_point import NANO
+from bot.tools.market_data import OrderBookStream
+
+
+async def idle_stream(self):
+    pass
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    monkeypatch.setattr(OrderBookStream, '_run', idle_stream)
+    return OrderBookStream()
+
+
+def order_book(mocker, figi, bid, ask):
+    return mocker.Mock(
+        figi=figi,
+        bids=[mocker.Mock(price=Quotation(units=bid, nano=0))],
+        asks=[mocker.Mock(price=Quotation(units=ask, nano=0))],
+    )
+
+
+@pytest.mark.asyncio
+async def test_no_price_without_updates(stream, sample_far_leg):
+    await stream.subscribe(sample_far_leg)
+    assert stream.price(sample_far_leg) is None
+
+
+@pytest.mark.asyncio
+async def test_price_side_depends_on_direction(
+    stream, mocker, sample_far_leg, sample_near_leg
+):
+    sample_near_leg.figi = sample_far_leg.figi
+    await stream.subscribe(sample_far_leg, sample_near_leg)
+    stream._on_order_book(order_book(mocker, sample_far_leg.figi, 99, 100))
+    assert stream.price(sample_far_leg) == 100 * NANO
+    assert stream.price(sample_near_leg) == 99 * NANO
+    assert stream.figis == [sample_far_leg.figi]
+
+
+@pytest.mark.asyncio
+async def test_ignores_unsubscribed_figis(stream, mocker, sample_far_leg):
+    stream._on_order_book(order_book(mocker, sample_far_leg.figi, 99, 100))
+    assert stream.price(sample_far_leg) is None
+
+
+@pytest.mark.asyncio
+async def test_update_marks_subscribers_updated(
+    stream, mocker, sample_far_leg
+):
+    await stream.subscribe(sample_far_leg)
+    stream._on_order_book(order_book(mocker, sample_far_leg.figi, 99, 100))
+    assert sample_far_leg.updated.is_set()
+
+
+@pytest.mark.asyncio
+async def test_same_top_of_book_is_not_an_update(
+    stream, mocker, sample_far_leg
+):
+    await stream.subscribe(sample_far_leg)
+    stream._on_order_book(order_book(mocker, sample_far_leg.figi, 99, 100))
+    sample_far_leg.updated.clear()
+    stream._on_order_book(order_book(mocker, sample_far_leg.figi, 99, 100))
+    assert not sample_far_leg.updated.is_set()
+
+
+@pytest.mark.asyncio
+async def test_last_unsubscribe_drops_the_book(
+    stream, mocker, sample_far_leg
+):
+    await stream.subscribe(sample_far_leg)
+    stream._on_order_book(order_book(mocker, sample_far_leg.figi, 99, 100))
+    await stream.unsubscribe(sample_far_leg)
+    assert stream.figis == []
+    assert stream.price(sample_far_leg) is None
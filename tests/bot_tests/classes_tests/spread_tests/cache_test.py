@@ -1,6 +1,7 @@
 from decimal import Decimal
 
 from bot.tools.classes import Spread
+from bot.tools.fixed_point import NANO
 
 
 def test_next_near_leg_order_amount(sample_spread: Spread):
@@ -18,13 +19,15 @@ def test_cache_updates_correctly_after_new_orders(sample_spread: Spread):
     sample_spread.far_leg.order_id = '1111'
     sample_spread.near_leg.order_id = '2222'
     sample_spread.far_leg.order_cache.update(
-        sample_spread.far_leg.order_id, 10, Decimal('10')
+        sample_spread.far_leg.order_id, 10, 10 * NANO
     )
     sample_spread.near_leg.order_cache.update(
-        sample_spread.near_leg.order_id, 100, Decimal('-20')
+        sample_spread.near_leg.order_id, 100, -20 * NANO
     )
     assert sample_spread.executed == 60
-    assert sample_spread.avg_execution_price == Decimal(
-        (prev_avg * prev_executed + Decimal(10 * 10) - Decimal(100 * (-20)))
-        / sample_spread.executed
+    expected = (
+        prev_avg * prev_executed + 10 * 10 - 100 * (-20)
+    ) / sample_spread.executed
+    assert sample_spread.avg_execution_price == expected.quantize(
+        Decimal('1E-9')
     )
@@ -0,0 +1,71 @@
+import asyncio
+from copy import copy
+
+import pytest
+from tinkoff.invest.schemas import Quotation
+
+from bot.spreads import HEDGE, PLACE, SpreadEngine
+from bot.tools.cache import OrdersCache
+from bot.tools.classes import Spread
+from bot.tools.fixed_point import NANO
+
+
+@pytest.fixture
+def hedged_spread(sample_spread):
+    sample_spread.near_leg.order_cache = OrdersCache(500, 10 * NANO)
+    sample_spread.far_leg.new_price = 1000 * NANO
+    sample_spread.near_leg.new_price = 1 * NANO
+    return sample_spread
+
+
+def test_unhedged_spread_is_evened_first(sample_spread):
+    assert SpreadEngine([sample_spread])._next_action(sample_spread) == HEDGE
+
+
+def test_unchanged_state_schedules_nothing(hedged_spread):
+    engine = SpreadEngine([hedged_spread])
+    assert engine._next_action(hedged_spread) == PLACE
+    assert engine._next_action(hedged_spread) is None
+
+
+@pytest.mark.asyncio
+async def test_shared_legs_are_priced_once(hedged_spread, mocker):
+    twin = Spread(
+        copy(hedged_spread.far_leg),
+        copy(hedged_spread.near_leg),
+        True, 100, 4, 10, 100,
+    )
+    get_price = mocker.patch(
+        'bot.tools.classes.get_price_from_order_book',
+        return_value=Quotation(units=5, nano=0),
+    )
+    engine = SpreadEngine([hedged_spread, twin])
+    failed = await engine._refresh_prices([hedged_spread, twin])
+    assert failed == {}
+    assert get_price.await_count == 2
+    assert twin.near_leg.new_price == 5 * NANO
+
+
+@pytest.mark.asyncio
+async def test_scheduling_error_pauses_only_its_spread(hedged_spread, mocker):
+    broken = Spread(
+        copy(hedged_spread.far_leg),
+        copy(hedged_spread.near_leg),
+        True, 100, 4, 10, 100,
+    )
+    mocker.patch.object(
+        Spread,
+        'is_trading_now',
+        new_callable=mocker.PropertyMock,
+        side_effect=[True, ValueError('no schedule')],
+    )
+    mocker.patch(
+        'bot.tools.classes.get_price_from_order_book',
+        return_value=Quotation(units=5, nano=0),
+    )
+    queue = mocker.patch('bot.spreads.QUEUE', asyncio.Queue())
+    engine = SpreadEngine([hedged_spread, broken])
+    await engine._schedule()
+    assert hedged_spread not in engine._paused
+    assert not engine._can_schedule(broken)
+    assert queue.get_nowait() == f'{broken}: no schedule, waiting for 1 minute'
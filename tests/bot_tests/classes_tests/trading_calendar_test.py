@@ -0,0 +1,91 @@
+from datetime import date, datetime, time
+from types import SimpleNamespace
+
+import pytest
+
+from bot.tools import trading_time
+from bot.tools.trading_time import (MOSCOW_ZONE, TIME_OFFSET, TradingCalendar,
+                                    get_calendar, get_legs_calendar,
+                                    trading_sessions)
+
+OFFSET = TIME_OFFSET.seconds
+FUTURES = trading_sessions('F', True, True)
+STOCKS = trading_sessions('S', False, False)
+
+
+def leg(asset_type, morning=False, evening=False):
+    return SimpleNamespace(
+        asset_type=asset_type, morning_trading=morning, evening_trading=evening
+    )
+
+
+def moment(day, *tyme):
+    return datetime(2023, 3, day, *tyme, tzinfo=MOSCOW_ZONE)
+
+
+def test_holiday_is_skipped_till_next_trading_day(monkeypatch):
+    monkeypatch.setattr(trading_time, 'HOLIDAYS', {date(2023, 3, 8)})
+    calendar = TradingCalendar.build(FUTURES, moment(7, 23, 55))
+    now = moment(7, 23, 55).timestamp()
+    assert calendar.is_trading(moment(8, 12).timestamp()) is False
+    assert calendar.next_open(now) == moment(9, 9, 0, OFFSET).timestamp()
+    assert calendar.seconds_till_open(now) == (
+        5 * 60 + 24 * 60 * 60 + 9 * 60 * 60 + OFFSET
+    )
+
+
+def test_short_day_cuts_sessions_after_early_close(monkeypatch):
+    monkeypatch.setattr(
+        trading_time, 'SHORT_DAYS', {date(2023, 3, 7): time(14)}
+    )
+    calendar = TradingCalendar.build(FUTURES, moment(7))
+    assert calendar.is_trading(moment(7, 13, 59, 50).timestamp()) is False
+    assert calendar.is_trading(moment(7, 13, 59, 40).timestamp()) is True
+    assert calendar.is_trading(moment(7, 15).timestamp()) is False
+    assert calendar.next_open(moment(7, 15).timestamp()) == (
+        moment(8, 9, 0, OFFSET).timestamp()
+    )
+
+
+@pytest.mark.parametrize(
+    ('tyme', 'result'),
+    (
+        ((9, 30), False),
+        ((10, 0, OFFSET), True),
+        ((14, 2), False),
+        ((18, 39, 44), True),
+        ((18, 39, 45), False),
+        ((20, 0), False),
+    ),
+)
+def test_intersection_keeps_common_sessions(tyme, result):
+    futures = TradingCalendar.build(FUTURES, moment(1))
+    stocks = TradingCalendar.build(STOCKS, moment(1))
+    common = futures.intersect(stocks)
+    assert common.is_trading(moment(1, *tyme).timestamp()) is result
+
+
+def test_calendar_is_shared_and_rebuilt_after_its_horizon():
+    calendar = get_calendar('F', True, True, moment(1))
+    assert get_calendar('F', 1, 1, moment(20)) is calendar
+    assert get_calendar('F', True, True, moment(31)) is not calendar
+
+
+def test_legs_calendar_is_memoized_by_signature_till_day_rollover():
+    calendar = get_legs_calendar((leg('F', True), leg('S')), moment(1, 10))
+    assert get_legs_calendar((leg('S'), leg('F', 1)), moment(1, 20)) is (
+        calendar
+    )
+    assert get_legs_calendar((leg('S'), leg('F', 1)), moment(2)) is not (
+        calendar
+    )
+
+
+@pytest.mark.parametrize(
+    ('tyme', 'result'),
+    (((9, 30), False), ((12, 0), True), ((18, 45), False), ((21, 0), False)),
+)
+def test_legs_calendar_intersects_any_number_of_legs(tyme, result):
+    legs = (leg('F', True, True), leg('S', True, True), leg('S'))
+    calendar = get_legs_calendar(legs, moment(1))
+    assert calendar.is_trading(moment(1, *tyme).timestamp()) is result
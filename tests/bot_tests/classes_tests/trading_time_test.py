@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 
@@ -42,9 +42,9 @@ class GenericTradingTimeTester:
 
     @property
     def midnights_count_till_trading_starts(self) -> int:
-        return (
-            self.create_tradingtime_object._midnights_count_till_trading_day
-        )
+        now = datetime(2023, 3, self._day, *self._time, tzinfo=MOSCOW_ZONE)
+        opening = now + timedelta(seconds=self.seconds_till_trading_starts)
+        return (opening.date() - now.date()).days
 
     @property
     def seconds_till_trading_starts(self) -> int:
@@ -0,0 +1,57 @@
+import datetime
+
+import numpy as np
+
+from bot.scanner.columns import (annualized_yields, column, days_till,
+                                 dividend_yields, top_k)
+from bot.scanner.scanner import ProfitCounter, SpreadScanner
+
+
+def test_yields_match_profit_counter(
+    sample_f_f_yielding_spread, sample_s_f_yielding_spread,
+    sample_yielding_spread,
+):
+    scanner = SpreadScanner()
+    scanner._spreads = [
+        sample_f_f_yielding_spread,
+        sample_s_f_yielding_spread,
+        sample_yielding_spread,
+    ]
+    yields = scanner.count_yields()
+    for spread, value in zip(scanner._spreads, yields):
+        _, profit, _, _ = ProfitCounter(spread).calculate_profit()
+        assert round(float(value), 2) == profit
+
+
+def test_days_till_floors_like_timedelta():
+    now = datetime.datetime(2033, 1, 1, 12, tzinfo=datetime.timezone.utc)
+    moments = [
+        now + datetime.timedelta(days=10, hours=23),
+        now + datetime.timedelta(hours=1),
+        now - datetime.timedelta(hours=1),
+    ]
+    assert days_till(moments, now).tolist() == [
+        (moment - now).days for moment in moments
+    ]
+
+
+def test_expiring_today_is_never_selected():
+    yields = annualized_yields(
+        column([100, 100]), column([1000, 1000]), column([0, 30])
+    )
+    assert top_k(yields, 10, yields > 0) == [1]
+
+
+def test_dividend_yields_only_for_negative_delta():
+    yields = dividend_yields(
+        column([100, 100]), column([90, 110]), column([1, 1]),
+        column([0, 0]), 10.0,
+    )
+    assert yields[0] == 10
+    assert yields[1] == -np.inf
+
+
+def test_top_k_orders_and_limits():
+    values = column([5, 1, 9, 7, 3, 9])
+    assert top_k(values, 3, values > 2) == [2, 5, 3]
+    assert top_k(values, 10, values > 6) == [2, 5, 3]
@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bot.scanner.live import LiveScanner, live_scan
+
+
+class FakeScanner:
+    def __init__(self, prices, pairs):
+        self.prices = prices
+        self.pairs = pairs
+        self.counted = []
+
+    async def prepare(self):
+        pass
+
+    @property
+    def legs(self):
+        return [
+            (SimpleNamespace(figi=near), SimpleNamespace(figi=far))
+            for near, far in self.pairs
+        ]
+
+    def update_price(self, leg, price):
+        self.prices[leg.figi] = price
+
+    def passes(self, yields):
+        return yields > 5
+
+    def count_yields(self, indices=None):
+        if indices is None:
+            indices = range(len(self.pairs))
+        self.counted.append(list(indices))
+        return np.array(
+            [
+                self.prices[self.pairs[index][1]]
+                - self.prices[self.pairs[index][0]]
+                for index in indices
+            ],
+            dtype=float,
+        )
+
+    def render(self, indices):
+        return ['-'.join(self.pairs[index]) for index in indices]
+
+
+@pytest.mark.asyncio
+async def test_live_scanner_recounts_moved_spreads_and_reports_changes(
+    mocker,
+):
+    queue = mocker.patch('bot.scanner.live.QUEUE', asyncio.Queue())
+    scanner = FakeScanner(
+        {'A': 100, 'B': 110, 'C': 103, 'D': 100, 'E': 101},
+        [('A', 'B'), ('A', 'C'), ('D', 'E')],
+    )
+    live = LiveScanner(scanner, limit=2)
+    await scanner.prepare()
+    live._index_legs()
+    live._yields = scanner.count_yields()
+    await live._publish()
+    assert queue.get_nowait() == '+ A-B'
+
+    live._pending = {'C': 120, 'B': 104}
+    live._recount()
+    await live._publish()
+
+    assert scanner.counted[-1] == [0, 1]
+    assert queue.get_nowait() == '+ A-C\n- A-B'
+
+    live._pending = {'E': 101}
+    live._recount()
+    await live._publish()
+    assert scanner.counted[-1] == [2]
+    assert queue.empty()
+
+
+async def silent_prices(figis):
+    await asyncio.Event().wait()
+    yield
+
+
+@pytest.mark.asyncio
+async def test_stopped_live_scan_returns_current_top(mocker):
+    mocker.patch('bot.scanner.live.QUEUE', asyncio.Queue())
+    mocker.patch('bot.scanner.live.last_prices', silent_prices)
+    mocker.patch(
+        'bot.scanner.live.SpreadScanner',
+        return_value=FakeScanner(
+            {'A': 100, 'B': 110, 'C': 101}, [('A', 'B'), ('A', 'C')]
+        ),
+    )
+    scan = asyncio.create_task(live_scan('lscan', []))
+    await asyncio.sleep(0.01)
+    scan.cancel()
+    assert await scan == 'Live scan stopped, current top:\nA-B'
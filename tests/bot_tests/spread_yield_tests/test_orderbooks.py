@@ -0,0 +1,46 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from tinkoff.invest.schemas import Quotation
+
+from bot.scanner.scanner import DividendScanner, OrderBook
+
+
+def levels(*prices):
+    return [SimpleNamespace(price=Quotation(units=p, nano=0)) for p in prices]
+
+
+BOOKS = {
+    'full': SimpleNamespace(bids=levels(10), asks=levels(11)),
+    'no_bids': SimpleNamespace(bids=[], asks=levels(21)),
+    'empty': SimpleNamespace(bids=[], asks=[]),
+}
+
+
+@pytest.mark.asyncio
+async def test_one_sided_books_share_a_single_last_prices_call(mocker):
+    mocker.patch(
+        'bot.scanner.scanner.SimpleTradingTime'
+    ).return_value.is_trading_now = True
+    mocker.patch(
+        'bot.scanner.scanner.get_order_book', side_effect=BOOKS.get
+    )
+    last_prices = mocker.patch(
+        'bot.scanner.scanner.get_current_prices_by_uid',
+        return_value={'no_bids': Decimal('20'), 'empty': Decimal('30')},
+    )
+    scanner = DividendScanner(10)
+    scanner._filtered_futures = {
+        'A': [SimpleNamespace(uid='full'), SimpleNamespace(uid='no_bids')]
+    }
+    scanner._filtered_shares = {'A': SimpleNamespace(uid='empty')}
+
+    await scanner._update_orderbooks()
+
+    last_prices.assert_awaited_once_with(['no_bids', 'empty'])
+    assert scanner._orderbooks == {
+        'full': OrderBook(bid=Decimal('10'), ask=Decimal('11')),
+        'no_bids': OrderBook(bid=Decimal('20'), ask=Decimal('21')),
+        'empty': OrderBook(bid=Decimal('30'), ask=Decimal('30')),
+    }
@@ -0,0 +1,61 @@
+import datetime
+from decimal import Decimal
+
+from bot.scanner.scanner import FutureData, SpreadScanner, StockData
+
+
+def future(ticker, basic_asset, month, price):
+    return FutureData(
+        figi=f'FUT{ticker}',
+        ticker=ticker,
+        price=Decimal(price),
+        basic_asset=basic_asset,
+        basic_asset_size=10,
+        expiration_date=datetime.datetime(
+            2033, month, 1, tzinfo=datetime.timezone.utc
+        ),
+        short_enabled=True,
+    )
+
+
+def pairs(scanner):
+    return sorted(
+        (spread.near_leg.ticker, spread.far_leg.ticker)
+        for spread in scanner._spreads
+    )
+
+
+def test_spreads_pair_only_same_underlying_by_expiration():
+    scanner = SpreadScanner()
+    scanner._stocks = [
+        StockData('BBGMGNT', 'MGNT'),
+        StockData('BBGSBER', 'SBER'),
+    ]
+    scanner._futures = [
+        future('MNZ3', 'MGNT', 12, '4700'),
+        future('MNM3', 'MGNT', 6, '4600'),
+        future('MNU3', 'MGNT', 9, '4650'),
+        future('SRM3', 'SBER', 6, '2500'),
+        future('SRU3', 'SBER', 9, '2400'),
+    ]
+    scanner._build_spreads()
+    assert pairs(scanner) == [
+        ('MGNT', 'MNM3'),
+        ('MGNT', 'MNU3'),
+        ('MGNT', 'MNZ3'),
+        ('MNM3', 'MNU3'),
+        ('MNM3', 'MNZ3'),
+        ('MNU3', 'MNZ3'),
+        ('SBER', 'SRM3'),
+        ('SBER', 'SRU3'),
+    ]
+
+
+def test_same_expiration_pairs_by_price():
+    scanner = SpreadScanner()
+    scanner._futures = [
+        future('MNM3', 'MGNT', 6, '4600'),
+        future('MNM4', 'MGNT', 6, '4610'),
+    ]
+    scanner._build_spreads()
+    assert pairs(scanner) == [('MNM3', 'MNM4')]
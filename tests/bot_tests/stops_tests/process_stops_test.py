@@ -0,0 +1,49 @@
+import pytest
+from grpc import StatusCode
+from tinkoff.invest import exceptions
+
+from bot.place_stops import LONG_STOP_PARAMS, process_stops
+
+
+@pytest.fixture
+def placed(mocker):
+    mocker.patch('bot.place_stops.STOP_ORDERS_BUCKET.acquire')
+    return mocker.patch('bot.place_stops.place_stop_order')
+
+
+@pytest.mark.asyncio
+async def test_all_stops_are_placed(placed, sample_far_leg, sample_near_leg):
+    result = await process_stops(
+        [sample_far_leg, sample_near_leg], ('5', '10'), 300000,
+        LONG_STOP_PARAMS,
+    )
+    assert placed.call_count == 4
+    assert result.startswith(
+        'Stop placement complete. 4 stops placed, 0 failed.'
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_stop_is_not_posted_again(placed, sample_far_leg):
+    placed.side_effect = exceptions.AioRequestError(
+        StatusCode.UNKNOWN, 'maybe accepted', None
+    )
+    result = await process_stops(
+        [sample_far_leg], ('5',), 300000, LONG_STOP_PARAMS
+    )
+    assert placed.call_count == 1
+    assert '0 stops placed, 1 failed' in result
+
+
+@pytest.mark.asyncio
+async def test_rejected_stop_is_reported(placed, sample_far_leg):
+    placed.side_effect = [
+        exceptions.AioRequestError(StatusCode.INVALID_ARGUMENT, 'bad', None),
+        None,
+    ]
+    result = await process_stops(
+        [sample_far_leg], ('5', '10'), 300000, LONG_STOP_PARAMS
+    )
+    assert placed.call_count == 2
+    assert '1 stops placed, 1 failed' in result
+    assert f'\n{sample_far_leg.ticker} at 190.00: ' in result
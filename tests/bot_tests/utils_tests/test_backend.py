@@ -0,0 +1,53 @@
+import aiohttp
+import pytest
+
+from bot.tools.backend import BackendClient, read_status
+
+
+def responses(mocker, method, *outcomes):
+    side_effect = []
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            side_effect.append(outcome)
+            continue
+        response = mocker.MagicMock()
+        response.__aenter__.return_value.status = outcome
+        side_effect.append(response)
+    return mocker.patch(
+        f'aiohttp.ClientSession.{method}', side_effect=side_effect
+    )
+
+
+@pytest.mark.asyncio
+async def test_backend_retries_failed_requests_with_backoff(mocker):
+    sleep = mocker.patch('bot.tools.backend.asyncio.sleep')
+    get = responses(
+        mocker, 'get', aiohttp.ServerDisconnectedError(), 502, 200
+    )
+    client = BackendClient('http://backend/', retries=3, backoff=1)
+    assert await client.get('health/', read=read_status) == 200
+    assert get.call_count == 3
+    assert [call.args[0] for call in sleep.call_args_list] == [1, 2]
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_backend_does_not_repeat_sent_posts(mocker):
+    mocker.patch('bot.tools.backend.asyncio.sleep')
+    post = responses(mocker, 'post', aiohttp.ServerDisconnectedError(), 201)
+    client = BackendClient('http://backend/', retries=3)
+    with pytest.raises(aiohttp.ServerDisconnectedError):
+        await client.post('sellbuy/', read=read_status)
+    assert post.call_count == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_backend_reuses_one_session(mocker):
+    responses(mocker, 'get', 200, 200)
+    client = BackendClient('http://backend/')
+    await client.get('health/', read=read_status)
+    session = client._session
+    await client.get('health/', read=read_status)
+    assert client._session is session
+    await client.close()
@@ -0,0 +1,80 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from bot.backend_jobs import await_job, backend_job, job_report
+
+
+def job(status, done=0, failed=0):
+    return {
+        'id': 1,
+        'kind': 'restore',
+        'status': status,
+        'total': 3,
+        'done': done,
+        'failed': failed,
+        'result': '3 stop orders processed.' if done else '',
+        'errors': 'Price is out of range\n' if failed else '',
+    }
+
+
+@pytest.mark.asyncio
+async def test_backend_job_is_enqueued_and_awaited(mocker):
+    sleep = mocker.patch('bot.backend_jobs.asyncio.sleep')
+    post = mocker.patch(
+        'bot.backend_jobs.async_post_api_data',
+        return_value=(HTTPStatus.ACCEPTED, job('pending')),
+    )
+    get = mocker.patch(
+        'bot.backend_jobs.async_get_api_data',
+        side_effect=[job('running', 1), job('done', 2, 1)],
+    )
+    report = await backend_job('restore', '')
+    post.assert_awaited_once_with('jobs', json={'kind': 'restore'})
+    assert get.await_count == sleep.await_count == 2
+    assert report == (
+        'Job restore done: 2/3 done, 1 failed.\n'
+        '3 stop orders processed.\nPrice is out of range'
+    )
+
+
+@pytest.mark.asyncio
+async def test_rejected_job_raises_error(mocker):
+    mocker.patch(
+        'bot.backend_jobs.async_post_api_data',
+        return_value=(HTTPStatus.BAD_REQUEST, {'kind': ['Unknown']}),
+    )
+    with pytest.raises(ValueError):
+        await backend_job('nuke', '')
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_job_is_limited(mocker):
+    mocker.patch('bot.backend_jobs.JOB_POLL_PAUSE', 0.01)
+    get = mocker.patch(
+        'bot.backend_jobs.async_get_api_data', return_value=job('pending')
+    )
+    pending = await await_job(job('pending'), timeout=0.05)
+    assert get.await_count > 0
+    assert job_report(pending).startswith(
+        'Job restore #1 is still pending after'
+    )
+
+
+@pytest.mark.asyncio
+async def test_stopped_job_waiting_returns_summary(mocker):
+    mocker.patch(
+        'bot.backend_jobs.async_post_api_data',
+        return_value=(HTTPStatus.ACCEPTED, job('pending')),
+    )
+    mocker.patch(
+        'bot.backend_jobs.async_get_api_data', return_value=job('running')
+    )
+    mocker.patch('bot.backend_jobs.JOB_POLL_PAUSE', 0.01)
+    task = asyncio.create_task(backend_job('restore', ''))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    assert await task == (
+        'Stopped waiting for job restore #1, it keeps running in the backend.'
+    )
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+import pytest
+from tinkoff.invest.schemas import Quotation
+
+from bot.tools.fixed_point import (NANO, average, floor_to_tick, from_decimal,
+                                   from_quotation, to_decimal, to_quotation)
+
+
+@pytest.mark.parametrize(
+    ('quotation', 'nanos'),
+    (
+        (Quotation(units=105, nano=500000000), 105_500_000_000),
+        (Quotation(units=0, nano=1), 1),
+        (Quotation(units=-1, nano=-250000000), -1_250_000_000),
+        (Quotation(units=0, nano=0), 0),
+    ),
+)
+def test_quotation_round_trip(quotation, nanos):
+    assert from_quotation(quotation) == nanos
+    result = to_quotation(nanos)
+    assert (result.units, result.nano) == (quotation.units, quotation.nano)
+
+
+@pytest.mark.parametrize(
+    ('value', 'text'),
+    (('0.01', '0.01'), ('240.909090909', '240.909090909'), ('100', '100')),
+)
+def test_decimal_round_trip(value, text):
+    nanos = from_decimal(Decimal(value))
+    assert str(to_decimal(nanos)) == text
+
+
+def test_decimal_conversion_ignores_global_precision():
+    assert from_decimal(Decimal('123456789.123456789')) == (
+        123456789 * NANO + 123456789
+    )
+
+
+def test_average_rounds_to_nearest_nano():
+    assert average(2, 3) == 1
+    assert average(1, 3) == 0
+    assert average(-20 * NANO, 3) == -6_666_666_667
+
+
+def test_floor_to_tick():
+    tick = from_decimal(Decimal('0.05'))
+    assert floor_to_tick(from_decimal(Decimal('100.07')), tick) == (
+        from_decimal(Decimal('100.05'))
+    )
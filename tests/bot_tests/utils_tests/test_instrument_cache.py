@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from bot.tools.instrument_cache import InstrumentCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return InstrumentCache(str(tmp_path), ttl=60)
+
+
+def test_missing_entry(cache):
+    assert cache.get('shares') is None
+
+
+def test_stored_entry_is_read_back(cache):
+    cache.set('margins', {'figi': 1})
+    assert cache.get('margins') == {'figi': 1}
+
+
+def test_expired_entry_is_ignored(tmp_path):
+    cache = InstrumentCache(str(tmp_path), ttl=-1)
+    cache.set('shares', [1])
+    assert cache.get('shares') is None
+
+
+def test_entries_of_other_days_are_dropped(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, '_trading_day', lambda: '2023-01-01')
+    cache.set('shares', [1])
+    monkeypatch.setattr(cache, '_trading_day', lambda: '2023-01-02')
+    assert cache.get('shares') is None
+    cache.set('shares', [2])
+    assert os.listdir(tmp_path) == ['shares-2023-01-02.pickle']
+
+
+def test_invalidate_clears_everything(cache):
+    cache.set('shares', [1])
+    cache.set('futures', [2])
+    cache.invalidate()
+    assert cache.get('shares') is None
+    assert cache.get('futures') is None
@@ -0,0 +1,19 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from bot.tools.loop_monitor import monitor_loop_lag
+
+
+@pytest.mark.asyncio
+async def test_blocking_callback_is_logged(caplog):
+    monitor = asyncio.create_task(monitor_loop_lag(0.01, 0.05))
+    with caplog.at_level(logging.WARNING):
+        await asyncio.sleep(0.03)
+        assert not caplog.records
+        time.sleep(0.1)
+        await asyncio.sleep(0.03)
+    monitor.cancel()
+    assert 'Event loop was blocked' in caplog.text
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from bot.tools.throttling import TokenBucket, gather_limited, log_duration
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_a_burst_then_waits():
+    bucket = TokenBucket(20, per=1, capacity=2)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(2):
+        await bucket.acquire()
+    assert loop.time() - start < 0.02
+    await bucket.acquire()
+    assert loop.time() - start >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_gather_limited_keeps_order_and_bounds_concurrency():
+    running, peak, reports = 0, 0, []
+
+    async def fetch(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (5 - item))
+        running -= 1
+        return item * 10
+
+    result = await gather_limited(
+        fetch,
+        list(range(5)),
+        2,
+        progress=lambda done, total: reports.append((done, total)),
+    )
+    assert result == [0, 10, 20, 30, 40]
+    assert peak == 2
+    assert reports[-1] == (5, 5)
+
+
+@pytest.mark.asyncio
+async def test_gather_limited_cancels_remaining_tasks_on_failure():
+    started = []
+
+    async def fetch(item):
+        started.append(item)
+        if item == 0:
+            raise ValueError('no order book')
+        await asyncio.sleep(1)
+
+    tasks_before = asyncio.all_tasks()
+    with pytest.raises(ValueError):
+        await gather_limited(fetch, list(range(5)), 2)
+    assert started == [0, 1, 2]
+    assert asyncio.all_tasks() == tasks_before
+
+
+def test_durations_are_logged_at_visible_level(caplog):
+    caplog.set_level('WARNING')
+    with log_duration('Dividend scan: prices'):
+        pass
+    assert 'Dividend scan: prices' in caplog.text
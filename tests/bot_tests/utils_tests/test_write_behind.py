@@ -0,0 +1,102 @@
+import asyncio
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+
+from bot.tools.get_patch_prepare_data import async_patch_progress
+from bot.tools.write_behind import WriteBehind
+
+
+class Backend:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.written = []
+
+    async def write(self, updates):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('backend is down')
+        self.written.append(
+            {key: dict(item) for key, item in updates.items()}
+        )
+        return True
+
+
+@pytest.mark.asyncio
+async def test_updates_are_coalesced_into_one_write_of_latest_states():
+    backend = Backend()
+    persistence = WriteBehind(backend.write, delay=0.01)
+    spread = {'executed': 0}
+    for executed in (1, 2, 3):
+        spread['executed'] = executed
+        persistence.put(('spreads', 1), spread)
+    persistence.put(('sellbuy', 2), {'executed': 5})
+    await asyncio.sleep(0.05)
+    assert backend.written == [
+        {('spreads', 1): {'executed': 3}, ('sellbuy', 2): {'executed': 5}}
+    ]
+    assert len(persistence) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_are_retried_till_drained():
+    backend = Backend(failures=2)
+    persistence = WriteBehind(backend.write, delay=0)
+    persistence.put(('sellbuy', 1), {'executed': 10})
+    assert await persistence.drain() is True
+    assert backend.written == [{('sellbuy', 1): {'executed': 10}}]
+
+
+@pytest.mark.asyncio
+async def test_drain_gives_up_after_attempts():
+    backend = Backend(failures=10)
+    persistence = WriteBehind(backend.write, delay=0, attempts=3)
+    persistence.put(('sellbuy', 1), {'executed': 10})
+    assert await persistence.drain() is False
+    assert len(persistence) == 1
+
+
+@pytest.fixture
+def queue_put(mocker):
+    mocker.patch.dict(
+        'bot.tools.get_patch_prepare_data.PROGRESS_ADAPTERS',
+        {'sellbuy': lambda item: SimpleNamespace(output=item)},
+    )
+    return mocker.patch('bot.tools.get_patch_prepare_data.QUEUE.put')
+
+
+def progress_response(mocker, *response):
+    return mocker.patch(
+        'bot.tools.get_patch_prepare_data.BACKEND.patch',
+        return_value=response,
+    )
+
+
+@pytest.mark.asyncio
+async def test_rejected_progress_is_kept_for_next_flush(queue_put, mocker):
+    progress_response(mocker, HTTPStatus.BAD_REQUEST, {'id': 'bad'})
+    persistence = WriteBehind(async_patch_progress, delay=0, attempts=2)
+    persistence.put(('sellbuy', 1), {'executed': 10})
+    assert await persistence.drain() is False
+    assert len(persistence) == 1
+
+
+@pytest.mark.asyncio
+async def test_progress_of_deleted_entries_is_reported(queue_put, mocker):
+    progress_response(
+        mocker,
+        HTTPStatus.OK,
+        {
+            'spreads': 0,
+            'sellbuy': 1,
+            'missing': {'spreads': [], 'sellbuy': [2]},
+        },
+    )
+    persistence = WriteBehind(async_patch_progress, delay=0)
+    persistence.put(('sellbuy', 1), {'executed': 10})
+    persistence.put(('sellbuy', 2), {'executed': 5})
+    assert await persistence.drain() is True
+    queue_put.assert_awaited_once_with(
+        "Progress of deleted entries dropped: {'sellbuy': [2]}"
+    )
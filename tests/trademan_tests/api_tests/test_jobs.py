@@ -0,0 +1,85 @@
+import pytest
+from base.jobs import (HANDLERS, JobHandler, JobWorker, claim, enqueue_once,
+                       unfinished_job)
+from base.models import Job
+from django.urls import reverse
+from rest_framework import status
+
+
+class InlineExecutor:
+    def submit(self, function, *args):
+        function(*args)
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    def refresh(progress):
+        progress.set_total(1)
+        progress.step()
+        return 'Refreshed'
+
+    monkeypatch.setitem(HANDLERS, 'update', JobHandler(refresh, 'update', 1))
+    worker = JobWorker(pause=0)
+    worker._executor = InlineExecutor()
+    return worker
+
+
+@pytest.mark.django_db
+def test_worker_respects_concurrency_limit_of_job_group(worker, monkeypatch):
+    monkeypatch.setitem(HANDLERS, 'stash', HANDLERS['update'])
+    first = Job.objects.create(kind='update')
+    second = Job.objects.create(kind='stash')
+    assert worker.run_pending() == [first]
+    first.refresh_from_db()
+    assert (first.status, first.done, first.result) == ('done', 1, 'Refreshed')
+    assert Job.objects.get(id=second.id).status == 'pending'
+
+
+@pytest.mark.django_db
+def test_worker_does_not_start_jobs_over_running_ones(worker):
+    Job.objects.create(kind='update', status='running')
+    Job.objects.create(kind='update')
+    assert worker.run_pending() == []
+    assert worker.fail_interrupted() == 1
+    assert len(worker.run_pending()) == 1
+
+
+@pytest.mark.django_db
+def test_enqueued_job_is_reused_till_finished(client):
+    first = client.post(reverse('jobs-list'), {'kind': 'update'})
+    second = client.post(reverse('jobs-list'), {'kind': 'update'})
+    assert first.status_code == status.HTTP_202_ACCEPTED
+    assert first.data['status'] == 'pending'
+    assert second.data['id'] == first.data['id']
+
+
+@pytest.mark.django_db
+def test_unknown_job_kind_is_rejected(client):
+    response = client.post(reverse('jobs-list'), {'kind': 'nuke'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Job.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_stop_order_jobs_do_not_run_together(worker):
+    Job.objects.create(kind='stash', status='running')
+    restore = Job.objects.create(kind='restore')
+    assert worker.run_pending() == []
+    assert Job.objects.get(id=restore.id).status == 'pending'
+
+
+@pytest.mark.django_db
+def test_job_claimed_after_failed_insert_is_reused(monkeypatch):
+    pending = Job.objects.create(kind='update')
+    lookups = []
+
+    def racing_lookup(kind):
+        lookups.append(kind)
+        if len(lookups) == 1:
+            return None
+        claim(pending)
+        return unfinished_job(kind)
+
+    monkeypatch.setattr('base.jobs.unfinished_job', racing_lookup)
+    assert enqueue_once('update') == pending
+    assert Job.objects.get().status == 'running'
@@ -0,0 +1,95 @@
+from decimal import Decimal
+
+import pytest
+from base.models import SellBuy, Spread
+from django.urls import reverse
+from rest_framework import status
+
+
+def leg(executed, price):
+    return {'executed': executed, 'avg_exec_price': price}
+
+
+def patch_progress(client, payload):
+    return client.patch(
+        reverse('progress'), payload, content_type='application/json'
+    )
+
+
+@pytest.mark.django_db
+def test_progress_updates_spreads_and_sellbuys_at_once(
+    client, sample_spread, sellbuy_sample
+):
+    payload = {
+        'spreads': [
+            {
+                'id': sample_spread.id,
+                'far_leg': leg(10, '105.5'),
+                'near_leg': leg(1000, '1.04'),
+            }
+        ],
+        'sellbuy': [{'id': sellbuy_sample.id, **leg(995, '1')}],
+    }
+    response = patch_progress(client, payload)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {
+        'spreads': 1,
+        'sellbuy': 1,
+        'missing': {'spreads': [], 'sellbuy': []},
+    }
+
+    spread = Spread.objects.select_related('stats').get(id=sample_spread.id)
+    assert spread.active is False
+    assert spread.stats.far_leg_executed == 10
+    assert spread.stats.near_leg_executed == 1000
+    assert spread.stats.far_leg_avg_price == Decimal('105.5')
+    assert spread.stats.near_leg_avg_price == Decimal('1.04')
+
+    sellbuy = SellBuy.objects.get(id=sellbuy_sample.id)
+    assert sellbuy.executed == 995
+    assert sellbuy.avg_exec_price == Decimal('1')
+    assert sellbuy.active is False
+
+
+@pytest.mark.django_db
+def test_progress_keeps_partially_executed_entries_active(
+    client, sample_spread, sellbuy_sample
+):
+    payload = {
+        'spreads': [
+            {
+                'id': sample_spread.id,
+                'far_leg': leg(5, '100'),
+                'near_leg': leg(500, '1'),
+            }
+        ],
+        'sellbuy': [{'id': sellbuy_sample.id, **leg(600, '170')}],
+    }
+    assert patch_progress(client, payload).status_code == status.HTTP_200_OK
+    assert Spread.objects.get(id=sample_spread.id).active is True
+    assert SellBuy.objects.get(id=sellbuy_sample.id).active is True
+
+
+@pytest.mark.django_db
+def test_progress_skips_and_reports_unknown_ids(
+    client, sample_spread, sellbuy_sample
+):
+    unknown_id = sellbuy_sample.id + 100
+    payload = {
+        'spreads': [
+            {
+                'id': sample_spread.id,
+                'far_leg': leg(10, '100'),
+                'near_leg': leg(1000, '1'),
+            }
+        ],
+        'sellbuy': [{'id': unknown_id, **leg(600, '170')}],
+    }
+    response = patch_progress(client, payload)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['spreads'] == 1
+    assert response.data['sellbuy'] == 0
+    assert response.data['missing'] == {'spreads': [], 'sellbuy': [unknown_id]}
+    spread = Spread.objects.select_related('stats').get(id=sample_spread.id)
+    assert spread.active is False
+    assert spread.stats.far_leg_executed == 10
@@ -2,13 +2,19 @@ from decimal import Decimal
 
 import pytest
 from api.v1.stop_orders import TinkoffStopOrderAdapter
-from base.models import StopOrder
+from base.jobs import run_job
+from base.models import Job, StopOrder
 from django.urls import reverse
 from rest_framework import status
 from tinkoff.invest.schemas import StopOrderDirection as SoD
 from tinkoff.invest.utils import quotation_to_decimal
 
 
+def run_accepted(response):
+    run_job(Job.objects.get(id=response.data['id']))
+    return response
+
+
 @pytest.fixture
 def patched_get_response(client, sample_stop_orders_response, monkeypatch):
     def filled_response(self):
@@ -17,15 +23,19 @@ def patched_get_response(client, sample_stop_orders_response, monkeypatch):
     monkeypatch.setattr(
         TinkoffStopOrderAdapter, '_get_stop_orders', filled_response
     )
-    return client.get(reverse('stop_orders'))
+    return run_accepted(client.get(reverse('stop_orders')))
 
 
 @pytest.mark.django_db
 def test_not_empty_response_returns_right_status_code(patched_get_response):
-    assert patched_get_response.status_code == status.HTTP_200_OK
+    assert patched_get_response.status_code == status.HTTP_202_ACCEPTED
+    job = Job.objects.get(id=patched_get_response.data['id'])
+    assert job.kind == 'stash'
+    assert job.status == 'done'
 
 
-def test_empty_get_response_returns_correct_error(
+@pytest.mark.django_db
+def test_empty_get_response_fails_the_job_with_correct_error(
     client, sample_empty_stop_orders_response, monkeypatch
 ):
     def empty_response(self):
@@ -34,10 +44,10 @@ def test_empty_get_response_returns_correct_error(
     monkeypatch.setattr(
         TinkoffStopOrderAdapter, '_get_stop_orders', empty_response
     )
-    assert (
-        client.get(reverse('stop_orders')).status_code
-        == status.HTTP_404_NOT_FOUND
-    )
+    response = run_accepted(client.get(reverse('stop_orders')))
+    job = Job.objects.get(id=response.data['id'])
+    assert job.status == 'failed'
+    assert 'No active stop orders found.' in job.errors
 
 
 @pytest.mark.django_db
@@ -89,3 +99,39 @@ def test_correct_instrument_prices_will_be_passed(
             assert (
                 quotation_to_decimal(params['stop_price']) == order.stop_price
             )
+
+
+@pytest.fixture
+def restoration_response(client, patched_get_response, monkeypatch):
+    def place_stop_orders(self, orders, progress=None):
+        for number, order in enumerate(orders):
+            progress(ValueError('Price is out of range') if number else None)
+
+    monkeypatch.setattr(
+        TinkoffStopOrderAdapter, 'place_stop_orders', place_stop_orders
+    )
+    return run_accepted(client.post(reverse('stop_orders')))
+
+
+@pytest.mark.django_db
+def test_restoration_is_accepted_for_background_run(restoration_response):
+    assert restoration_response.status_code == status.HTTP_202_ACCEPTED
+    assert restoration_response.data['kind'] == 'restore'
+    assert restoration_response.data['status'] == 'pending'
+
+
+@pytest.mark.django_db
+def test_restoration_progress_is_reported(client, restoration_response):
+    response = client.get(
+        reverse(
+            'jobs-detail',
+            kwargs={'pk': restoration_response.data['id']},
+        )
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['status'] == 'done'
+    assert response.data['total'] == 6
+    assert response.data['done'] == 1
+    assert response.data['failed'] == 5
+    assert response.data['errors'].count('Price is out of range') == 5
+    assert response.data['finished'] is not None
@@ -1,6 +1,7 @@
 import pytest
 from base.management.commands.stopsdb import (SHORT_BLACKLIST, STOP_BLACKLIST,
                                               WHITELIST)
+from base.models import Stops
 from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
@@ -28,3 +29,14 @@ def test_long_stops(client, db, django_db_setup, stop_url, stop_list):
         assert ticker not in tickers
     for ticker in set(WHITELIST) - set(stop_list):
         assert ticker in tickers
+
+
+@pytest.mark.django_db
+def test_stopsdb_restores_changed_lists_without_duplicates():
+    call_command('stopsdb')
+    count = Stops.objects.count()
+    ticker = WHITELIST[0]
+    Stops.objects.filter(asset__ticker=ticker).update(whitelist=False)
+    call_command('stopsdb')
+    assert Stops.objects.count() == count
+    assert Stops.objects.get(asset__ticker=ticker).whitelist is True
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 from base.models import Figi
 from django.core.management import call_command
@@ -31,3 +33,70 @@ def test_update_adds_corresponding_objects(monkeypatch, api_fixtures):
                 name=fixture.name,
             ).count() == 1
             )
+
+
+@pytest.mark.django_db
+def test_update_clears_scanner_cache(
+    monkeypatch, api_fixtures, settings, tmp_path
+):
+    monkeypatch.setattr(
+        'base.management.commands.update.get_api_response',
+        lambda x: api_fixtures[x],
+    )
+    settings.SCANNER_CACHE_DIR = str(tmp_path)
+    (tmp_path / 'shares-2023-01-02.pickle').write_bytes(b'')
+    call_command('update')
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_update_refreshes_existing_and_deletes_missing_figis(
+    monkeypatch, api_fixtures, far_leg_sample
+):
+    monkeypatch.setattr(
+        'base.management.commands.update.get_api_response',
+        lambda x: api_fixtures[x],
+    )
+    existing = Figi.objects.create(
+        figi='OLDFU', ticker='fufufu', lot=5, asset_type='F'
+    )
+    result = call_command('update')
+    refreshed = Figi.objects.get(id=existing.id)
+    assert (refreshed.figi, refreshed.lot) == ('FUFUFU', 1)
+    assert not Figi.objects.filter(id=far_leg_sample.id).exists()
+    assert f'Deleting figi with ticker {far_leg_sample}' in result
+    assert 'Futures filtered: 1, created: 0, updated: 1' in result
+
+
+@pytest.mark.django_db
+def test_created_futures_get_default_trading_sessions(
+    monkeypatch, api_fixtures
+):
+    monkeypatch.setattr(
+        'base.management.commands.update.get_api_response',
+        lambda x: api_fixtures[x],
+    )
+    call_command('update')
+    future = Figi.objects.get(figi='FUFUFU')
+    assert future.morning_trading is True
+    assert future.evening_trading is True
+
+
+@pytest.mark.django_db
+def test_update_downloads_instrument_types_concurrently(
+    monkeypatch, api_fixtures
+):
+    barrier = threading.Barrier(len(api_fixtures), timeout=5)
+
+    def get_api_response(inst_type):
+        barrier.wait()
+        return api_fixtures[inst_type]
+
+    monkeypatch.setattr(
+        'base.management.commands.update.get_api_response',
+        get_api_response,
+    )
+    result = call_command('update')
+    assert result.index('Stocks') < result.index('Futures') < (
+        result.index('Bonds')
+    )
@@ -1,9 +1,18 @@
 from decimal import Decimal
 
-from base.models import Figi, SellBuy, Spread, Stops
+from base.jobs import HANDLERS, enqueue_once
+from base.models import Figi, Job, SellBuy, Spread, SpreadStats, Stops
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+STATS_FIELDS = (
+    'far_leg_executed',
+    'near_leg_executed',
+    'far_leg_avg_price',
+    'near_leg_avg_price',
+)
+
 
 class AssetSerializer(serializers.ModelSerializer):
     class Meta:
@@ -157,3 +166,104 @@ class SpreadsSerializer(serializers.ModelSerializer):
         instance.stats.save()
         instance.save()
         return instance
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = (
+            'id',
+            'kind',
+            'status',
+            'total',
+            'done',
+            'failed',
+            'result',
+            'errors',
+            'created',
+            'started',
+            'finished',
+        )
+        read_only_fields = fields[2:]
+
+    def validate_kind(self, value):
+        if value not in HANDLERS:
+            raise serializers.ValidationError(f'Unknown job kind: {value}')
+        return value
+
+    def create(self, validated_data):
+        return enqueue_once(validated_data['kind'])
+
+
+class LegProgressSerializer(serializers.Serializer):
+    executed = serializers.IntegerField(min_value=0)
+    avg_exec_price = serializers.DecimalField(
+        decimal_places=10, max_digits=20, min_value=Decimal('0')
+    )
+
+
+class SellBuyProgressSerializer(LegProgressSerializer):
+    id = serializers.IntegerField()
+
+
+class SpreadProgressSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    far_leg = LegProgressSerializer()
+    near_leg = LegProgressSerializer()
+
+
+class ProgressSerializer(serializers.Serializer):
+    spreads = SpreadProgressSerializer(many=True, default=list)
+    sellbuy = SellBuyProgressSerializer(many=True, default=list)
+
+    def create(self, validated_data):
+        self._missing = {'spreads': [], 'sellbuy': []}
+        with transaction.atomic():
+            return {
+                'spreads': self._update_spreads(validated_data['spreads']),
+                'sellbuy': self._update_sellbuys(validated_data['sellbuy']),
+                'missing': self._missing,
+            }
+
+    def to_representation(self, instance):
+        return instance
+
+    def _update_spreads(self, states):
+        states = {state['id']: state for state in states}
+        spreads = self._fetch(
+            Spread.objects.select_related('stats'), states, 'spreads'
+        )
+        for spread in spreads:
+            state = states[spread.id]
+            far_leg, near_leg = state['far_leg'], state['near_leg']
+            spread.stats.far_leg_executed = far_leg['executed']
+            spread.stats.near_leg_executed = near_leg['executed']
+            spread.stats.far_leg_avg_price = far_leg['avg_exec_price']
+            spread.stats.near_leg_avg_price = near_leg['avg_exec_price']
+            spread.active = not far_leg['executed'] >= spread.amount
+        SpreadStats.objects.bulk_update(
+            [spread.stats for spread in spreads], STATS_FIELDS
+        )
+        Spread.objects.bulk_update(spreads, ('active',))
+        return len(spreads)
+
+    def _update_sellbuys(self, states):
+        states = {state['id']: state for state in states}
+        sellbuys = self._fetch(
+            SellBuy.objects.select_related('asset'), states, 'sellbuy'
+        )
+        for sellbuy in sellbuys:
+            sellbuy.executed = states[sellbuy.id]['executed']
+            sellbuy.avg_exec_price = states[sellbuy.id]['avg_exec_price']
+            sellbuy.active = (
+                sellbuy.amount - sellbuy.executed >= sellbuy.asset.lot
+            )
+        SellBuy.objects.bulk_update(
+            sellbuys, ('executed', 'avg_exec_price', 'active')
+        )
+        return len(sellbuys)
+
+    def _fetch(self, queryset, states, kind):
+        objects = list(queryset.filter(id__in=states))
+        self._missing[kind] = sorted(set(states) - {obj.id for obj in objects})
+        return objects
@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal
 from typing import List
 
+from base.jobs import register
+from base.models import Figi
+from base.models import StopOrder as StashedOrder
+from django.conf import settings
+from django.db import transaction
 from tinkoff.invest.retrying.sync.client import RetryingClient
 from tinkoff.invest.schemas import MoneyValue, Quotation, StopOrder
 from tinkoff.invest.schemas import StopOrderDirection as SoD
@@ -15,23 +21,37 @@ class StopOrderAdapter(ABC):
         pass
 
     @abstractmethod
-    def place_stop_orders(self, orders):
+    def place_stop_orders(self, orders, progress=None):
         pass
 
 
 class TinkoffStopOrderAdapter(StopOrderAdapter):
-    def __init__(self, token, account_id, retry_settings) -> None:
+    def __init__(
+        self,
+        token,
+        account_id,
+        retry_settings,
+        workers=None,
+    ) -> None:
         self._token = token
         self._retry_settings = retry_settings
         self._account_id = account_id
+        self._workers = workers or settings.STOP_RESTORE_WORKERS
 
-    def place_stop_orders(self, orders):
+    def place_stop_orders(self, orders, progress=None):
+        params = [self._prepare_order_params(order) for order in orders]
         with RetryingClient(self._token, self._retry_settings) as client:
             client.cancel_all_orders(account_id=self._account_id)
-        for order in orders:
-            order_params = self._prepare_order_params(order)
-            with RetryingClient(self._token, self._retry_settings) as client:
-                client.stop_orders.post_stop_order(**order_params)
+            with ThreadPoolExecutor(self._workers) as executor:
+                futures = [
+                    executor.submit(
+                        client.stop_orders.post_stop_order, **order_params
+                    )
+                    for order_params in params
+                ]
+                for future in as_completed(futures):
+                    if progress is not None:
+                        progress(future.exception())
 
     def _prepare_order_params(self, order):
         direction = (
@@ -81,3 +101,39 @@ class TinkoffStopOrderAdapter(StopOrderAdapter):
 
     def _place_stop_order(self):
         pass
+
+
+def stop_order_adapter(token):
+    return TinkoffStopOrderAdapter(
+        token, settings.TCS_ACCOUNT_ID, settings.RETRY_SETTINGS
+    )
+
+
+@register('stash', group='stop_orders')
+def stash_stop_orders(progress):
+    response = stop_order_adapter(
+        settings.TCS_RO_TOKEN
+    ).get_stop_orders_params()
+    if not response:
+        raise ValueError('No active stop orders found.')
+    for item in response:
+        figi = item.pop('figi')
+        item['asset'], _ = Figi.objects.get_or_create(figi=figi)
+    with transaction.atomic():
+        StashedOrder.objects.all().delete()
+        StashedOrder.objects.bulk_create(
+            [StashedOrder(**order) for order in response]
+        )
+    return f'{len(response)} active orders stashed.'
+
+
+@register('restore', group='stop_orders')
+def restore_stop_orders(progress):
+    orders = list(StashedOrder.objects.select_related('asset'))
+    if not orders:
+        raise ValueError('No stop orders found in database.')
+    progress.set_total(len(orders))
+    stop_order_adapter(settings.TCS_RW_TOKEN).place_stop_orders(
+        orders, progress=progress.step
+    )
+    return f'{len(orders)} stop orders processed.'
@@ -1,14 +1,16 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (SellBuyViewSet, ShortsViewSet, SpreadsViewSet,
-                    StopOrdersView, StopsViewSet, TickerViewSet, health)
+from .views import (JobsViewSet, ProgressView, SellBuyViewSet, ShortsViewSet,
+                    SpreadsViewSet, StopOrdersView, StopsViewSet,
+                    TickerViewSet, health)
 
 v1_router = DefaultRouter()
 v1_router.register('stops', StopsViewSet, basename='stops')
 v1_router.register('shorts', ShortsViewSet, basename='shorts')
 v1_router.register('sellbuy', SellBuyViewSet, basename='sellbuy')
 v1_router.register('spreads', SpreadsViewSet, basename='spreads')
+v1_router.register('jobs', JobsViewSet, basename='jobs')
 
 
 urlpatterns = [
@@ -19,5 +21,6 @@ urlpatterns = [
         name='ticker',
     ),
     path('stop_orders/', StopOrdersView.as_view(), name='stop_orders'),
+    path('progress/', ProgressView.as_view(), name='progress'),
     path('', include(v1_router.urls)),
 ]
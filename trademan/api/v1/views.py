@@ -1,17 +1,15 @@
 from http import HTTPStatus
 
-from api.v1.stop_orders import TinkoffStopOrderAdapter
-from base.models import Figi, SellBuy, Spread, StopOrder, Stops
-from django.conf import settings
-from django.db import transaction
+from base.jobs import enqueue_once
+from base.models import Figi, Job, SellBuy, Spread, StopOrder, Stops
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import mixins, status, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .serializers import (SellBuySerializer, SpreadsSerializer,
-                          StopsSerializer, TickerSerializer)
+from .serializers import (JobSerializer, ProgressSerializer, SellBuySerializer,
+                          SpreadsSerializer, StopsSerializer, TickerSerializer)
 
 
 class StopsViewSet(viewsets.ReadOnlyModelViewSet):
@@ -60,43 +58,39 @@ class SpreadsViewSet(viewsets.ModelViewSet):
     serializer_class = SpreadsSerializer
 
 
+class ProgressView(APIView):
+    def patch(self, request):
+        serializer = ProgressSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+def accepted(job):
+    return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
 class StopOrdersView(APIView):
     def get(self, request):
-        adapter = TinkoffStopOrderAdapter(
-            settings.TCS_RO_TOKEN,
-            settings.TCS_ACCOUNT_ID,
-            settings.RETRY_SETTINGS,
-        )
-        response = adapter.get_stop_orders_params()
-        if not response:
-            return Response(
-                'No active stop orders found.',
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        for item in response:
-            figi = item.pop('figi')
-            item['asset'], _ = Figi.objects.get_or_create(figi=figi)
-        with transaction.atomic():
-            StopOrder.objects.all().delete()
-            StopOrder.objects.bulk_create(
-                [StopOrder(**order) for order in response]
-            )
-        return Response('Active orders stashed.', status=status.HTTP_200_OK)
+        return accepted(enqueue_once('stash'))
 
     def post(self, request):
-        orders = StopOrder.objects.all()
-        if orders.count() == 0:
+        if not StopOrder.objects.exists():
             return Response(
                 'No stop orders found in database.',
                 status=status.HTTP_404_NOT_FOUND,
             )
-        adapter = TinkoffStopOrderAdapter(
-            settings.TCS_RW_TOKEN,
-            settings.TCS_ACCOUNT_ID,
-            settings.RETRY_SETTINGS,
-        )
-        adapter.place_stop_orders(orders)
-        return Response('Stop orders restored', status=status.HTTP_200_OK)
+        return accepted(enqueue_once('restore'))
+
+
+class JobsViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Job.objects.order_by('-id')
+    serializer_class = JobSerializer
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
 
 
 class TickerViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Figi, SellBuy, Spread, SpreadStats, StopOrder, Stops
+from .models import Figi, Job, SellBuy, Spread, SpreadStats, StopOrder, Stops
 
 
 @admin.register(SellBuy)
@@ -109,6 +109,31 @@ class StopOrderAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'kind',
+        'status',
+        'total',
+        'done',
+        'failed',
+        'created',
+    )
+    list_filter = ('kind', 'status')
+    readonly_fields = (
+        'status',
+        'total',
+        'done',
+        'failed',
+        'result',
+        'errors',
+        'created',
+        'started',
+        'finished',
+    )
+
+
 @admin.register(Figi)
 class FigiAdmin(admin.ModelAdmin):
     list_display = (
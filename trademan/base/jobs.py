@@ -0,0 +1,157 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple
+
+from base.models import Job
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+HANDLERS = {}
+UNFINISHED = ('pending', 'running')
+
+
+class JobHandler(NamedTuple):
+    run: Callable
+    group: str
+    concurrency: int
+
+
+def register(kind, group=None, concurrency=1):
+    def decorator(handler):
+        HANDLERS[kind] = JobHandler(handler, group or kind, concurrency)
+        return handler
+
+    return decorator
+
+
+def job_groups():
+    groups = {}
+    for kind, handler in HANDLERS.items():
+        kinds, concurrency = groups.get(
+            handler.group, ((), handler.concurrency)
+        )
+        groups[handler.group] = (
+            kinds + (kind,),
+            min(concurrency, handler.concurrency),
+        )
+    return groups
+
+
+def enqueue(kind):
+    if kind not in HANDLERS:
+        raise KeyError(f'Unknown job kind: {kind}')
+    return Job.objects.create(kind=kind)
+
+
+def unfinished_job(kind):
+    return Job.objects.filter(kind=kind, status__in=UNFINISHED).first()
+
+
+def enqueue_once(kind, attempts=3):
+    job = unfinished_job(kind)
+    if job is not None:
+        return job
+    try:
+        with transaction.atomic():
+            return enqueue(kind)
+    except IntegrityError:
+        if attempts <= 1:
+            raise
+        return enqueue_once(kind, attempts - 1)
+
+
+def append_error(error):
+    return Concat('errors', Value(f'{error}\n'), output_field=TextField())
+
+
+class JobProgress:
+    def __init__(self, job_id) -> None:
+        self._jobs = Job.objects.filter(id=job_id)
+
+    def set_total(self, total):
+        self._jobs.update(total=total)
+
+    def step(self, error=None):
+        if error is None:
+            self._jobs.update(done=F('done') + 1)
+            return
+        logging.warning(f'Job step failed: {error}')
+        self._jobs.update(failed=F('failed') + 1, errors=append_error(error))
+
+
+def claim(job):
+    return Job.objects.filter(id=job.id, status='pending').update(
+        status='running', started=timezone.now()
+    ) == 1
+
+
+def run_job(job):
+    jobs = Job.objects.filter(id=job.id)
+    try:
+        result = HANDLERS[job.kind].run(JobProgress(job.id))
+    except Exception as error:
+        logging.exception(f'Job {job} failed')
+        jobs.update(
+            status='failed',
+            errors=append_error(error),
+            finished=timezone.now(),
+        )
+    else:
+        jobs.update(
+            status='done', result=result or '', finished=timezone.now()
+        )
+
+
+def run_in_thread(job):
+    try:
+        run_job(job)
+    finally:
+        close_old_connections()
+
+
+class JobWorker:
+    def __init__(self, pause=None) -> None:
+        self._pause = pause or settings.JOB_POLL_PAUSE
+        self._executor = ThreadPoolExecutor(
+            sum(concurrency for _, concurrency in job_groups().values()) or 1
+        )
+
+    def run_forever(self):
+        self.fail_interrupted()
+        while True:
+            self.run_pending()
+            time.sleep(self._pause)
+
+    def fail_interrupted(self):
+        return Job.objects.filter(status='running').update(
+            status='failed',
+            errors=append_error('Interrupted by worker restart'),
+            finished=timezone.now(),
+        )
+
+    def run_pending(self):
+        started = []
+        for kinds, concurrency in job_groups().values():
+            started.extend(self._start(kinds, concurrency))
+        return started
+
+    def _start(self, kinds, concurrency):
+        jobs = Job.objects.filter(kind__in=kinds)
+        running = jobs.filter(status='running').count()
+        pending = jobs.filter(status='pending').order_by('id')[
+            :max(concurrency - running, 0)
+        ]
+        claimed = [job for job in pending if claim(job)]
+        for job in claimed:
+            self._executor.submit(run_in_thread, job)
+        return claimed
+
+
+@register('update')
+def update_instruments(progress):
+    return call_command('update')
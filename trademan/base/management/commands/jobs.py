@@ -0,0 +1,9 @@
+from base.jobs import JobWorker
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Выполнение фоновых задач из очереди'
+
+    def handle(self, *args, **options):
+        JobWorker().run_forever()
@@ -21,18 +21,43 @@ WHITELIST = [
 ]
 
 
+STOPS_FIELDS = ('whitelist', 'stop_blacklist', 'short_blacklist')
+
+
+def stops_values(stock):
+    return {
+        'whitelist': stock.ticker in WHITELIST,
+        'stop_blacklist': stock.ticker in STOP_BLACKLIST,
+        'short_blacklist': stock.ticker in SHORT_BLACKLIST,
+    }
+
+
+def outdated(stops, values):
+    return any(getattr(stops, name) != value for name, value in values.items())
+
+
+def diff_stops(stocks, existing):
+    created, updated = [], []
+    for stock in stocks:
+        values = stops_values(stock)
+        stops = existing.get(stock.id)
+        if stops is None:
+            created.append(Stops(asset=stock, **values))
+        elif outdated(stops, values):
+            for name, value in values.items():
+                setattr(stops, name, value)
+            updated.append(stops)
+    return created, updated
+
+
 class Command(BaseCommand):
     help = 'Восстановление дефолтных black_list и white_list для автостопов'
 
     def handle(self, *args, **options):
-        qs = Figi.objects.filter(asset_type='S')
+        existing = {stops.asset_id: stops for stops in Stops.objects.all()}
+        created, updated = diff_stops(
+            Figi.objects.filter(asset_type='S'), existing
+        )
         with transaction.atomic():
-            for stock in qs:
-                new_values = {
-                    'whitelist': stock.ticker in WHITELIST,
-                    'stop_blacklist': stock.ticker in STOP_BLACKLIST,
-                    'short_blacklist': stock.ticker in SHORT_BLACKLIST,
-                }
-                stop_stock, _ = Stops.objects.update_or_create(
-                    asset=stock, defaults=new_values
-                )
+            Stops.objects.bulk_create(created)
+            Stops.objects.bulk_update(updated, STOPS_FIELDS)
@@ -1,4 +1,7 @@
+import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import NamedTuple, Union
 
 from base.models import Figi
@@ -95,49 +98,129 @@ def get_api_response(instrument):
             raise CommandError(f'Data update failed! {error}')
 
 
-def update_db(response, inst_type):
-    updated = 0
-    figis = set()
+class Refresh(NamedTuple):
+    filtered: int
+    created: list
+    updated: list
+    fields: set
+    figis: set
+
+
+def load_figis():
+    return {figi.ticker: figi for figi in Figi.objects.all()}
+
+
+def new_figi(values):
+    figi = Figi(**values)
+    figi.set_default_sessions()
+    return figi
+
+
+def apply_changes(figi, values):
+    changes = {
+        name: value
+        for name, value in values.items()
+        if getattr(figi, name) != value
+    }
+    for name, value in changes.items():
+        setattr(figi, name, value)
+    return changes.keys()
+
+
+def diff_instruments(response, inst_type, existing):
+    filtered, created, updated, fields, figis = 0, {}, [], set(), set()
+    for inst in response.instruments:
+        if not prevalidate_instrument(inst=inst, inst_type=inst_type):
+            continue
+        filtered += 1
+        values = fill_fields(inst, inst_type)
+        figis.add(inst.figi)
+        figi = existing.get(inst.ticker)
+        if figi is None:
+            created[inst.ticker] = new_figi(values)
+            continue
+        changes = apply_changes(figi, values)
+        if changes:
+            updated.append(figi)
+            fields.update(changes)
+    return Refresh(filtered, list(created.values()), updated, fields, figis)
+
+
+def update_db(response, inst_type, existing):
+    refresh = diff_instruments(response, inst_type, existing)
     with transaction.atomic():
-        for inst in response.instruments:
-            if not prevalidate_instrument(inst=inst, inst_type=inst_type):
-                continue
-            updated += 1
-            new_values = fill_fields(inst, inst_type)
-            figis.add(inst.figi)
-            Figi.objects.update_or_create(
-                ticker=inst.ticker, defaults=new_values
-            )
-    return updated, figis
-
-
-def clean_up(inst_type, figis):
-    result = ''
-    for figi in Figi.objects.filter(
-        asset_type=INSTRUMENTS[inst_type].db_short
-    ):
-        if figi.figi not in figis:
-            result += f'Deleting figi with ticker {figi}\n'
-            figi.delete()
-    return result
+        Figi.objects.bulk_create(refresh.created)
+        if refresh.updated:
+            Figi.objects.bulk_update(refresh.updated, refresh.fields)
+    return refresh
+
+
+def clean_up(inst_type, figis, existing):
+    stale = [
+        figi
+        for figi in existing.values()
+        if figi.asset_type == INSTRUMENTS[inst_type].db_short
+        and figi.figi not in figis
+    ]
+    Figi.objects.filter(id__in=[figi.id for figi in stale]).delete()
+    for figi in stale:
+        existing.pop(figi.ticker)
+    return ''.join(f'Deleting figi with ticker {figi}\n' for figi in stale)
+
+
+def download(inst_type):
+    started = time.monotonic()
+    response = get_api_response(inst_type)
+    return response, time.monotonic() - started
+
+
+def refresh_instruments(inst_type, response, seconds, existing):
+    started = time.monotonic()
+    result_message = f'{inst_type} update received in {seconds:.2f} s\n'
+    refresh = update_db(response, inst_type, existing)
+    result_message += (
+        f'{inst_type} filtered: {refresh.filtered}, '
+        f'created: {len(refresh.created)}, '
+        f'updated: {len(refresh.updated)}\n'
+    )
+    if refresh.filtered > 0:
+        result_message += clean_up(inst_type, refresh.figis, existing)
+    return result_message + (
+        f'{inst_type} saved in {time.monotonic() - started:.2f} s\n'
+    )
+
+
+def invalidate_scanner_cache():
+    directory = settings.SCANNER_CACHE_DIR
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith('.pickle'):
+            os.remove(os.path.join(directory, name))
 
 
 class Command(BaseCommand):
     help = 'Обновление базы акций и фьючерсов с ТКС'
 
     def handle(self, *args, **options):
-        new_figi = set()
-        result_message = ''
-        clean_up_flag = True
-        upd_insts = {asset_type: 0 for asset_type in INSTRUMENTS.keys()}
-        for inst_type in INSTRUMENTS.keys():
-            response = get_api_response(inst_type)
-            result_message += f'{inst_type} update received\n'
-            upd_insts[inst_type], new_figi = update_db(response, inst_type)
-            result_message += f'{inst_type} filtered: {upd_insts[inst_type]}\n'
-            if clean_up_flag and upd_insts[inst_type] > 0:
-                result_message += clean_up(inst_type, new_figi)
+        existing = load_figis()
+        messages = {}
+        with ThreadPoolExecutor(len(INSTRUMENTS)) as executor:
+            downloads = {
+                executor.submit(download, inst_type): inst_type
+                for inst_type in INSTRUMENTS.keys()
+            }
+            for future in as_completed(downloads):
+                inst_type = downloads[future]
+                messages[inst_type] = refresh_instruments(
+                    inst_type, *future.result(), existing
+                )
+        result_message = ''.join(
+            messages[inst_type] for inst_type in INSTRUMENTS.keys()
+        )
 
         call_command('stopsdb')
         result_message += 'Stops db updated\n'
+        invalidate_scanner_cache()
+        result_message += 'Scanner cache cleared\n'
         return result_message
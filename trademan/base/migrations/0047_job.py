@@ -0,0 +1,37 @@
+# Generated by Django 2.2.19 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0046_figi_nominal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('stash', 'Stash stop orders'), ('restore', 'Restore stop orders'), ('update', 'Update instruments')], max_length=10, verbose_name='Тип')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=7, verbose_name='Статус')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего шагов')),
+                ('done', models.PositiveIntegerField(default=0, verbose_name='Выполнено')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='Ошибки')),
+                ('result', models.TextField(blank=True, default='', verbose_name='Результат')),
+                ('errors', models.TextField(blank=True, default='', verbose_name='Текст ошибок')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='Запущено')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+            ],
+            options={
+                'verbose_name': 'Задача',
+                'verbose_name_plural': 'Задачи',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(status='pending'), fields=('kind',), name='one_pending_job_per_kind'),
+        ),
+    ]
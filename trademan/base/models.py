@@ -46,17 +46,20 @@ class Figi(models.Model):
     morning_trading = models.BooleanField('Утр. торги', default=False)
     evening_trading = models.BooleanField('Веч. торги', default=False)
 
-    def save(self, *args, **kwargs):
-        if not self.pk and self.asset_type == 'F':
+    def set_default_sessions(self):
+        if self.asset_type == 'F':
             self.morning_trading = True
             self.evening_trading = True
         if (
-            not self.pk
-            and self.asset_type == 'B'
+            self.asset_type == 'B'
             and self.ticker.startswith('SU')
             and self.name.startswith('ОФЗ')
         ):
             self.evening_trading = True
+
+    def save(self, *args, **kwargs):
+        if not self.pk:
+            self.set_default_sessions()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -227,6 +230,51 @@ class StopOrder(BaseAssetModel):
         verbose_name_plural = 'Восстановления стопов'
 
 
+class Job(models.Model):
+    kind = models.CharField(
+        max_length=10,
+        choices=(
+            ('stash', 'Stash stop orders'),
+            ('restore', 'Restore stop orders'),
+            ('update', 'Update instruments'),
+        ),
+        verbose_name='Тип',
+    )
+    status = models.CharField(
+        max_length=7,
+        choices=(
+            ('pending', 'Pending'),
+            ('running', 'Running'),
+            ('done', 'Done'),
+            ('failed', 'Failed'),
+        ),
+        default='pending',
+        verbose_name='Статус',
+    )
+    total = models.PositiveIntegerField('Всего шагов', default=0)
+    done = models.PositiveIntegerField('Выполнено', default=0)
+    failed = models.PositiveIntegerField('Ошибки', default=0)
+    result = models.TextField('Результат', blank=True, default='')
+    errors = models.TextField('Текст ошибок', blank=True, default='')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    started = models.DateTimeField('Запущено', null=True, blank=True)
+    finished = models.DateTimeField('Завершено', null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.kind} #{self.id}: {self.status}'
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('kind',),
+                condition=models.Q(status='pending'),
+                name='one_pending_job_per_kind',
+            ),
+        )
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+
 class Stops(models.Model):
     asset = models.ForeignKey(
         Figi,
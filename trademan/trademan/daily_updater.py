@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from django.core.management import call_command
+from base.jobs import enqueue_once
 
 
 def daily_updater(get_response):
@@ -10,13 +10,8 @@ def daily_updater(get_response):
         nonlocal date
         current_date = datetime.now().date()
         if request.method == 'GET' and current_date != date:
-            try:
-                call_command('update')
-            except Exception as error:
-                print(f'Could not update prices! {error}')
-                raise error
-            else:
-                date = current_date
+            enqueue_once('update')
+            date = current_date
         return get_response(request)
 
     return middleware
@@ -11,6 +11,10 @@ TCS_RO_TOKEN = os.getenv('TCS_RO_TOKEN', '000')
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCANNER_CACHE_DIR = os.getenv(
+    'SCANNER_CACHE_DIR',
+    os.path.join(os.path.dirname(BASE_DIR), 'scanner_cache'),
+)
 
 
 # Quick-start development settings - unsuitable for production
@@ -39,7 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'base',
-    'api',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
@@ -156,3 +160,5 @@ if DEBUG_DB:
     }
 
 RETRY_SETTINGS = RetryClientSettings(use_retry=True, max_retry_attempt=100)
+STOP_RESTORE_WORKERS = 5
+JOB_POLL_PAUSE = 2